@@ -1,9 +1,39 @@
+from typing import TYPE_CHECKING, Any
+from weakref import WeakKeyDictionary
+
 from agent_framework import (
-    AgentExecutor,
+    AgentExecutorRequest,
+    AgentExecutorResponse,
+    AgentRunEvent,
+    AgentRunResponse,
+    AgentRunResponseUpdate,
+    ChatAgent,
+    ChatMessage,
+    Executor,
+    Role,
+    SharedState,
+    WorkflowContext,
+    handler,
 )
-from agent_framework.azure import AzureOpenAIChatClient
 
+from maf_workflow.events import ResponseDeltaEvent
 from maf_workflow.models.question_response import QuestionResponse
+from maf_workflow.protocols.i_question_response_cache_service import (
+    IQuestionResponseCacheService,
+)
+from maf_workflow.utils.json_field_stream import JsonStringFieldStream
+from maf_workflow.utils.prompt_cache import create_cached_prompt_agent
+from maf_workflow.utils.rate_limit_scheduler import Priority, priority
+from maf_workflow.utils.speculation import Emit, Speculation
+
+if TYPE_CHECKING:
+    from agent_framework.azure import AzureOpenAIChatClient
+
+# the answer started speculatively for each run, by the shared state of the run;
+# not in the shared state itself, which is checkpointed and must serialize
+_speculations: WeakKeyDictionary[SharedState, Speculation[AgentRunResponse]] = (
+    WeakKeyDictionary()
+)
 
 SYSTEM_PROMPT = """
 You are a helpful assistant who helps users with answering questions.
@@ -15,11 +45,153 @@ Response in JSON format with the following fields:
 """
 
 
-def create(chat_client: AzureOpenAIChatClient) -> AgentExecutor:
-    return AgentExecutor(
-        chat_client.create_agent(
-            instructions=SYSTEM_PROMPT,
-            response_format=QuestionResponse,
-        ),
-        id="customer_agent",
-    )
+class CustomerAgentExecutor(Executor):
+    """Answers the user question with the customer chat agent.
+
+    With a cache, answers are reused for the same normalized question and
+    identical questions in flight share one call to the agent. When `streaming`,
+    the `response` field of the answer is emitted as `ResponseDeltaEvent`s while
+    the reply arrives; the complete reply is still validated. An answer started
+    ahead of the run reaching this executor (see `speculate`) is picked up if it
+    was handed over in the same run. The executor keeps no per-run state, so one
+    instance is shared by every run of the workflow.
+    """
+
+    def __init__(
+        self,
+        agent: ChatAgent,
+        cache: IQuestionResponseCacheService | None = None,
+        streaming: bool = False,
+    ):
+        super().__init__(id="customer_agent")
+        self.agent = agent
+        self.cache = cache
+        self.streaming = streaming
+
+    @handler
+    async def run(
+        self, request: AgentExecutorRequest, ctx: WorkflowContext[AgentExecutorResponse]
+    ) -> None:
+        async def emit(delta: str) -> None:
+            await ctx.add_event(ResponseDeltaEvent(self.id, delta))
+
+        speculation = _speculations.pop(ctx.shared_state, None)
+        response = await self.answer(request.messages, emit, speculation)
+
+        await ctx.add_event(AgentRunEvent(self.id, response))
+        full_conversation = list(request.messages) + list(response.messages)
+        await ctx.send_message(
+            AgentExecutorResponse(
+                self.id, response, full_conversation=full_conversation
+            )
+        )
+
+    def speculate(self, messages: list[ChatMessage]) -> Speculation[AgentRunResponse]:
+        """Starts answering the messages before they are known to be a question.
+
+        The caller cancels the speculation, or gives it to this executor with
+        `hand_over_speculation`. The call bypasses
+        the cache, so the answer to a message that is not a question is never
+        cached; it is cached once `answer` is given the speculation.
+        """
+        return Speculation(lambda emit: self._run_agent(messages, emit))
+
+    async def answer(
+        self,
+        messages: list[ChatMessage],
+        emit: Emit,
+        speculation: Speculation[AgentRunResponse] | None = None,
+    ) -> AgentRunResponse:
+        """Answers the question; `emit` receives the pieces of a streamed answer.
+
+        A `speculation` started for the question is used instead of a new call
+        to the agent, or cancelled if the answer is already cached.
+        """
+
+        async def call() -> AgentRunResponse:
+            if speculation is None:
+                return await self._run_agent(messages, emit)
+            return await speculation.join(emit)
+
+        if self.cache is None:
+            return await call()
+
+        fetched: AgentRunResponse | None = None
+        joined = False
+
+        async def fetch() -> QuestionResponse:
+            nonlocal fetched, joined
+            joined = True
+            fetched = await call()
+            return self._parse(fetched)
+
+        try:
+            answer = await self.cache.get_or_fetch(messages[-1].text, fetch)
+        finally:
+            # not needed when the answer came from the cache or another run
+            if speculation is not None and not joined:
+                speculation.cancel()
+        if self.streaming and fetched is None:
+            # answered by the cache or by a call made for another run
+            await emit(answer.response)
+        return AgentRunResponse(
+            messages=[ChatMessage(Role.ASSISTANT, text=answer.model_dump_json())],
+            # the tokens are only spent by the run that made the call
+            usage_details=fetched.usage_details if fetched is not None else None,
+            value=answer,
+        )
+
+    async def _run_agent(
+        self, messages: list[ChatMessage], emit: Emit
+    ) -> AgentRunResponse:
+        # long answers yield to the intent detection of other requests
+        if not self.streaming:
+            with priority(Priority.LOW):
+                return await self.agent.run(messages)
+
+        field = JsonStringFieldStream("response")
+        updates: list[AgentRunResponseUpdate] = []
+        with priority(Priority.LOW):
+            async for update in self.agent.run_stream(messages):
+                updates.append(update)
+                if delta := field.feed(update.text):
+                    await emit(delta)
+        return AgentRunResponse.from_agent_run_response_updates(
+            updates, output_format_type=QuestionResponse
+        )
+
+    def _parse(self, response: AgentRunResponse) -> QuestionResponse:
+        if isinstance(response.value, QuestionResponse):
+            return response.value
+        return QuestionResponse.model_validate_json(response.text)
+
+
+def hand_over_speculation(
+    ctx: WorkflowContext[Any], speculation: Speculation[AgentRunResponse]
+) -> None:
+    """Gives the answer started for the run to the customer agent of the run.
+
+    It is kept in memory rather than in the shared state, so a run resumed from
+    a checkpoint answers again instead.
+    """
+    _speculations[ctx.shared_state] = speculation
+
+
+def create_chat_agent(chat_client: "AzureOpenAIChatClient") -> ChatAgent:
+    return create_cached_prompt_agent(chat_client, SYSTEM_PROMPT, QuestionResponse)
+
+
+def create_executor(
+    agent: ChatAgent,
+    cache: IQuestionResponseCacheService | None = None,
+    streaming: bool = False,
+) -> CustomerAgentExecutor:
+    return CustomerAgentExecutor(agent, cache, streaming)
+
+
+def create(
+    chat_client: "AzureOpenAIChatClient",
+    cache: IQuestionResponseCacheService | None = None,
+    streaming: bool = False,
+) -> CustomerAgentExecutor:
+    return create_executor(create_chat_agent(chat_client), cache, streaming)
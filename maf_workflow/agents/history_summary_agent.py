@@ -0,0 +1,35 @@
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+from agent_framework import ChatAgent, ChatMessage
+
+from maf_workflow.utils.prompt_cache import create_cached_prompt_agent
+from maf_workflow.utils.rate_limit_scheduler import Priority, priority
+
+if TYPE_CHECKING:
+    from agent_framework.azure import AzureOpenAIChatClient
+
+SYSTEM_PROMPT = """
+You maintain the summary of a conversation between a user and an assistant.
+You receive the summary so far and the messages that follow it.
+
+Reply with the updated summary only, as plain prose of at most 200 words. Keep the
+facts, names, preferences, decisions and open questions that later turns may
+refer to, and leave out greetings and small talk.
+"""
+
+
+def create_chat_agent(chat_client: "AzureOpenAIChatClient") -> ChatAgent:
+    return create_cached_prompt_agent(chat_client, SYSTEM_PROMPT)
+
+
+async def summarize(
+    agent: ChatAgent, summary: str | None, messages: Sequence[ChatMessage]
+) -> str:
+    """Folds the messages into the summary of the conversation before them."""
+    transcript = "\n".join(f"{m.role.value}: {m.text}" for m in messages)
+    prompt = f"Summary so far:\n{summary or '(none)'}\n\nMessages:\n{transcript}"
+    # the summary is off the hot path, conversations go first
+    with priority(Priority.LOW):
+        response = await agent.run(prompt)
+    return response.text
@@ -1,9 +1,35 @@
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
 from agent_framework import (
-    AgentExecutor,
+    AgentExecutorRequest,
+    AgentExecutorResponse,
+    AgentRunEvent,
+    AgentRunResponse,
+    ChatAgent,
+    ChatMessage,
+    Executor,
+    Role,
+    WorkflowContext,
+    handler,
 )
-from agent_framework.azure import AzureOpenAIChatClient
+from pydantic import ValidationError
 
+from maf_workflow.agents.customer_agent import hand_over_speculation
 from maf_workflow.models.intent_detection_result import IntentDetectionResult
+from maf_workflow.protocols.i_intent_cache_service import IIntentCacheService
+from maf_workflow.protocols.i_intent_classifier_service import (
+    IIntentClassifierService,
+)
+from maf_workflow.protocols.i_intent_hedging_service import IIntentHedgingService
+from maf_workflow.utils.prompt_cache import create_cached_prompt_agent
+from maf_workflow.utils.rate_limit_scheduler import Priority, priority
+from maf_workflow.utils.speculation import Speculation
+
+if TYPE_CHECKING:
+    from agent_framework.azure import AzureOpenAIChatClient
+
+type Speculate = Callable[[list[ChatMessage]], Speculation[Any]]
 
 SYSTEM_PROMPT = """
 You are a helpful assistant who helps to identify the intention of a message.
@@ -30,11 +56,134 @@ mutually exclusive; only one of them can be true for a given message.
 """
 
 
-def create_agent(chat_client: AzureOpenAIChatClient) -> AgentExecutor:
-    return AgentExecutor(
-        chat_client.create_agent(
-            instructions=SYSTEM_PROMPT,
-            response_format=IntentDetectionResult,
-        ),
-        id="intent_detection_agent",
+class IntentDetectionExecutor(Executor):
+    """Detects the intent of the user message.
+
+    A confident local classifier answers without calling the LLM, then the cache
+    of earlier results is looked up; otherwise the chat agent is called (hedged
+    against slow replies, if enabled) and its result is cached. With `speculate`,
+    the answer is started alongside the call and handed to the customer agent if
+    the message is a question, or cancelled otherwise. The executor keeps no
+    per-run state, so one instance is shared by every run of the workflow.
+    """
+
+    result_type: type[IntentDetectionResult] = IntentDetectionResult
+
+    def __init__(
+        self,
+        agent: ChatAgent,
+        classifier: IIntentClassifierService | None = None,
+        cache: IIntentCacheService | None = None,
+        hedging: IIntentHedgingService | None = None,
+        speculate: Speculate | None = None,
+        id: str = "intent_detection_agent",
+    ):
+        super().__init__(id=id)
+        self.agent = agent
+        self.classifier = classifier
+        self.cache = cache
+        self.hedging = hedging
+        self.speculate = speculate
+
+    @handler
+    async def run(
+        self, request: AgentExecutorRequest, ctx: WorkflowContext[AgentExecutorResponse]
+    ) -> None:
+        text = request.messages[-1].text
+        intent = self._classify(text)
+        if intent is None and self.cache:
+            intent = await self.cache.get(text)
+
+        if intent is None:
+            # the answer to a likely question is started while the intent is detected
+            speculation = self.speculate(request.messages) if self.speculate else None
+            try:
+                response = await self._detect(request.messages, ctx)
+            except BaseException:
+                if speculation is not None:
+                    speculation.cancel()
+                raise
+            if self.cache:
+                await self._cache_response(text, response)
+            if speculation is not None:
+                self._resolve(speculation, response, ctx)
+        else:
+            response = AgentRunResponse(
+                messages=[ChatMessage(Role.ASSISTANT, text=intent.model_dump_json())],
+                value=intent,
+            )
+
+        await ctx.add_event(AgentRunEvent(self.id, response))
+        full_conversation = list(request.messages) + list(response.messages)
+        await ctx.send_message(
+            AgentExecutorResponse(
+                self.id, response, full_conversation=full_conversation
+            )
+        )
+
+    def _classify(self, text: str) -> IntentDetectionResult | None:
+        return self.classifier.classify(text) if self.classifier else None
+
+    async def _detect(
+        self,
+        messages: list[ChatMessage],
+        ctx: WorkflowContext[AgentExecutorResponse],
+    ) -> AgentRunResponse:
+        # short and on the path of every request, ahead of long answers
+        with priority(Priority.HIGH):
+            if self.hedging:
+                return await self.hedging.run(lambda: self.agent.run(messages))
+            return await self.agent.run(messages)
+
+    def _resolve(
+        self,
+        speculation: Speculation[Any],
+        response: AgentRunResponse,
+        ctx: WorkflowContext[AgentExecutorResponse],
+    ) -> None:
+        intent = self._parse(response)
+        if intent is not None and intent.is_question:
+            hand_over_speculation(ctx, speculation)
+        else:
+            speculation.cancel()
+
+    async def _cache_response(self, text: str, response: AgentRunResponse) -> None:
+        intent = self._parse(response)
+        if intent is not None:
+            assert self.cache is not None
+            await self.cache.set(text, intent)
+
+    def _parse(self, response: AgentRunResponse) -> IntentDetectionResult | None:
+        # keep the parsed result so that routing does not parse the reply again
+        if not isinstance(response.value, self.result_type):
+            try:
+                response.value = self.result_type.model_validate_json(response.text)
+            except ValidationError:
+                return None  # left to routing, which drops malformed replies
+        return response.value
+
+
+def create_chat_agent(chat_client: "AzureOpenAIChatClient") -> ChatAgent:
+    return create_cached_prompt_agent(chat_client, SYSTEM_PROMPT, IntentDetectionResult)
+
+
+def create_executor(
+    agent: ChatAgent,
+    classifier: IIntentClassifierService | None = None,
+    cache: IIntentCacheService | None = None,
+    hedging: IIntentHedgingService | None = None,
+    speculate: Speculate | None = None,
+) -> IntentDetectionExecutor:
+    return IntentDetectionExecutor(agent, classifier, cache, hedging, speculate)
+
+
+def create_agent(
+    chat_client: "AzureOpenAIChatClient",
+    classifier: IIntentClassifierService | None = None,
+    cache: IIntentCacheService | None = None,
+    hedging: IIntentHedgingService | None = None,
+    speculate: Speculate | None = None,
+) -> IntentDetectionExecutor:
+    return create_executor(
+        create_chat_agent(chat_client), classifier, cache, hedging, speculate
     )
@@ -0,0 +1,115 @@
+from typing import TYPE_CHECKING
+
+from agent_framework import (
+    AgentExecutorResponse,
+    AgentRunResponse,
+    AgentRunResponseUpdate,
+    ChatAgent,
+    ChatMessage,
+    WorkflowContext,
+)
+
+from maf_workflow.agents.intent_detection_agent import IntentDetectionExecutor
+from maf_workflow.events import ResponseDeltaEvent
+from maf_workflow.models.intent_answer_result import IntentAnswerResult
+from maf_workflow.models.intent_detection_result import IntentDetectionResult
+from maf_workflow.protocols.i_intent_classifier_service import (
+    IIntentClassifierService,
+)
+from maf_workflow.protocols.i_intent_hedging_service import IIntentHedgingService
+from maf_workflow.utils.json_field_stream import JsonStringFieldStream
+from maf_workflow.utils.prompt_cache import create_cached_prompt_agent
+from maf_workflow.utils.rate_limit_scheduler import Priority, priority
+
+if TYPE_CHECKING:
+    from agent_framework.azure import AzureOpenAIChatClient
+
+SYSTEM_PROMPT = """
+You are a helpful assistant who identifies the intention of a message and answers
+it if it is a question.
+
+The message must be one of the following:
+- A social greeting such as "Hello", "Hi", "Good morning", etc.
+- A inappropriate or harmful message such as hate speech, threats, harassment, insults,
+  etc.
+- A question or request for information.
+- other general statements.
+
+Response in JSON format with the following fields:
+- message_content (string): The original message content.
+- is_greeting (bool): true if the message is a greeting, false otherwise.
+- is_inappropriate (bool): true if the message is inappropriate, false otherwise.
+- is_question (bool): true if the message is a question or request for information,
+  false otherwise.
+- is_statement (bool): true if the message is a general statement, false otherwise.
+- response (string): Generate a response to the message only if it is a greeting.
+  For all other message types, return an empty string.
+- answer (string): Provide a detailed and professional answer to the message only if
+  it is a question. For all other message types, return an empty string.
+
+The `is_greeting`, `is_inappropriate`, `is_question`, and `is_statement` fields are
+mutually exclusive; only one of them can be true for a given message.
+"""
+
+
+class SingleShotAgentExecutor(IntentDetectionExecutor):
+    """Detects the intent of the user message and answers questions in one call.
+
+    The reply is an `IntentAnswerResult`, which routing reads like any intent
+    detection result; `to_question_response` turns its answer into the response
+    of the customer agent. Hedging works as for intent detection, and the local
+    classifier answers every intent but questions, which need the answer of the
+    call; the intent cache is not used, as it does not keep answers. When
+    `streaming`, the `answer` field is emitted as `ResponseDeltaEvent`s while the
+    reply arrives, and the call is not hedged.
+    """
+
+    result_type = IntentAnswerResult
+
+    def __init__(
+        self,
+        agent: ChatAgent,
+        classifier: IIntentClassifierService | None = None,
+        hedging: IIntentHedgingService | None = None,
+        streaming: bool = False,
+    ):
+        super().__init__(agent, classifier, hedging=hedging, id="single_shot_agent")
+        self.streaming = streaming
+
+    def _classify(self, text: str) -> IntentDetectionResult | None:
+        intent = super()._classify(text)
+        return None if intent is not None and intent.is_question else intent
+
+    async def _detect(
+        self,
+        messages: list[ChatMessage],
+        ctx: WorkflowContext[AgentExecutorResponse],
+    ) -> AgentRunResponse:
+        if not self.streaming:
+            response = await super()._detect(messages, ctx)
+        else:
+            field = JsonStringFieldStream("answer")
+            updates: list[AgentRunResponseUpdate] = []
+            with priority(Priority.HIGH):
+                async for update in self.agent.run_stream(messages):
+                    updates.append(update)
+                    if delta := field.feed(update.text):
+                        await ctx.add_event(ResponseDeltaEvent(self.id, delta))
+            response = AgentRunResponse.from_agent_run_response_updates(
+                updates, output_format_type=IntentAnswerResult
+            )
+        self._parse(response)
+        return response
+
+
+def create_chat_agent(chat_client: "AzureOpenAIChatClient") -> ChatAgent:
+    return create_cached_prompt_agent(chat_client, SYSTEM_PROMPT, IntentAnswerResult)
+
+
+def create_executor(
+    agent: ChatAgent,
+    classifier: IIntentClassifierService | None = None,
+    hedging: IIntentHedgingService | None = None,
+    streaming: bool = False,
+) -> SingleShotAgentExecutor:
+    return SingleShotAgentExecutor(agent, classifier, hedging, streaming)
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import time
+from collections import deque
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Container,
+    Iterable,
+    Iterator,
+)
+from functools import partial
+from typing import IO, Any
+
+from maf_workflow.models.batch_progress import BatchProgress
+from maf_workflow.models.batch_record import BatchRecord
+from maf_workflow.models.batch_result import BatchResult
+
+TEXT_FIELDS = ("text", "message", "body")
+ID_FIELDS = ("id", "request_id")
+# longest line read from a pipe
+PIPE_LINE_LIMIT = 16 * 1024 * 1024
+
+
+def read_records(
+    lines: Iterable[str],
+    completed: Container[int] = frozenset(),
+    text_field: str | None = None,
+    id_field: str | None = None,
+) -> Iterator[BatchRecord]:
+    """Reads JSONL lines lazily as batch records.
+
+    A line is either a JSON string or a JSON object with the message in
+    `text_field` (by default the first of `text`, `message` and `body`). The
+    offset of a record is its 0-based line number, blank lines included. A batch
+    is resumed by passing the offsets of the results already written as
+    `completed`, which holds whether they were written in input order or not.
+    Lines that cannot be read are returned with their error rather than raised.
+    """
+    for offset, line in enumerate(lines):
+        record = _read(offset, line, completed, text_field, id_field)
+        if record is not None:
+            yield record
+
+
+async def aread_records(
+    lines: AsyncIterable[str],
+    completed: Container[int] = frozenset(),
+    text_field: str | None = None,
+    id_field: str | None = None,
+) -> AsyncGenerator[BatchRecord]:
+    """Reads JSONL lines as batch records, as `read_records` does, as they come."""
+    offset = 0
+    async for line in lines:
+        record = _read(offset, line, completed, text_field, id_field)
+        offset += 1
+        if record is not None:
+            yield record
+
+
+async def read_pipe(pipe: IO[Any]) -> AsyncIterator[str]:
+    """Reads the lines of a pipe, such as stdin, on the event loop.
+
+    A thread blocked reading a pipe cannot be interrupted, so stopping a batch
+    would wait for the next line or the end of the input; a read on the loop is
+    cancelled at once. The pipe is closed once read. Regular files are not
+    pipes, they are read with `read_records`.
+    """
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=PIPE_LINE_LIMIT, loop=loop)
+    transport, _ = await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader, loop=loop), pipe
+    )
+    try:
+        while line := await reader.readline():
+            yield line.decode()
+    finally:
+        transport.close()
+
+
+async def run_batch(
+    records: Iterable[BatchRecord] | AsyncIterable[BatchRecord],
+    process: Callable[[str], Awaitable[str | None]],
+    concurrency: int = 8,
+    ordered: bool = True,
+    on_progress: Callable[[BatchProgress], None] | None = None,
+) -> AsyncGenerator[BatchResult]:
+    """Runs the records through `process`, at most `concurrency` at a time.
+
+    Results are yielded in input order when `ordered`, otherwise as they
+    complete. Records are pulled from `records` only when there is room, and in
+    ordered mode at most `4 * concurrency` results wait behind a slow record, so
+    memory stays bounded whatever the size of the input. Records are pulled on a
+    worker thread, so reading them from a file or stdin does not block the event
+    loop, and the results of the records in flight are yielded while it waits for
+    the next one. Errors are captured on the result of the record and do not stop
+    the batch. Records from an async iterable, such as `aread_records`, are
+    awaited on the loop instead, so stopping the batch does not wait for a read.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    window = 4 * concurrency if ordered else concurrency
+    progress = BatchProgress()
+    started = time.monotonic()
+
+    async def run_one(record: BatchRecord) -> BatchResult:
+        async with semaphore:
+            return await _process(record, process)
+
+    pending: deque[asyncio.Task[BatchResult]] = deque()
+    if isinstance(records, AsyncIterable):
+        next_record = partial(anext, aiter(records), None)
+    else:
+        next_record = partial(asyncio.to_thread, next, iter(records), None)
+    fetch: asyncio.Future[BatchRecord | None] | None = None
+    exhausted = False
+    try:
+        while True:
+            if fetch is None and not exhausted and len(pending) < window:
+                fetch = asyncio.ensure_future(next_record())
+            if fetch is not None and (fetch.done() or not pending):
+                record = await fetch
+                fetch = None
+                if record is None:
+                    exhausted = True
+                else:
+                    pending.append(asyncio.create_task(run_one(record)))
+                continue
+            if not pending:
+                break
+
+            # the next record or the next result, whichever comes first
+            waiting: set[asyncio.Future[Any]] = (
+                {pending[0]} if ordered else set(pending)
+            )
+            if fetch is not None:
+                waiting.add(fetch)
+            await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+            if ordered:
+                done: list[BatchResult] = []
+                while pending and pending[0].done():
+                    done.append(pending.popleft().result())
+            else:
+                done = sorted(
+                    (t.result() for t in pending if t.done()), key=lambda r: r.offset
+                )
+                pending = deque(t for t in pending if not t.done())
+
+            for result in done:
+                progress.processed += 1
+                progress.failed += result.error is not None
+                progress.elapsed_seconds = time.monotonic() - started
+                if on_progress:
+                    on_progress(progress)
+                yield result
+    finally:
+        # the consumer stopped early
+        if fetch is not None:
+            fetch.cancel()
+        for task in pending:
+            task.cancel()
+
+
+def _read(
+    offset: int,
+    line: str,
+    completed: Container[int],
+    text_field: str | None,
+    id_field: str | None,
+) -> BatchRecord | None:
+    if offset in completed or not line.strip():
+        return None
+    try:
+        return _parse(offset, json.loads(line), text_field, id_field)
+    except ValueError as e:
+        return BatchRecord(offset=offset, error=f"{type(e).__name__}: {e}")
+
+
+def _parse(
+    offset: int, data: object, text_field: str | None, id_field: str | None
+) -> BatchRecord:
+    if isinstance(data, str):
+        return BatchRecord(offset=offset, text=data)
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON string or object.")
+
+    fields = (text_field,) if text_field else TEXT_FIELDS
+    text = next((data[f] for f in fields if isinstance(data.get(f), str)), None)
+    if text is None:
+        raise ValueError(f"No message field ({', '.join(fields)}).")
+
+    ids = (id_field,) if id_field else ID_FIELDS
+    record_id = next((str(data[f]) for f in ids if data.get(f) is not None), None)
+    return BatchRecord(offset=offset, id=record_id, text=text)
+
+
+async def _process(
+    record: BatchRecord, process: Callable[[str], Awaitable[str | None]]
+) -> BatchResult:
+    started = time.monotonic()
+    result = BatchResult(offset=record.offset, id=record.id, error=record.error)
+    if record.text is not None:
+        try:
+            result.output = await process(record.text)
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+    result.elapsed_seconds = time.monotonic() - started
+    return result
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+from collections.abc import Callable, Hashable, MutableSequence, Sequence
+from contextlib import AsyncExitStack
+from types import TracebackType
+from typing import Any, Self
+
+from agent_framework import (
+    AggregateContextProvider,
+    ChatMessage,
+    Context,
+    ContextProvider,
+)
+
+from maf_workflow.utils.single_flight import SingleFlight
+from maf_workflow.utils.ttl_lru_cache import TTLLRUCache
+
+type ContextKey = Callable[[ChatMessage | MutableSequence[ChatMessage]], Hashable]
+"""Cache key of the context of an invocation, from its messages."""
+
+logger = logging.getLogger(__name__)
+
+
+def is_empty(context: Context) -> bool:
+    """True if the context adds nothing to the invocation."""
+    return not (context.instructions or context.messages or context.tools)
+
+
+class _WrappingContextProvider(ContextProvider):
+    # passes the hooks other than `invoking` on to the wrapped provider
+
+    def __init__(self, provider: ContextProvider):
+        self.provider = provider
+        self._exit_stack: AsyncExitStack | None = None
+
+    async def thread_created(self, thread_id: str | None = None) -> None:
+        await self.provider.thread_created(thread_id)
+
+    async def invoked(
+        self,
+        request_messages: ChatMessage | Sequence[ChatMessage],
+        response_messages: ChatMessage | Sequence[ChatMessage] | None = None,
+        invoke_exception: Exception | None = None,
+        **kwargs: Any,
+    ) -> None:
+        await self.provider.invoked(
+            request_messages, response_messages, invoke_exception, **kwargs
+        )
+
+    async def __aenter__(self) -> Self:
+        self._exit_stack = AsyncExitStack()
+        await self._exit_stack.enter_async_context(self.provider)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        if self._exit_stack is not None:
+            await self._exit_stack.__aexit__(exc_type, exc_val, exc_tb)
+            self._exit_stack = None
+
+
+class CachedContextProvider(_WrappingContextProvider):
+    """Reuses the context of a provider for `ttl` seconds.
+
+    Contexts are cached under `key` of the invocation messages, a single entry
+    by default, which suits providers made for one user. An empty context, such
+    as a profile that is not found, is cached for `negative_ttl` instead, and a
+    failure is not cached. Concurrent misses for the same key share one call.
+    Pass the same `cache` to wrappers of providers created per agent to share
+    their entries, with keys that tell the providers apart.
+    """
+
+    def __init__(
+        self,
+        provider: ContextProvider,
+        ttl: float,
+        negative_ttl: float | None = None,
+        key: ContextKey | None = None,
+        cache: TTLLRUCache[Hashable, Context] | None = None,
+        max_entries: int = 1_000,
+    ):
+        super().__init__(provider)
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.key = key
+        self.cache = TTLLRUCache(max_entries) if cache is None else cache
+        self._in_flight: SingleFlight[Hashable, Context] = SingleFlight()
+
+    async def invoking(
+        self, messages: ChatMessage | MutableSequence[ChatMessage], **kwargs: Any
+    ) -> Context:
+        key = None if self.key is None else self.key(messages)
+        context = self.cache.get(key)
+        if context is not None:
+            return context
+        return await self._in_flight.do(key, lambda: self._fetch(key, messages, kwargs))
+
+    async def _fetch(
+        self,
+        key: Hashable,
+        messages: ChatMessage | MutableSequence[ChatMessage],
+        kwargs: dict[str, Any],
+    ) -> Context:
+        context = await self.provider.invoking(messages, **kwargs)
+        ttl = self.negative_ttl if is_empty(context) else self.ttl
+        self.cache.set(key, context, ttl=ttl)
+        return context
+
+
+class TimeoutContextProvider(_WrappingContextProvider):
+    """Uses `fallback` when a provider takes longer than `timeout` seconds or fails.
+
+    The invocation then goes ahead without the context of the provider, or with
+    the fallback context, instead of being held up or failed by it.
+    """
+
+    def __init__(
+        self,
+        provider: ContextProvider,
+        timeout: float,
+        fallback: Context | None = None,
+    ):
+        super().__init__(provider)
+        self.timeout = timeout
+        self.fallback = Context() if fallback is None else fallback
+        self.timeouts = 0
+        self.failures = 0
+
+    async def invoking(
+        self, messages: ChatMessage | MutableSequence[ChatMessage], **kwargs: Any
+    ) -> Context:
+        try:
+            async with asyncio.timeout(self.timeout):
+                return await self.provider.invoking(messages, **kwargs)
+        except TimeoutError:
+            self.timeouts += 1
+            logger.warning(
+                "%s timed out after %ss", type(self.provider).__name__, self.timeout
+            )
+        except Exception:
+            self.failures += 1
+            logger.warning("%s failed", type(self.provider).__name__, exc_info=True)
+        return self.fallback
+
+
+class ConcurrentContextProvider(AggregateContextProvider):
+    """Aggregates providers, each bounded by a timeout with a fallback.
+
+    All the `invoking` hooks run concurrently, so context assembly takes as long
+    as the slowest provider, at most `timeout` seconds. Providers that are not
+    already a `TimeoutContextProvider` are wrapped in one with `timeout` and
+    `fallback`; wrap them yourself for other settings. The instructions of the
+    providers are joined by line breaks, in the order of the providers.
+    """
+
+    def __init__(
+        self,
+        context_providers: ContextProvider | Sequence[ContextProvider] | None = None,
+        timeout: float = 1.0,
+        fallback: Context | None = None,
+    ):
+        self.timeout = timeout
+        self.fallback = fallback
+        super().__init__()
+        if isinstance(context_providers, ContextProvider):
+            context_providers = [context_providers]
+        for provider in context_providers or []:
+            self.add(provider)
+
+    def add(self, context_provider: ContextProvider) -> None:
+        if not isinstance(context_provider, TimeoutContextProvider):
+            context_provider = TimeoutContextProvider(
+                context_provider, self.timeout, self.fallback
+            )
+        super().add(context_provider)
+
+    async def invoking(
+        self, messages: ChatMessage | MutableSequence[ChatMessage], **kwargs: Any
+    ) -> Context:
+        contexts = await asyncio.gather(
+            *[provider.invoking(messages, **kwargs) for provider in self.providers]
+        )
+        return Context(
+            instructions="\n".join(c.instructions for c in contexts if c.instructions)
+            or None,
+            messages=[m for c in contexts for m in c.messages],
+            tools=[t for c in contexts for t in c.tools],
+        )
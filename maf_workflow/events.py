@@ -0,0 +1,17 @@
+from agent_framework import AgentExecutorResponse, ExecutorEvent
+
+
+class ResponseDeltaEvent(ExecutorEvent):
+    """The next piece of an answer, emitted while the answer is streamed."""
+
+    def __init__(self, executor_id: str, data: str):
+        super().__init__(executor_id, data)
+        self.data: str = data
+
+
+class FanOutResponseEvent(ExecutorEvent):
+    """The response of one agent of a fan-out, emitted as soon as it arrives."""
+
+    def __init__(self, executor_id: str, data: AgentExecutorResponse):
+        super().__init__(executor_id, data)
+        self.data: AgentExecutorResponse = data
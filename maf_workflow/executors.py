@@ -3,6 +3,7 @@ from typing import Callable
 from agent_framework import (
     AgentExecutorRequest,
     AgentExecutorResponse,
+    AgentRunResponse,
     ChatMessage,
     Role,
     WorkflowContext,
@@ -10,12 +11,28 @@ from agent_framework import (
 )
 from typing_extensions import Never
 
+from maf_workflow.models.intent_answer_result import IntentAnswerResult
 from maf_workflow.models.intent_detection_result import IntentDetectionResult
 from maf_workflow.models.question_response import QuestionResponse
 
 
+def get_intent(response: AgentExecutorResponse) -> IntentDetectionResult:
+    """Returns the intent carried by an intent detection response.
+
+    The reply is parsed at most once per run; the typed result is kept on
+    `agent_run_response.value` so that routing and the executors downstream
+    share the same instance.
+    """
+    run_response = response.agent_run_response
+    if not isinstance(run_response.value, IntentDetectionResult):
+        run_response.value = IntentDetectionResult.model_validate_json(
+            run_response.text
+        )
+    return run_response.value
+
+
 async def helper_fn(response: AgentExecutorResponse, flag: str, fn: Callable):
-    intent = IntentDetectionResult.model_validate_json(response.agent_run_response.text)
+    intent = get_intent(response)
     if getattr(intent, flag):
         await fn(intent)
     else:
@@ -57,11 +74,20 @@ async def handle_statement(
     )
 
 
+@executor(id="dispatch_request")
+async def dispatch_request(
+    request: AgentExecutorRequest, ctx: WorkflowContext[AgentExecutorRequest]
+) -> None:
+    # the events of the start executor are only streamed once it is done, so an
+    # executor that streams its reply is put after this one
+    await ctx.send_message(request)
+
+
 @executor(id="to_assistant_request")
 async def to_assistant_request(
     response: AgentExecutorResponse, ctx: WorkflowContext[AgentExecutorRequest]
 ) -> None:
-    intent = IntentDetectionResult.model_validate_json(response.agent_run_response.text)
+    intent = get_intent(response)
     request = AgentExecutorRequest(
         messages=[ChatMessage(Role.USER, text=intent.message_content)],
         should_respond=True,
@@ -69,9 +95,38 @@ async def to_assistant_request(
     await ctx.send_message(request)
 
 
+@executor(id="to_question_response")
+async def to_question_response(
+    response: AgentExecutorResponse, ctx: WorkflowContext[AgentExecutorResponse]
+) -> None:
+    # the answer of a single shot reply, as the customer agent would respond
+    intent = get_intent(response)
+    if not isinstance(intent, IntentAnswerResult):
+        intent = IntentAnswerResult.model_validate_json(
+            response.agent_run_response.text
+        )
+    answer = QuestionResponse(
+        user_question=intent.message_content, response=intent.answer
+    )
+    await ctx.send_message(
+        AgentExecutorResponse(
+            "to_question_response",
+            AgentRunResponse(
+                messages=[ChatMessage(Role.ASSISTANT, text=answer.model_dump_json())],
+                value=answer,
+            ),
+        )
+    )
+
+
 @executor(id="question_response")
 async def handle_question_response(
     response: AgentExecutorResponse, ctx: WorkflowContext[Never, str]
 ) -> None:
-    qn_response = QuestionResponse.model_validate_json(response.agent_run_response.text)
+    run_response = response.agent_run_response
+    qn_response = (
+        run_response.value
+        if isinstance(run_response.value, QuestionResponse)
+        else QuestionResponse.model_validate_json(run_response.text)
+    )
     await ctx.yield_output(f"{qn_response.user_question}\n{qn_response.response}")
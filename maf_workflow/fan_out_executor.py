@@ -0,0 +1,123 @@
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from typing import Any
+
+from agent_framework import (
+    AgentExecutorRequest,
+    AgentExecutorResponse,
+    AgentProtocol,
+    AgentRunResponse,
+    ChatMessage,
+    Executor,
+    Role,
+    WorkflowContext,
+    handler,
+)
+
+from maf_workflow.events import FanOutResponseEvent
+from maf_workflow.utils.fan_out import gather_first
+
+
+class IncrementalAggregator(ABC):
+    """Combines the responses of a fan-out as they arrive.
+
+    `add` gets each response as soon as its agent has answered, with the ones
+    received before it, and can yield partial output, so consumers render the
+    first answers while the others are still generated. `complete` gets all the
+    responses once collection stops. The state of a run is in the arguments, so
+    one aggregator can serve concurrent runs.
+    """
+
+    @abstractmethod
+    async def add(
+        self,
+        response: AgentExecutorResponse,
+        received: Sequence[AgentExecutorResponse],
+        ctx: WorkflowContext[Any, Any],
+    ) -> None: ...
+
+    async def complete(
+        self,
+        responses: Sequence[AgentExecutorResponse],
+        ctx: WorkflowContext[Any, Any],
+    ) -> None:
+        """Called once with all the responses; does nothing by default."""
+
+
+class FanOutExecutor(Executor):
+    """Runs agents concurrently and passes on the responses that came first.
+
+    Fan-in edges wait for every participant, so the slowest one sets the latency
+    of each request. This executor runs the agents itself instead and stops
+    collecting once `quorum` of them have answered (1 for the first successful
+    answer, all by default) or `timeout` seconds have passed, cancelling the
+    model calls still in flight. Failed agents are skipped.
+
+    Each response is emitted as a `FanOutResponseEvent` as soon as it arrives.
+    With an `aggregator`, the executor ends the workflow and the responses go to
+    it one by one; without, they are sent in the order they finished, as the
+    `list[AgentExecutorResponse]` a `ConcurrentBuilder` aggregator takes.
+    The framework streams the events of the start executor only once it is
+    done, so for live partial output the fan-out should come after it.
+    """
+
+    def __init__(
+        self,
+        agents: Sequence[AgentProtocol],
+        id: str = "fan_out",
+        quorum: int | None = None,
+        timeout: float | None = None,
+        aggregator: IncrementalAggregator | None = None,
+    ):
+        self.agents = list(agents)
+        self.quorum = quorum
+        self.timeout = timeout
+        self.aggregator = aggregator
+        super().__init__(id=id)
+
+    @handler
+    async def from_request(
+        self,
+        request: AgentExecutorRequest,
+        ctx: WorkflowContext[list[AgentExecutorResponse], Any],
+    ) -> None:
+        await self._fan_out(list(request.messages), ctx)
+
+    @handler
+    async def from_str(
+        self, prompt: str, ctx: WorkflowContext[list[AgentExecutorResponse], Any]
+    ) -> None:
+        await self._fan_out([ChatMessage(Role.USER, text=prompt)], ctx)
+
+    async def _fan_out(
+        self,
+        messages: list[ChatMessage],
+        ctx: WorkflowContext[list[AgentExecutorResponse], Any],
+    ) -> None:
+        received: list[AgentExecutorResponse] = []
+
+        def call(agent: AgentProtocol):
+            return lambda: agent.run(messages)
+
+        async def on_response(i: int, run_response: AgentRunResponse) -> None:
+            agent = self.agents[i]
+            response = AgentExecutorResponse(
+                agent.name or agent.id,
+                run_response,
+                full_conversation=messages + list(run_response.messages),
+            )
+            await ctx.add_event(FanOutResponseEvent(self.id, response))
+            if self.aggregator is not None:
+                await self.aggregator.add(response, list(received), ctx)
+            received.append(response)
+
+        await gather_first(
+            [call(agent) for agent in self.agents],
+            self.quorum,
+            self.timeout,
+            on_response,
+        )
+        if self.aggregator is not None:
+            await self.aggregator.complete(list(received), ctx)
+        else:
+            await ctx.send_message(received)
@@ -1,41 +1,139 @@
-"""Defines our top level DI container.
-Utilizes the Lagom library for dependency injection, see more at:
-
-- https://lagom-di.readthedocs.io/en/latest/
-- https://github.com/meadsteve/lagom
-"""
-
-import logging
-import os
-
-from dotenv import load_dotenv
-from lagom import Container, dependency_definition
-
-from maf_workflow.protocols.i_azure_open_ai_chat_client_service import (
-    IAzureOpenAIChatClientService,
-)
-
-load_dotenv(dotenv_path=".env")
-
-
-container = Container()
-"""The top level DI container for our application."""
-
-
-# Register our dependencies ------------------------------------------------------------
-
-
-@dependency_definition(container, singleton=True)
-def logger() -> logging.Logger:
-    logging.basicConfig(level=os.getenv("LOG_LEVEL", "ERROR"))
-    logging.Formatter(fmt=" %(name)s :: %(levelname)-8s :: %(message)s")
-    return logging.getLogger("azure_python")
-
-
-@dependency_definition(container, singleton=True)
-def azure_open_ai_chat_client_service() -> IAzureOpenAIChatClientService:
-    from maf_workflow.services.azure_open_ai_chat_client_service import (
-        AzureOpenAIChatClientService,
-    )
-
-    return container[AzureOpenAIChatClientService]
+"""Defines our top level DI container.
+Utilizes the Lagom library for dependency injection, see more at:
+
+- https://lagom-di.readthedocs.io/en/latest/
+- https://github.com/meadsteve/lagom
+"""
+
+import logging
+import os
+
+from dotenv import load_dotenv
+from lagom import Container, dependency_definition
+
+from maf_workflow.protocols.i_azure_open_ai_chat_client_service import (
+    IAzureOpenAIChatClientService,
+)
+from maf_workflow.protocols.i_chat_history_service import IChatHistoryService
+from maf_workflow.protocols.i_chat_message_store_service import (
+    IChatMessageStoreService,
+)
+from maf_workflow.protocols.i_intent_cache_service import IIntentCacheService
+from maf_workflow.protocols.i_intent_classifier_service import (
+    IIntentClassifierService,
+)
+from maf_workflow.protocols.i_intent_hedging_service import IIntentHedgingService
+from maf_workflow.protocols.i_question_response_cache_service import (
+    IQuestionResponseCacheService,
+)
+from maf_workflow.protocols.i_workflow_checkpoint_service import (
+    IWorkflowCheckpointService,
+)
+from maf_workflow.protocols.i_workflow_metrics_service import (
+    IWorkflowMetricsService,
+)
+
+load_dotenv(dotenv_path=".env")
+
+
+container = Container()
+"""The top level DI container for our application."""
+
+
+# Register our dependencies ------------------------------------------------------------
+
+
+@dependency_definition(container, singleton=True)
+def logger() -> logging.Logger:
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "ERROR"))
+    logging.Formatter(fmt=" %(name)s :: %(levelname)-8s :: %(message)s")
+    return logging.getLogger("azure_python")
+
+
+@dependency_definition(container, singleton=True)
+def azure_open_ai_chat_client_service() -> IAzureOpenAIChatClientService:
+    if os.getenv("MOCK_CHAT_CLIENT", "false").lower() == "true":
+        from maf_workflow.services.mock_chat_client_service import (
+            MockChatClientService,
+        )
+
+        return container[MockChatClientService]
+
+    from maf_workflow.services.azure_open_ai_chat_client_service import (
+        AzureOpenAIChatClientService,
+    )
+
+    return container[AzureOpenAIChatClientService]
+
+
+@dependency_definition(container, singleton=True)
+def intent_classifier_service() -> IIntentClassifierService:
+    from maf_workflow.services.rule_based_intent_classifier_service import (
+        RuleBasedIntentClassifierService,
+    )
+
+    return container[RuleBasedIntentClassifierService]
+
+
+@dependency_definition(container, singleton=True)
+def intent_cache_service() -> IIntentCacheService:
+    from maf_workflow.services.intent_cache_service import IntentCacheService
+
+    return container[IntentCacheService]
+
+
+@dependency_definition(container, singleton=True)
+def intent_hedging_service() -> IIntentHedgingService:
+    from maf_workflow.services.intent_hedging_service import IntentHedgingService
+
+    return container[IntentHedgingService]
+
+
+@dependency_definition(container, singleton=True)
+def question_response_cache_service() -> IQuestionResponseCacheService:
+    from maf_workflow.services.question_response_cache_service import (
+        QuestionResponseCacheService,
+    )
+
+    return container[QuestionResponseCacheService]
+
+
+@dependency_definition(container, singleton=True)
+def workflow_metrics_service() -> IWorkflowMetricsService:
+    from maf_workflow.services.workflow_metrics_service import (
+        WorkflowMetricsService,
+    )
+
+    return container[WorkflowMetricsService]
+
+
+@dependency_definition(container, singleton=True)
+def chat_message_store_service() -> IChatMessageStoreService:
+    from maf_workflow.services.sqlite_chat_message_store_service import (
+        SQLiteChatMessageStoreService,
+    )
+
+    return container[SQLiteChatMessageStoreService]
+
+
+@dependency_definition(container, singleton=True)
+def chat_history_service() -> IChatHistoryService:
+    from maf_workflow.services.chat_history_service import ChatHistoryService
+
+    return container[ChatHistoryService]
+
+
+@dependency_definition(container, singleton=True)
+def workflow_checkpoint_service() -> IWorkflowCheckpointService:
+    if os.getenv("WORKFLOW_CHECKPOINT_STORAGE", "file").lower() == "sqlite":
+        from maf_workflow.services.sqlite_workflow_checkpoint_service import (
+            SQLiteWorkflowCheckpointService,
+        )
+
+        return container[SQLiteWorkflowCheckpointService]
+
+    from maf_workflow.services.file_workflow_checkpoint_service import (
+        FileWorkflowCheckpointService,
+    )
+
+    return container[FileWorkflowCheckpointService]
@@ -0,0 +1,146 @@
+import copy
+import time
+from collections import defaultdict
+from typing import Any
+
+from agent_framework import (
+    AgentExecutorRequest,
+    AgentExecutorResponse,
+    AgentRunEvent,
+    AgentRunResponse,
+    CheckpointStorage,
+    Executor,
+    InProcRunnerContext,
+    Message,
+    WorkflowEvent,
+)
+from opentelemetry import trace
+from pydantic import BaseModel
+
+from maf_workflow.protocols.i_workflow_metrics_service import (
+    IWorkflowMetricsService,
+)
+from maf_workflow.utils.prompt_cache import cached_tokens
+
+tracer = trace.get_tracer(__name__)
+
+
+class InstrumentedRunnerContext(InProcRunnerContext):
+    """Runner context that keeps what executor instrumentation needs of a run.
+
+    It remembers when each message was sent, to measure how long it waited for its
+    executor, and adds up the token usage reported in `AgentRunEvent`s by executor,
+    including the prompt tokens served from the prompt cache.
+    """
+
+    def __init__(self, checkpoint_storage: CheckpointStorage | None = None) -> None:
+        super().__init__(checkpoint_storage)
+        self.created_at = time.perf_counter()
+        self._sent_at: dict[int, float] = {}
+        self._usage: defaultdict[str, list[int]] = defaultdict(lambda: [0, 0, 0])
+
+    async def send_message(self, message: Message) -> None:
+        self._sent_at[id(message.data)] = time.perf_counter()
+        await super().send_message(message)
+
+    async def add_event(self, event: WorkflowEvent) -> None:
+        if isinstance(event, AgentRunEvent) and isinstance(
+            event.data, AgentRunResponse
+        ):
+            usage = event.data.usage_details
+            if usage is not None and event.executor_id is not None:
+                tokens = self._usage[event.executor_id]
+                tokens[0] += usage.input_token_count or 0
+                tokens[1] += usage.output_token_count or 0
+                tokens[2] += cached_tokens(usage)
+        await super().add_event(event)
+
+    def sent_at(self, message: Any) -> float:
+        """When the message was sent; the start of the run for the initial one."""
+        return self._sent_at.get(id(message), self.created_at)
+
+    def pop_usage(self, executor_id: str) -> tuple[int, int, int]:
+        """Input, output and cached tokens reported by the executor since last call."""
+        input_tokens, output_tokens, cached = self._usage.pop(executor_id, (0, 0, 0))
+        return input_tokens, output_tokens, cached
+
+
+def payload_size(message: Any) -> int:
+    """Characters of content in a workflow message."""
+    if isinstance(message, str):
+        return len(message)
+    if isinstance(message, AgentExecutorRequest):
+        return sum(len(m.text) for m in message.messages)
+    if isinstance(message, AgentExecutorResponse):
+        return len(message.agent_run_response.text)
+    if isinstance(message, BaseModel):
+        return len(message.model_dump_json())
+    return 0
+
+
+def instrument_executor(
+    executor: Executor, metrics: IWorkflowMetricsService
+) -> Executor:
+    """Returns a copy of the executor whose executions are measured.
+
+    Each execution runs in an OpenTelemetry span and is recorded in `metrics`.
+    Queue wait and token usage are only known with an `InstrumentedRunnerContext`.
+    The executor itself is left untouched, so it can still be shared.
+    """
+    execute = executor.execute
+
+    async def instrumented_execute(
+        message: Any,
+        source_executor_ids: list[str],
+        shared_state: Any,
+        runner_context: Any,
+        *args: Any,
+        **kwargs: Any,
+    ) -> None:
+        started = time.perf_counter()
+        data = message.data if isinstance(message, Message) else message
+        queue_wait = 0.0
+        if isinstance(runner_context, InstrumentedRunnerContext):
+            queue_wait = started - runner_context.sent_at(data)
+        size = payload_size(data)
+
+        failed = False
+        with tracer.start_as_current_span(f"executor {executor.id}") as span:
+            span.set_attribute("executor.id", executor.id)
+            span.set_attribute("executor.queue_wait_ms", queue_wait * 1000)
+            span.set_attribute("message.payload_size", size)
+            try:
+                await execute(
+                    message,
+                    source_executor_ids,
+                    shared_state,
+                    runner_context,
+                    *args,
+                    **kwargs,
+                )
+            except Exception:
+                failed = True
+                raise
+            finally:
+                input_tokens, output_tokens, cached = 0, 0, 0
+                if isinstance(runner_context, InstrumentedRunnerContext):
+                    input_tokens, output_tokens, cached = runner_context.pop_usage(
+                        executor.id
+                    )
+                span.set_attribute("gen_ai.usage.input_tokens", input_tokens)
+                span.set_attribute("gen_ai.usage.output_tokens", output_tokens)
+                span.set_attribute("gen_ai.usage.cached_input_tokens", cached)
+                metrics.record(
+                    executor.id,
+                    time.perf_counter() - started,
+                    queue_wait,
+                    input_tokens=input_tokens,
+                    output_tokens=output_tokens,
+                    cached_input_tokens=cached,
+                    payload_size=size,
+                    failed=failed,
+                )
+
+    instrumented = copy.copy(executor)
+    setattr(instrumented, "execute", instrumented_execute)
+    return instrumented
@@ -0,0 +1,88 @@
+import asyncio
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterable, Callable, Sequence
+
+from agent_framework import (
+    ExecutorCompletedEvent,
+    ExecutorInvokedEvent,
+    WorkflowEvent,
+)
+
+from maf_workflow.models.latency_summary import LatencySummary
+from maf_workflow.models.load_report import LoadReport
+
+
+async def generate_load(
+    run_stream: Callable[[str], AsyncIterable[WorkflowEvent]],
+    messages: Sequence[str],
+    rps: float,
+    duration_seconds: float,
+    max_in_flight: int = 1000,
+) -> LoadReport:
+    """Drives workflow runs at a target arrival rate and reports their latency.
+
+    Runs are started on a fixed schedule (open loop), whether or not the earlier
+    ones have completed, and their latency is measured from their scheduled
+    start, so a saturated workflow shows up as latency rather than as a lower
+    request rate. Messages are used round robin. The latency of each executor is
+    taken from the invoked and completed events of the run.
+    """
+    total = max(1, int(rps * duration_seconds))
+    semaphore = asyncio.Semaphore(max_in_flight)
+    latencies: list[float] = []
+    executor_latencies: dict[str, list[float]] = defaultdict(list)
+    errors = 0
+
+    async def run_one(message: str, scheduled: float) -> None:
+        nonlocal errors
+        async with semaphore:
+            try:
+                await _measure(run_stream(message), executor_latencies)
+            except Exception:
+                errors += 1
+                return
+        latencies.append(time.perf_counter() - scheduled)
+
+    started = time.perf_counter()
+    tasks: set[asyncio.Task[None]] = set()
+    for i in range(total):
+        scheduled = started + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(run_one(messages[i % len(messages)], scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+
+    return LoadReport(
+        target_rps=rps,
+        duration_seconds=time.perf_counter() - started,
+        requests=total,
+        errors=errors,
+        latency=LatencySummary.from_samples(latencies),
+        executors={
+            executor_id: LatencySummary.from_samples(samples)
+            for executor_id, samples in sorted(executor_latencies.items())
+        },
+    )
+
+
+async def _measure(
+    events: AsyncIterable[WorkflowEvent], executor_latencies: dict[str, list[float]]
+) -> None:
+    # the start executor runs before the first event is delivered, time it from
+    # the start of the run
+    run_started: float | None = time.perf_counter()
+    invoked: dict[str, float] = {}
+    async for event in events:
+        if isinstance(event, ExecutorInvokedEvent):
+            invoked[event.executor_id] = run_started or time.perf_counter()
+            run_started = None
+        elif isinstance(event, ExecutorCompletedEvent):
+            started = invoked.pop(event.executor_id, None)
+            if started is not None:
+                executor_latencies[event.executor_id].append(
+                    time.perf_counter() - started
+                )
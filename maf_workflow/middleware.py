@@ -0,0 +1,120 @@
+import asyncio
+import json
+from collections.abc import Awaitable, Callable, Mapping
+from typing import Any
+
+from agent_framework import FunctionInvocationContext, FunctionMiddleware
+
+from maf_workflow.models.cache_stats import CacheStats
+from maf_workflow.utils.single_flight import SingleFlight
+from maf_workflow.utils.ttl_lru_cache import TTLLRUCache
+
+type ToolCallKey = tuple[str, str]
+"""Tool name and canonical JSON of the arguments of a call."""
+
+
+def tool_call_key(context: FunctionInvocationContext) -> ToolCallKey:
+    """Keys a call by tool name and arguments, whatever their order."""
+    arguments = json.dumps(
+        context.arguments.model_dump(mode="json"),
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return context.function.name, arguments
+
+
+class ToolResultCacheMiddleware(FunctionMiddleware):
+    """Reuses the results of `ai_function` tools called with the same arguments.
+
+    Only read-only tools should be cached: those listed in `ttls`, cached for
+    their number of seconds, and with `default_ttl` all the others. Results are
+    kept in a cache bounded by `max_entries` and by `max_bytes` of their string
+    form, shared by the agents using the middleware, so repeated calls within a
+    run and across runs return at once. Concurrent identical calls share one
+    invocation. Failures and `None` results are not cached.
+
+    Add it after middleware that changes results per user, so the raw result
+    of the tool is cached.
+    """
+
+    def __init__(
+        self,
+        ttls: Mapping[str, float] | None = None,
+        default_ttl: float | None = None,
+        max_entries: int = 1_000,
+        max_bytes: int | None = None,
+        cache: TTLLRUCache[ToolCallKey, Any] | None = None,
+    ):
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.cache = (
+            TTLLRUCache(max_entries, max_bytes=max_bytes) if cache is None else cache
+        )
+        self._in_flight: SingleFlight[ToolCallKey, Any] = SingleFlight()
+
+    @property
+    def coalesced(self) -> int:
+        """Calls that waited for an identical call in flight."""
+        return self._in_flight.coalesced
+
+    def get_stats(self) -> CacheStats:
+        return self.cache.get_stats()
+
+    async def process(
+        self,
+        context: FunctionInvocationContext,
+        next: Callable[[FunctionInvocationContext], Awaitable[None]],
+    ) -> None:
+        ttl = self.ttls.get(context.function.name, self.default_ttl)
+        if ttl is None:
+            await next(context)
+            return
+
+        key = tool_call_key(context)
+        result = self.cache.get(key)
+        if result is None:
+            result = await self._in_flight.do(
+                key, lambda: self._invoke(key, ttl, context, next)
+            )
+        context.result = result
+
+    async def _invoke(
+        self,
+        key: ToolCallKey,
+        ttl: float,
+        context: FunctionInvocationContext,
+        next: Callable[[FunctionInvocationContext], Awaitable[None]],
+    ) -> Any:
+        await next(context)
+        if context.result is not None:
+            self.cache.set(key, context.result, ttl=ttl, size=len(str(context.result)))
+        return context.result
+
+
+class ToolConcurrencyMiddleware(FunctionMiddleware):
+    """Caps the tool calls running at once.
+
+    The framework runs the tool calls of a turn concurrently; this bounds them
+    to `max_concurrency` across the agents sharing the middleware, so a turn
+    with many calls does not flood the backends behind the tools. Add it first,
+    so the calls waiting for a slot do not hold anything else.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.running = 0
+        self.max_running = 0
+
+    async def process(
+        self,
+        context: FunctionInvocationContext,
+        next: Callable[[FunctionInvocationContext], Awaitable[None]],
+    ) -> None:
+        async with self._slots:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            try:
+                await next(context)
+            finally:
+                self.running -= 1
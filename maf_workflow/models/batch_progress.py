@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field, computed_field
+
+
+class BatchProgress(BaseModel):
+    processed: int = Field(default=0, description="Number of records processed.")
+    failed: int = Field(default=0, description="Number of records that failed.")
+    elapsed_seconds: float = Field(
+        default=0.0, description="Time since the batch started."
+    )
+
+    @computed_field
+    @property
+    def rate(self) -> float:
+        """Records processed per second."""
+        return self.processed / self.elapsed_seconds if self.elapsed_seconds else 0.0
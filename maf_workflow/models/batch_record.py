@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+
+
+class BatchRecord(BaseModel):
+    offset: int = Field(..., description="0-based line number in the input.")
+    id: str | None = Field(default=None, description="Id of the record, if any.")
+    text: str | None = Field(default=None, description="The message content.")
+    error: str | None = Field(
+        default=None, description="Why the line could not be read, if it could not."
+    )
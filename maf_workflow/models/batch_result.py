@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+
+
+class BatchResult(BaseModel):
+    offset: int = Field(..., description="0-based line number in the input.")
+    id: str | None = Field(default=None, description="Id of the record, if any.")
+    output: str | None = Field(default=None, description="The workflow output.")
+    error: str | None = Field(default=None, description="The error, if it failed.")
+    elapsed_seconds: float = Field(
+        default=0.0, description="Time taken to process the record."
+    )
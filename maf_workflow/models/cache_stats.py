@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field, computed_field
+
+
+class CacheStats(BaseModel):
+    hits: int = Field(default=0, description="Number of lookups served from cache.")
+    misses: int = Field(default=0, description="Number of lookups not in cache.")
+    evictions: int = Field(
+        default=0, description="Number of entries evicted to stay within bounds."
+    )
+    expirations: int = Field(
+        default=0, description="Number of entries dropped because their TTL expired."
+    )
+    entries: int = Field(default=0, description="Number of entries in cache.")
+    size_bytes: int = Field(default=0, description="Approximate size of the entries.")
+
+    @computed_field
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
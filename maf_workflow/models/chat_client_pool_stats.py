@@ -0,0 +1,38 @@
+from pydantic import BaseModel, Field
+
+
+class ChatClientPoolStats(BaseModel):
+    max_connections: int = Field(
+        ..., description="Maximum number of connections in the pool."
+    )
+    max_keepalive_connections: int = Field(
+        ..., description="Maximum number of idle connections kept alive."
+    )
+    keepalive_expiry: float = Field(
+        ..., description="Seconds an idle connection is kept alive."
+    )
+    http2: bool = Field(..., description="True if HTTP/2 is enabled for the pool.")
+    connections: int = Field(
+        default=0, description="Number of connections currently open."
+    )
+    idle_connections: int = Field(
+        default=0, description="Number of open idle connections."
+    )
+    requests: int = Field(
+        default=0, description="Number of requests sent through the pool."
+    )
+    in_flight: int = Field(
+        default=0, description="Number of requests awaiting a response."
+    )
+    failures: int = Field(
+        default=0, description="Number of requests that failed at the transport level."
+    )
+    queued: int = Field(
+        default=0, description="Number of requests waiting for the rate limits."
+    )
+    throttled: int = Field(
+        default=0, description="Number of requests rejected with a 429."
+    )
+    concurrency_limit: int = Field(
+        default=0, description="Current adaptive limit of concurrent requests."
+    )
@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+
+from maf_workflow.models.latency_summary import LatencySummary
+
+
+class ExecutorStats(BaseModel):
+    count: int = Field(default=0, description="Number of executions.")
+    failures: int = Field(default=0, description="Number of executions that raised.")
+    wall_time: LatencySummary = Field(
+        default_factory=LatencySummary, description="Time spent in the executor."
+    )
+    queue_wait: LatencySummary = Field(
+        default_factory=LatencySummary,
+        description="Time from the message being sent to the executor starting.",
+    )
+    input_tokens: int = Field(default=0, description="Prompt tokens used.")
+    output_tokens: int = Field(default=0, description="Completion tokens used.")
+    cached_input_tokens: int = Field(
+        default=0, description="Prompt tokens served from the prompt cache."
+    )
+    payload_size: int = Field(
+        default=0, description="Characters of message content received."
+    )
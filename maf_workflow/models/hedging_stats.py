@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field, computed_field
+
+
+class HedgingStats(BaseModel):
+    calls: int = Field(default=0, description="Number of calls made.")
+    hedged: int = Field(
+        default=0, description="Number of calls for which a duplicate was sent."
+    )
+    hedge_wins: int = Field(
+        default=0, description="Number of hedged calls answered by the duplicate."
+    )
+    budget_denied: int = Field(
+        default=0, description="Number of slow calls not hedged to stay in budget."
+    )
+    delay_seconds: float = Field(
+        default=0.0, description="Current delay before a duplicate is sent."
+    )
+
+    @computed_field
+    @property
+    def hedge_rate(self) -> float:
+        return self.hedged / self.calls if self.calls else 0.0
@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+
+class HistorySummary(BaseModel):
+    text: str = Field(..., description="Summary of the oldest messages of a thread.")
+    covered: int = Field(
+        ..., description="Number of messages, from the first, that are summarized."
+    )
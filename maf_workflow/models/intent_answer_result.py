@@ -0,0 +1,10 @@
+from pydantic import Field
+
+from maf_workflow.models.intent_detection_result import IntentDetectionResult
+
+
+class IntentAnswerResult(IntentDetectionResult):
+    answer: str = Field(
+        ...,
+        description="A detailed and professional answer to the message if it is a question; empty string otherwise.",  # noqa: E501
+    )
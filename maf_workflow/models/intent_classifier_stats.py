@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field, computed_field
+
+
+class IntentClassifierStats(BaseModel):
+    requests: int = Field(default=0, description="Number of messages classified.")
+    hits: int = Field(
+        default=0, description="Number of messages classified without the LLM."
+    )
+    hits_by_intent: dict[str, int] = Field(
+        default_factory=dict, description="Number of hits per intent flag."
+    )
+
+    @computed_field
+    @property
+    def misses(self) -> int:
+        return self.requests - self.hits
+
+    @computed_field
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.requests if self.requests else 0.0
@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field, model_validator
 
+INTENT_FLAGS = ("is_greeting", "is_inappropriate", "is_question", "is_statement")
+
 
 class IntentDetectionResult(BaseModel):
     message_content: str = Field(..., description="The original message content.")
@@ -41,3 +43,8 @@ class IntentDetectionResult(BaseModel):
             )
 
         return self
+
+    @property
+    def intent(self) -> str:
+        """The name of the intent flag that is set, e.g. `is_question`."""
+        return next(flag for flag in INTENT_FLAGS if getattr(self, flag))
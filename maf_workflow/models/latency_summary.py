@@ -0,0 +1,32 @@
+from collections.abc import Sequence
+
+from pydantic import BaseModel, Field
+
+
+class LatencySummary(BaseModel):
+    count: int = Field(default=0, description="Number of samples.")
+    mean: float = Field(default=0.0, description="Mean latency in seconds.")
+    p50: float = Field(default=0.0, description="Median latency in seconds.")
+    p95: float = Field(default=0.0, description="95th percentile in seconds.")
+    p99: float = Field(default=0.0, description="99th percentile in seconds.")
+    max: float = Field(default=0.0, description="Maximum latency in seconds.")
+
+    @classmethod
+    def from_samples(cls, samples: Sequence[float]) -> "LatencySummary":
+        if not samples:
+            return cls()
+
+        ordered = sorted(samples)
+
+        def percentile(q: float) -> float:
+            # nearest rank
+            return ordered[max(0, int(round(q * len(ordered))) - 1)]
+
+        return cls(
+            count=len(ordered),
+            mean=sum(ordered) / len(ordered),
+            p50=percentile(0.5),
+            p95=percentile(0.95),
+            p99=percentile(0.99),
+            max=ordered[-1],
+        )
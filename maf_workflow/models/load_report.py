@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field, computed_field
+
+from maf_workflow.models.latency_summary import LatencySummary
+
+
+class LoadReport(BaseModel):
+    target_rps: float = Field(..., description="Requested arrival rate.")
+    duration_seconds: float = Field(
+        ..., description="Time from the first start to the last completion."
+    )
+    requests: int = Field(default=0, description="Number of runs started.")
+    errors: int = Field(default=0, description="Number of runs that raised.")
+    latency: LatencySummary = Field(
+        default_factory=LatencySummary,
+        description="End to end latency of the successful runs.",
+    )
+    executors: dict[str, LatencySummary] = Field(
+        default_factory=dict, description="Latency of each executor."
+    )
+
+    @computed_field
+    @property
+    def throughput(self) -> float:
+        """Successful runs per second."""
+        completed = self.requests - self.errors
+        return completed / self.duration_seconds if self.duration_seconds else 0.0
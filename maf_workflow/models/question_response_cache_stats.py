@@ -0,0 +1,10 @@
+from pydantic import Field
+
+from maf_workflow.models.cache_stats import CacheStats
+
+
+class QuestionResponseCacheStats(CacheStats):
+    calls: int = Field(default=0, description="Number of calls made to the agent.")
+    coalesced: int = Field(
+        default=0, description="Number of requests that shared an in-flight call."
+    )
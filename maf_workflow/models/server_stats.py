@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+
+
+class ServerStats(BaseModel):
+    max_in_flight: int = Field(
+        ..., description="Number of requests served at once before rejecting."
+    )
+    in_flight: int = Field(
+        default=0,
+        description="Number of requests being served, a batch counting for each "
+        "record it runs at once.",
+    )
+    requests: int = Field(default=0, description="Number of requests admitted.")
+    rejected: int = Field(
+        default=0, description="Number of requests rejected while busy or draining."
+    )
+    failures: int = Field(
+        default=0, description="Number of admitted requests that failed."
+    )
+    draining: bool = Field(
+        default=False, description="True once the worker is shutting down."
+    )
@@ -0,0 +1,21 @@
+import re
+
+from pydantic import BaseModel, Field, field_validator
+
+# a run id names the checkpoints of the run, a directory for the file service
+RUN_ID_PATTERN = re.compile(r"[A-Za-z0-9_.\-]+")
+
+
+class WorkflowRequest(BaseModel):
+    text: str = Field(..., description="The message to run through the workflow.")
+    run_id: str | None = Field(
+        default=None,
+        max_length=128,
+        description="Id of the run, to resume it if a previous attempt stopped.",
+    )
+
+    @field_validator("run_id")
+    def validate_run_id(cls, v: str | None) -> str | None:
+        if v is not None and (not RUN_ID_PATTERN.fullmatch(v) or v in (".", "..")):
+            raise ValueError("Run id must be letters, digits, '_', '.' and '-'.")
+        return v
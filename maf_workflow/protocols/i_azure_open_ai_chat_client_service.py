@@ -1,13 +1,35 @@
-from typing import Protocol
+from typing import TYPE_CHECKING, Protocol
 
-from agent_framework.azure import AzureOpenAIChatClient
+from maf_workflow.models.chat_client_pool_stats import ChatClientPoolStats
+
+if TYPE_CHECKING:
+    # only for annotations: the Azure client pulls in openai, which the services
+    # import when they create it
+    from agent_framework.azure import AzureOpenAIChatClient
 
 
 class IAzureOpenAIChatClientService(Protocol):
-    def get_client(self) -> AzureOpenAIChatClient:
+    def get_client(self) -> "AzureOpenAIChatClient":
         """
         Returns for Azure OpenAI Chat Client
 
         :return: AzureOpenAIChatClient
         """
         ...
+
+    def get_pool_stats(self) -> ChatClientPoolStats:
+        """
+        Returns statistics of the connection pool shared by the chat client
+
+        :return: ChatClientPoolStats
+        """
+        ...
+
+    async def warmup(self, connections: int = 1) -> None:
+        """
+        Creates the client and opens connections to the endpoint, so the first
+        request does not pay for them
+
+        :param connections: The number of connections to open.
+        """
+        ...
@@ -0,0 +1,27 @@
+from typing import Protocol
+
+from agent_framework import ChatMessageStoreProtocol
+
+from maf_workflow.models.history_summary import HistorySummary
+
+
+class IChatHistoryService(Protocol):
+    def create_store(self, thread_id: str | None = None) -> ChatMessageStoreProtocol:
+        """
+        Returns a message store that keeps the history of a thread within budget
+
+        Can be used as the `chat_message_store_factory` of an agent.
+
+        :param thread_id: The thread id, a new one if None.
+        :return: The message store of the thread.
+        """
+        ...
+
+    def get_summary(self, thread_id: str) -> HistorySummary | None:
+        """
+        Returns the rolling summary of the oldest messages of a thread
+
+        :param thread_id: The thread id.
+        :return: The summary, None if nothing has been summarized.
+        """
+        ...
@@ -0,0 +1,24 @@
+from typing import Protocol
+
+from agent_framework import ChatMessageStoreProtocol
+
+
+class IChatMessageStoreService(Protocol):
+    def create_store(self, thread_id: str | None = None) -> ChatMessageStoreProtocol:
+        """
+        Returns a message store for the messages of one conversation thread
+
+        Can be used as the `chat_message_store_factory` of an agent.
+
+        :param thread_id: The thread id, a new one if None.
+        :return: The message store of the thread.
+        """
+        ...
+
+    async def delete_thread(self, thread_id: str) -> None:
+        """
+        Deletes the stored messages of a thread
+
+        :param thread_id: The thread id.
+        """
+        ...
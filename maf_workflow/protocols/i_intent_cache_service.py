@@ -0,0 +1,32 @@
+from typing import Protocol
+
+from maf_workflow.models.cache_stats import CacheStats
+from maf_workflow.models.intent_detection_result import IntentDetectionResult
+
+
+class IIntentCacheService(Protocol):
+    async def get(self, text: str) -> IntentDetectionResult | None:
+        """
+        Looks up the intent detected earlier for the same normalized message
+
+        :param text: The message content.
+        :return: The cached intent detection result, None on a miss.
+        """
+        ...
+
+    async def set(self, text: str, result: IntentDetectionResult) -> None:
+        """
+        Stores the intent detected for a message
+
+        :param text: The message content.
+        :param result: The intent detection result.
+        """
+        ...
+
+    def get_stats(self) -> CacheStats:
+        """
+        Returns the hit, miss and eviction counters of the cache
+
+        :return: CacheStats
+        """
+        ...
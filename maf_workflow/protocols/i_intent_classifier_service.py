@@ -0,0 +1,23 @@
+from typing import Protocol
+
+from maf_workflow.models.intent_classifier_stats import IntentClassifierStats
+from maf_workflow.models.intent_detection_result import IntentDetectionResult
+
+
+class IIntentClassifierService(Protocol):
+    def classify(self, text: str) -> IntentDetectionResult | None:
+        """
+        Classifies a message locally, without calling the LLM
+
+        :param text: The message content.
+        :return: The intent detection result when confident, None otherwise.
+        """
+        ...
+
+    def get_stats(self) -> IntentClassifierStats:
+        """
+        Returns the hit-rate counters of the classifier
+
+        :return: IntentClassifierStats
+        """
+        ...
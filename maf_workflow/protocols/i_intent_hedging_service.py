@@ -0,0 +1,23 @@
+from collections.abc import Awaitable, Callable
+from typing import Protocol
+
+from maf_workflow.models.hedging_stats import HedgingStats
+
+
+class IIntentHedgingService(Protocol):
+    async def run[T](self, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Makes a call, hedged with a duplicate if it is slow
+
+        :param call: Makes the call; invoked once more for the duplicate.
+        :return: The result of whichever call completed first.
+        """
+        ...
+
+    def get_stats(self) -> HedgingStats:
+        """
+        Returns the hedging counters
+
+        :return: HedgingStats
+        """
+        ...
@@ -0,0 +1,31 @@
+from collections.abc import Awaitable, Callable
+from typing import Protocol
+
+from maf_workflow.models.question_response import QuestionResponse
+from maf_workflow.models.question_response_cache_stats import (
+    QuestionResponseCacheStats,
+)
+
+
+class IQuestionResponseCacheService(Protocol):
+    async def get_or_fetch(
+        self, question: str, fetch: Callable[[], Awaitable[QuestionResponse]]
+    ) -> QuestionResponse:
+        """
+        Returns the cached answer to a question, or fetches it
+
+        Concurrent calls for the same question share a single fetch.
+
+        :param question: The user question.
+        :param fetch: Asks the agent; it raises when the reply is not valid.
+        :return: The answer to the question.
+        """
+        ...
+
+    def get_stats(self) -> QuestionResponseCacheStats:
+        """
+        Returns the hit, miss, eviction and coalescing counters of the cache
+
+        :return: QuestionResponseCacheStats
+        """
+        ...
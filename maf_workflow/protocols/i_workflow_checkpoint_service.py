@@ -0,0 +1,32 @@
+from typing import Protocol
+
+from agent_framework import CheckpointStorage
+
+
+class IWorkflowCheckpointService(CheckpointStorage, Protocol):
+    """Checkpoint storage of workflow runs, keyed by run id.
+
+    The workflow id of a checkpoint is the id of its run.
+    """
+
+    @property
+    def enabled(self) -> bool:
+        """True if workflow runs should be checkpointed."""
+        ...
+
+    async def get_latest_checkpoint_id(self, run_id: str) -> str | None:
+        """
+        Returns the checkpoint a run resumes from
+
+        :param run_id: The run id.
+        :return: The id of the latest checkpoint of the run, None if it has none.
+        """
+        ...
+
+    async def delete_run(self, run_id: str) -> None:
+        """
+        Deletes the checkpoints of a run, once it has completed
+
+        :param run_id: The run id.
+        """
+        ...
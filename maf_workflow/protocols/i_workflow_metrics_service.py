@@ -0,0 +1,49 @@
+from typing import Protocol
+
+from maf_workflow.models.executor_stats import ExecutorStats
+
+
+class IWorkflowMetricsService(Protocol):
+    @property
+    def enabled(self) -> bool:
+        """True if workflows should be instrumented."""
+        ...
+
+    def record(
+        self,
+        executor_id: str,
+        wall_time: float,
+        queue_wait: float,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cached_input_tokens: int = 0,
+        payload_size: int = 0,
+        failed: bool = False,
+    ) -> None:
+        """
+        Records one execution of an executor
+
+        :param executor_id: The executor id.
+        :param wall_time: Seconds spent in the executor.
+        :param queue_wait: Seconds from the message being sent to the execution.
+        :param input_tokens: Prompt tokens used.
+        :param output_tokens: Completion tokens used.
+        :param cached_input_tokens: Prompt tokens served from the prompt cache.
+        :param payload_size: Characters of message content received.
+        :param failed: True if the execution raised.
+        """
+        ...
+
+    def get_stats(self) -> dict[str, ExecutorStats]:
+        """
+        Returns the statistics of each executor recorded so far
+
+        :return: Statistics by executor id.
+        """
+        ...
+
+    def reset(self) -> None:
+        """
+        Discards the statistics recorded so far
+        """
+        ...
@@ -0,0 +1,421 @@
+import asyncio
+import json
+import logging
+import signal
+import threading
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Collection,
+    Iterator,
+    Mapping,
+)
+from contextlib import aclosing, asynccontextmanager, contextmanager
+from types import FrameType
+
+from lagom.environment import Env
+from pydantic import ValidationError
+from starlette.applications import Starlette
+from starlette.requests import ClientDisconnect, Request
+from starlette.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
+from starlette.routing import Route
+from starlette.types import Receive, Scope, Send
+
+from maf_workflow.batch_runner import read_records, run_batch
+from maf_workflow.models.batch_result import BatchResult
+from maf_workflow.models.chat_client_pool_stats import ChatClientPoolStats
+from maf_workflow.models.executor_stats import ExecutorStats
+from maf_workflow.models.latency_summary import LatencySummary
+from maf_workflow.models.server_stats import ServerStats
+from maf_workflow.models.workflow_request import WorkflowRequest
+
+logger = logging.getLogger(__name__)
+
+RunWorkflow = Callable[[str, str | None], Awaitable[str | None]]
+StreamWorkflow = Callable[[str, str | None], AsyncIterator[str]]
+
+# counters of the connection pool, its other fields are gauges
+POOL_COUNTERS = ("requests", "failures", "throttled")
+
+
+class WorkflowServerEnv(Env):
+    workflow_server_max_in_flight: int = 64
+    workflow_server_drain_timeout_seconds: float = 30.0
+    workflow_server_batch_concurrency: int = 8
+    workflow_server_batch_max_records: int = 10000
+
+
+class Admission:
+    """Admits requests up to `max_in_flight` at once, and none while draining.
+
+    A request takes `weight` of the slots, so a batch running several records at
+    once counts for each of them.
+    """
+
+    def __init__(self, max_in_flight: int) -> None:
+        self.stats = ServerStats(max_in_flight=max_in_flight)
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def enter(self, weight: int = 1) -> bool:
+        stats = self.stats
+        if stats.draining or stats.in_flight + weight > stats.max_in_flight:
+            stats.rejected += 1
+            return False
+        stats.in_flight += weight
+        stats.requests += 1
+        self._idle.clear()
+        return True
+
+    def exit(self, failed: bool = False, weight: int = 1) -> None:
+        self.stats.in_flight -= weight
+        self.stats.failures += failed
+        if not self.stats.in_flight:
+            self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """Stops admitting requests and waits for the ones in flight.
+
+        Returns False if some were still in flight after `timeout` seconds.
+        """
+        self.stats.draining = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except TimeoutError:
+            return False
+        return True
+
+
+class _AdmittedStream(StreamingResponse):
+    # holds the admission of its request until the stream is done
+
+    def __init__(
+        self,
+        content: AsyncGenerator[str],
+        admission: Admission,
+        media_type: str,
+        weight: int = 1,
+    ) -> None:
+        super().__init__(
+            content,
+            media_type=media_type,
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+        self.failed = False
+        self._content = content
+        self._admission = admission
+        self._weight = weight
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        except ClientDisconnect:
+            raise
+        except Exception:
+            self.failed = True
+            raise
+        finally:
+            await self._content.aclose()
+            self._admission.exit(self.failed, self._weight)
+
+
+def create_app(
+    run: RunWorkflow,
+    stream: StreamWorkflow,
+    max_in_flight: int = 64,
+    drain_timeout: float = 30.0,
+    batch_concurrency: int = 8,
+    batch_max_records: int = 10000,
+    executor_stats: Callable[[], Mapping[str, ExecutorStats]] | None = None,
+    pool_stats: Callable[[], ChatClientPoolStats] | None = None,
+    startup: Callable[[], Awaitable[None]] | None = None,
+    drain_signals: Collection[signal.Signals] = (signal.SIGINT, signal.SIGTERM),
+) -> Starlette:
+    """Returns an ASGI app serving a workflow over HTTP.
+
+    - `POST /run` takes `{"text": ..., "run_id": ...}` and returns `{"output": ...}`.
+    - `POST /stream` takes the same body and returns the output as server-sent
+      events: one JSON string per delta, then a `done` (or `error`) event.
+    - `POST /batch` takes JSONL records, as the batch runner reads them, and
+      streams one JSON result per line in input order, up to
+      `batch_max_records` records (413 beyond).
+    - `GET /metrics` returns the statistics in the Prometheus text format.
+    - `GET /health` returns 503 once the worker is draining.
+
+    The app is meant to be created once per worker process, so `run` and
+    `stream` share one chat client and prebuilt graph; `startup` runs before the
+    first request is served. At most `max_in_flight` requests are served at once
+    (a batch counts as `batch_concurrency`, the records it runs at a time);
+    further requests are rejected with a 503 and a `Retry-After` header rather
+    than queued, so an overloaded worker stays responsive and the load
+    balancer or client retries elsewhere. A `run_id` that cannot name a run is
+    rejected with a 400.
+
+    On the first of `drain_signals`, the worker starts draining before the
+    server sees the signal and closes its listeners: `/health` returns 503, new
+    requests are rejected, and the ones in flight get up to `drain_timeout`
+    seconds to complete. The signal is then handed to the server, at once if it
+    comes again. Without a signal, draining starts on shutdown.
+    """
+    admission = Admission(max_in_flight)
+    batch_weight = min(batch_concurrency, max_in_flight)
+
+    async def run_one(request: Request) -> Response:
+        body = await _parse(request)
+        if isinstance(body, Response):
+            return body
+        if not admission.enter():
+            return _unavailable(admission.stats)
+
+        failed = False
+        try:
+            output = await run(body.text, body.run_id)
+        except Exception as e:
+            failed = True
+            logger.exception("Workflow run failed")
+            return JSONResponse({"error": _error(e)}, 500)
+        finally:
+            admission.exit(failed)
+        return JSONResponse({"output": output})
+
+    async def stream_one(request: Request) -> Response:
+        body = await _parse(request)
+        if isinstance(body, Response):
+            return body
+        if not admission.enter():
+            return _unavailable(admission.stats)
+
+        async def events() -> AsyncGenerator[str]:
+            try:
+                async for delta in stream(body.text, body.run_id):
+                    yield _event(json.dumps(delta))
+            except Exception as e:
+                response.failed = True
+                logger.exception("Workflow run failed")
+                yield _event(json.dumps({"error": _error(e)}), "error")
+            else:
+                yield _event("{}", "done")
+
+        response = _AdmittedStream(events(), admission, "text/event-stream")
+        return response
+
+    async def run_many(request: Request) -> Response:
+        # admitted before the body is read, so a busy worker does not buffer it
+        if not admission.enter(batch_weight):
+            return _unavailable(admission.stats)
+        try:
+            lines = (await request.body()).decode().splitlines()
+        except BaseException:
+            admission.exit(weight=batch_weight)
+            raise
+        if sum(1 for line in lines if line.strip()) > batch_max_records:
+            admission.exit(weight=batch_weight)
+            return JSONResponse(
+                {"error": f"more than {batch_max_records} records"}, 413
+            )
+
+        records = read_records(
+            lines,
+            text_field=request.query_params.get("text_field"),
+            id_field=request.query_params.get("id_field"),
+        )
+        results = run_batch(
+            records, lambda text: run(text, None), concurrency=batch_concurrency
+        )
+        return _AdmittedStream(
+            _lines(results), admission, "application/x-ndjson", batch_weight
+        )
+
+    async def metrics(request: Request) -> Response:
+        return PlainTextResponse(
+            render_metrics(
+                admission.stats,
+                executor_stats() if executor_stats is not None else {},
+                pool_stats() if pool_stats is not None else None,
+            ),
+            media_type="text/plain; version=0.0.4",
+        )
+
+    async def health(request: Request) -> Response:
+        if admission.stats.draining:
+            return JSONResponse({"status": "draining"}, 503)
+        return JSONResponse({"status": "ok"})
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        if startup is not None:
+            await startup()
+        with _drain_on_signals(admission, drain_timeout, drain_signals):
+            yield
+        if not await admission.drain(drain_timeout):
+            logger.warning(
+                "%d requests still in flight after draining for %ss",
+                admission.stats.in_flight,
+                drain_timeout,
+            )
+
+    app = Starlette(
+        routes=[
+            Route("/run", run_one, methods=["POST"]),
+            Route("/stream", stream_one, methods=["POST"]),
+            Route("/batch", run_many, methods=["POST"]),
+            Route("/metrics", metrics),
+            Route("/health", health),
+        ],
+        lifespan=lifespan,
+    )
+    app.state.admission = admission
+    return app
+
+
+def render_metrics(
+    server: ServerStats,
+    executors: Mapping[str, ExecutorStats],
+    pool: ChatClientPoolStats | None = None,
+) -> str:
+    """Formats the statistics of a worker in the Prometheus text format."""
+    lines: list[str] = []
+
+    def sample(name: str, value: float, **labels: str) -> None:
+        lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+    def metric(name: str, kind: str, value: float) -> None:
+        lines.append(f"# TYPE {name} {kind}")
+        sample(name, value)
+
+    def executor_counter(name: str, field: str) -> None:
+        lines.append(f"# TYPE {name} counter")
+        for id, stats in executors.items():
+            sample(name, getattr(stats, field), executor=id)
+
+    metric("workflow_server_in_flight", "gauge", server.in_flight)
+    metric("workflow_server_max_in_flight", "gauge", server.max_in_flight)
+    metric("workflow_server_draining", "gauge", server.draining)
+    metric("workflow_server_requests_total", "counter", server.requests)
+    metric("workflow_server_rejected_total", "counter", server.rejected)
+    metric("workflow_server_failures_total", "counter", server.failures)
+
+    executor_counter("workflow_executor_executions_total", "count")
+    executor_counter("workflow_executor_failures_total", "failures")
+    for field in ("wall_time", "queue_wait"):
+        name = f"workflow_executor_{field}_seconds"
+        lines.append(f"# TYPE {name} summary")
+        for id, stats in executors.items():
+            summary: LatencySummary = getattr(stats, field)
+            sample(name, summary.p50, executor=id, quantile="0.5")
+            sample(name, summary.p95, executor=id, quantile="0.95")
+            sample(name, summary.p99, executor=id, quantile="0.99")
+            sample(f"{name}_sum", summary.mean * summary.count, executor=id)
+            sample(f"{name}_count", summary.count, executor=id)
+    for field in ("input_tokens", "output_tokens", "cached_input_tokens"):
+        executor_counter(f"workflow_executor_{field}_total", field)
+
+    if pool is not None:
+        for field, value in pool.model_dump().items():
+            if field in POOL_COUNTERS:
+                metric(f"chat_client_pool_{field}_total", "counter", value)
+            else:
+                metric(f"chat_client_pool_{field}", "gauge", value)
+
+    return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def _drain_on_signals(
+    admission: Admission, timeout: float, signals: Collection[signal.Signals]
+) -> Iterator[None]:
+    # signals are handled on the main thread, where the server installs its
+    # handlers; they are handed to those once the worker is drained
+    loop = asyncio.get_running_loop()
+    on_main_thread = threading.current_thread() is threading.main_thread()
+    previous: dict[int, Callable[[int, FrameType | None], object]] = {
+        sig: handler
+        for sig in (signals if on_main_thread else ())
+        if callable(handler := signal.getsignal(sig))
+    }
+    signalled: list[int] = []
+    draining: list[asyncio.Task[None]] = []
+
+    async def drain(sig: int, frame: FrameType | None) -> None:
+        await admission.drain(timeout)
+        previous[sig](sig, frame)
+
+    def start(sig: int, frame: FrameType | None) -> None:
+        if len(signalled) == 1:
+            draining.append(loop.create_task(drain(sig, frame)))
+
+    def handle(sig: int, frame: FrameType | None) -> None:
+        signalled.append(sig)
+        admission.stats.draining = True
+        if len(signalled) == 1:
+            # the handler runs between two steps of the loop, which starts the
+            # task on its next one
+            loop.call_soon_threadsafe(start, sig, frame)
+            return
+        # signalled again, the server stops without waiting
+        for task in draining:
+            task.cancel()
+        previous[sig](sig, frame)
+
+    for sig in previous:
+        signal.signal(sig, handle)
+    try:
+        yield
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        for task in draining:
+            task.cancel()
+
+
+async def _parse(request: Request) -> WorkflowRequest | Response:
+    try:
+        return WorkflowRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        errors = e.errors(include_url=False, include_context=False, include_input=False)
+        # a well-formed request whose run id cannot name a run
+        bad_run_id = all(error["loc"][:1] == ("run_id",) for error in errors)
+        return JSONResponse({"error": errors}, 400 if bad_run_id else 422)
+
+
+async def _lines(results: AsyncGenerator[BatchResult]) -> AsyncGenerator[str]:
+    # closing the results cancels the records still running
+    async with aclosing(results):
+        async for result in results:
+            yield result.model_dump_json() + "\n"
+
+
+def _unavailable(stats: ServerStats) -> Response:
+    # rejected quickly, so the client can retry elsewhere or later
+    headers = {"Retry-After": "1"}
+    if stats.draining:
+        headers["Connection"] = "close"
+    error = "draining" if stats.draining else "busy"
+    return JSONResponse({"error": error}, 503, headers)
+
+
+def _event(data: str, event: str | None = None) -> str:
+    return (f"event: {event}\n" if event else "") + f"data: {data}\n\n"
+
+
+def _error(e: Exception) -> str:
+    return f"{type(e).__name__}: {e}"
+
+
+def _labels(labels: Mapping[str, str]) -> str:
+    if not labels:
+        return ""
+    # JSON escapes backslashes, quotes and newlines as Prometheus does
+    pairs = (f"{k}={json.dumps(v, ensure_ascii=False)}" for k, v in labels.items())
+    return "{" + ",".join(pairs) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if isinstance(value, bool | int) else repr(value)
@@ -1,13 +1,30 @@
-from dataclasses import dataclass
+import asyncio
+import copy
+import importlib.util
+import json
+import logging
+import re
+from collections.abc import AsyncIterator, Awaitable, Callable, MutableSequence
+from dataclasses import dataclass, field
 from typing import Any
 
+import httpx
+from agent_framework import ChatMessage, ChatOptions, Role
 from agent_framework.azure import AzureOpenAIChatClient
-from azure.identity import DefaultAzureCredential
+from azure.core.credentials_async import AsyncTokenCredential
+from azure.identity.aio import DefaultAzureCredential, get_bearer_token_provider
 from lagom.environment import Env
+from openai import AsyncAzureOpenAI, DefaultAsyncHttpxClient
 
+from maf_workflow.models.chat_client_pool_stats import ChatClientPoolStats
 from maf_workflow.protocols.i_azure_open_ai_chat_client_service import (
     IAzureOpenAIChatClientService,
 )
+from maf_workflow.utils.rate_limit_scheduler import RateLimitScheduler
+
+logger = logging.getLogger(__name__)
+
+DEPLOYMENT = re.compile(r"/deployments/([^/]+)/")
 
 
 class AzureOpenAIChatClientServiceEnv(Env):
@@ -15,22 +32,273 @@ class AzureOpenAIChatClientServiceEnv(Env):
     azure_openai_chat_deployment_name: str
     azure_openai_api_version: str = "2025-04-01-preview"
     azure_openai_api_key: str | None = None
+    azure_openai_token_scope: str = "https://cognitiveservices.azure.com/.default"
+    azure_openai_max_connections: int = 100
+    azure_openai_max_keepalive_connections: int = 20
+    azure_openai_keepalive_expiry: float = 30.0
+    azure_openai_http2: bool = True
+    azure_openai_requests_per_minute: int | None = None
+    azure_openai_tokens_per_minute: int | None = None
+    azure_openai_max_concurrency: int = 100
+    azure_openai_output_tokens_estimate: int = 1000
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Wraps the pooled HTTP transport and counts the requests going through it."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+        self.requests = 0
+        self.in_flight = 0
+        self.failures = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.in_flight += 1
+        try:
+            return await self.transport.handle_async_request(request)
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+    def connections(self) -> list[Any]:
+        # httpx does not expose its pool, read it when it is there
+        pool = getattr(self.transport, "_pool", None)
+        return list(getattr(pool, "connections", []))
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """Sends the requests through a `RateLimitScheduler`, by deployment.
+
+    A request holds its slot until its response has been read, so streamed
+    responses count as in flight while they stream. The tokens of a request are
+    estimated from the size of its body (about four characters per token) plus
+    its maximum output tokens.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        scheduler: RateLimitScheduler,
+        output_tokens: int,
+    ):
+        self.transport = transport
+        self.scheduler = scheduler
+        self.output_tokens = output_tokens
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        match = DEPLOYMENT.search(request.url.path)
+        deployment = match.group(1) if match else request.url.host
+        await self.scheduler.acquire(deployment, self.estimate_tokens(request))
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            self.scheduler.release(deployment)
+            raise
+
+        def release() -> None:
+            self.scheduler.release(deployment, response.status_code, response.headers)
+
+        assert isinstance(response.stream, httpx.AsyncByteStream)
+        response.stream = ReleasingStream(response.stream, release)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+    def estimate_tokens(self, request: httpx.Request) -> int:
+        try:
+            body = json.loads(request.content)
+        except (httpx.RequestNotRead, ValueError):
+            return self.output_tokens
+        output_tokens = self.output_tokens
+        if isinstance(body, dict):
+            output_tokens = (
+                body.get("max_completion_tokens")
+                or body.get("max_tokens")
+                or output_tokens
+            )
+        return len(request.content) // 4 + output_tokens
+
+
+class ReleasingStream(httpx.AsyncByteStream):
+    """Response body that calls `release` once when it is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self.stream = stream
+        self._release: Callable[[], None] | None = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self.stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self.stream.aclose()
+        finally:
+            if self._release is not None:
+                release, self._release = self._release, None
+                release()
+
+
+class SingleInstructionsChatClient(AzureOpenAIChatClient):
+    """Azure OpenAI chat client that sends the instructions of an agent once.
+
+    The base chat client already puts the instructions first in the messages and
+    the OpenAI client would prepend them a second time, doubling the static
+    prefix of every request.
+    """
+
+    def _prepare_options(
+        self, messages: MutableSequence[ChatMessage], chat_options: ChatOptions
+    ) -> dict[str, Any]:
+        if (
+            chat_options.instructions
+            and messages
+            and messages[0].role == Role.SYSTEM
+            and messages[0].text == chat_options.instructions
+        ):
+            chat_options = copy.copy(chat_options)
+            chat_options.instructions = None
+        return super()._prepare_options(messages, chat_options)
+
+
+class CredentialAzureOpenAI(AsyncAzureOpenAI):
+    """Async Azure OpenAI client that closes its credential when it is closed."""
+
+    def __init__(self, credential: AsyncTokenCredential, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.credential = credential
+
+    async def close(self) -> None:
+        try:
+            await super().close()
+        finally:
+            await self.credential.close()
 
 
 @dataclass
 class AzureOpenAIChatClientService(IAzureOpenAIChatClientService):
     env: AzureOpenAIChatClientServiceEnv
+    _client: AzureOpenAIChatClient | None = field(default=None, init=False, repr=False)
+    _transport: InstrumentedTransport | None = field(
+        default=None, init=False, repr=False
+    )
+    _scheduler: RateLimitScheduler | None = field(default=None, init=False, repr=False)
+    _token_provider: Callable[[], Awaitable[str]] | None = field(
+        default=None, init=False, repr=False
+    )
+
+    @property
+    def http2(self) -> bool:
+        # HTTP/2 needs the optional `h2` package
+        return (
+            self.env.azure_openai_http2 and importlib.util.find_spec("h2") is not None
+        )
 
     def get_client(self) -> AzureOpenAIChatClient:
+        # the service is a container singleton, so the client, its connection pool
+        # and its token cache are shared by the whole process
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    async def warmup(self, connections: int = 1) -> None:
+        self.get_client()
+        if self._token_provider is not None:
+            try:
+                await self._token_provider()
+            except Exception:
+                logger.warning("Could not get a token on warmup", exc_info=True)
+
+        # straight to the pool, these requests are not rate limited or counted
+        assert self._transport is not None
+        pool = self._transport.transport
+
+        async def connect() -> None:
+            request = httpx.Request("HEAD", self.env.azure_openai_endpoint)
+            response = await pool.handle_async_request(request)
+            # any status will do, the connection goes back to the pool
+            await response.aclose()
+
+        results = await asyncio.gather(
+            *(connect() for _ in range(connections)), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("Could not open a connection on warmup: %s", result)
+
+    def get_pool_stats(self) -> ChatClientPoolStats:
+        stats = ChatClientPoolStats(
+            max_connections=self.env.azure_openai_max_connections,
+            max_keepalive_connections=self.env.azure_openai_max_keepalive_connections,
+            keepalive_expiry=self.env.azure_openai_keepalive_expiry,
+            http2=self.http2,
+        )
+        if self._transport is not None:
+            connections = self._transport.connections()
+            stats.connections = len(connections)
+            stats.idle_connections = sum(1 for c in connections if c.is_idle())
+            stats.requests = self._transport.requests
+            stats.in_flight = self._transport.in_flight
+            stats.failures = self._transport.failures
+        if self._scheduler is not None:
+            stats.queued = self._scheduler.queued
+            stats.throttled = self._scheduler.throttled
+            stats.concurrency_limit = self._scheduler.concurrency_limit(
+                self.env.azure_openai_chat_deployment_name
+            )
+        return stats
+
+    def _create_client(self) -> AzureOpenAIChatClient:
+        limits = httpx.Limits(
+            max_connections=self.env.azure_openai_max_connections,
+            max_keepalive_connections=self.env.azure_openai_max_keepalive_connections,
+            keepalive_expiry=self.env.azure_openai_keepalive_expiry,
+        )
+        self._transport = InstrumentedTransport(
+            httpx.AsyncHTTPTransport(limits=limits, http2=self.http2)
+        )
+        # every call of every agent on the client goes through the scheduler
+        self._scheduler = RateLimitScheduler(
+            requests_per_minute=self.env.azure_openai_requests_per_minute,
+            tokens_per_minute=self.env.azure_openai_tokens_per_minute,
+            max_concurrency=self.env.azure_openai_max_concurrency,
+        )
+        transport = RateLimitedTransport(
+            self._transport,
+            self._scheduler,
+            self.env.azure_openai_output_tokens_estimate,
+        )
+
         params: dict[str, Any] = {
-            "endpoint": self.env.azure_openai_endpoint,
-            "deployment_name": self.env.azure_openai_chat_deployment_name,
+            "azure_endpoint": self.env.azure_openai_endpoint,
+            "azure_deployment": self.env.azure_openai_chat_deployment_name,
             "api_version": self.env.azure_openai_api_version,
+            "http_client": DefaultAsyncHttpxClient(transport=transport),
         }
 
         if self.env.azure_openai_api_key:
             params["api_key"] = self.env.azure_openai_api_key
+            async_client = AsyncAzureOpenAI(**params)
         else:
-            params["credential"] = DefaultAzureCredential()
+            # the async credential refreshes the token without blocking the event
+            # loop; the token provider caches it until shortly before it expires
+            credential = DefaultAzureCredential()
+            self._token_provider = get_bearer_token_provider(
+                credential, self.env.azure_openai_token_scope
+            )
+            params["azure_ad_token_provider"] = self._token_provider
+            async_client = CredentialAzureOpenAI(credential, **params)
 
-        return AzureOpenAIChatClient(**params)
+        return SingleInstructionsChatClient(
+            endpoint=self.env.azure_openai_endpoint,
+            deployment_name=self.env.azure_openai_chat_deployment_name,
+            api_version=self.env.azure_openai_api_version,
+            async_client=async_client,
+        )
@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import uuid
+from collections import deque
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from agent_framework import ChatAgent, ChatMessage, ChatMessageStoreProtocol, Role
+from lagom.environment import Env
+
+from maf_workflow.agents import history_summary_agent
+from maf_workflow.models.history_summary import HistorySummary
+from maf_workflow.protocols.i_azure_open_ai_chat_client_service import (
+    IAzureOpenAIChatClientService,
+)
+from maf_workflow.protocols.i_chat_history_service import IChatHistoryService
+from maf_workflow.protocols.i_chat_message_store_service import (
+    IChatMessageStoreService,
+)
+from maf_workflow.utils.tokens import count_tokens
+from maf_workflow.utils.ttl_lru_cache import TTLLRUCache
+
+type Summarize = Callable[[str | None, Sequence[ChatMessage]], Awaitable[str]]
+"""Folds messages into the summary so far (None for the first ones)."""
+
+logger = logging.getLogger(__name__)
+
+
+class ChatHistoryServiceEnv(Env):
+    chat_history_max_tokens: int = 4_000
+    chat_history_summary_enabled: bool = True
+    chat_history_summary_cache_entries: int = 10_000
+    chat_history_summary_ttl_seconds: float = 24 * 60 * 60
+
+
+class TokenBudgetChatMessageStore:
+    """Keeps the history a thread sends to the model within a token budget.
+
+    Every message is kept by the wrapped store. Its tokens are counted once, when
+    it is added, and the newest messages that fit in `max_tokens` form the window
+    returned by `list_messages`. Messages leaving the window are folded into a
+    rolling summary by `summarize` in a background task, so the turn that pushed
+    them out does not wait for it. The summary is sent as a system message ahead
+    of the window and is shared through `summaries` by thread id. Until it catches
+    up, the messages between the summary and the window are left out. Messages
+    are counted by their position in the thread; a wrapped store that drops its
+    oldest messages tells where its own start with `first_position`.
+    """
+
+    def __init__(
+        self,
+        store: ChatMessageStoreProtocol,
+        thread_id: str,
+        max_tokens: int,
+        summaries: TTLLRUCache[str, HistorySummary],
+        summarize: Summarize | None = None,
+    ):
+        self.store = store
+        self.thread_id = thread_id
+        self.max_tokens = max_tokens
+        self.summaries = summaries
+        self.summarize = summarize
+        # messages with their tokens and position in the thread
+        self._window: deque[tuple[ChatMessage, int, int]] = deque()
+        self._window_tokens = 0
+        self._pending: list[tuple[ChatMessage, int]] = []
+        self._next = 0
+        self._summary: HistorySummary | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._loaded = False
+
+    @property
+    def window_tokens(self) -> int:
+        """Estimated tokens of the messages in the window."""
+        return self._window_tokens
+
+    async def add_messages(self, messages: Sequence[ChatMessage]) -> None:
+        await self._load()
+        await self.store.add_messages(messages)
+        self._append(messages)
+
+    async def list_messages(self) -> list[ChatMessage]:
+        await self._load()
+        messages = [message for message, _, _ in self._window]
+        if self._summary is None:
+            return messages
+        summary = ChatMessage(
+            Role.SYSTEM,
+            text=f"Summary of the earlier conversation:\n{self._summary.text}",
+        )
+        return [summary, *messages]
+
+    async def wait_summarized(self) -> None:
+        """Waits for the summary to cover the messages that left the window."""
+        if self._task is not None:
+            await self._task
+
+    @classmethod
+    async def deserialize(
+        cls, serialized_store_state: Any, **kwargs: Any
+    ) -> "TokenBudgetChatMessageStore":
+        """Creates a store from serialized state, applied to the wrapped store.
+
+        The `store`, `max_tokens` and `summaries` keywords are required and
+        `summarize` is optional, as for the constructor; the others are passed
+        on to `update_from_state`.
+        """
+        try:
+            store = kwargs.pop("store")
+            max_tokens = kwargs.pop("max_tokens")
+            summaries = kwargs.pop("summaries")
+        except KeyError as e:
+            raise ValueError(
+                f"A `{e.args[0]}` is needed to deserialize the store."
+            ) from None
+        budget = cls(
+            store,
+            getattr(store, "thread_id", uuid.uuid4().hex),
+            max_tokens,
+            summaries,
+            kwargs.pop("summarize", None),
+        )
+        await budget.update_from_state(serialized_store_state, **kwargs)
+        return budget
+
+    async def update_from_state(
+        self, serialized_store_state: Any, **kwargs: Any
+    ) -> None:
+        await self.store.update_from_state(serialized_store_state, **kwargs)
+        # the wrapped store may have switched to the thread of the state
+        self.thread_id = getattr(self.store, "thread_id", self.thread_id)
+        self._loaded = False
+
+    async def serialize(self, **kwargs: Any) -> Any:
+        return await self.store.serialize(**kwargs)
+
+    async def _load(self) -> None:
+        # the window is rebuilt once from the stored messages, then kept up to date
+        if self._loaded:
+            return
+        self._loaded = True
+        self._window.clear()
+        self._window_tokens = 0
+        self._pending.clear()
+        self._summary = self.summaries.get(self.thread_id)
+        covered = 0 if self._summary is None else self._summary.covered
+        messages = await self.store.list_messages()
+        first_position = getattr(self.store, "first_position", None)
+        first = 0 if first_position is None else await first_position()
+        # the messages before the summary's end, if still stored, are left out
+        self._next = max(first, covered)
+        self._append(messages[self._next - first :])
+
+    def _append(self, messages: Sequence[ChatMessage]) -> None:
+        for message in messages:
+            tokens = count_tokens(message)
+            self._window.append((message, tokens, self._next))
+            self._window_tokens += tokens
+            self._next += 1
+            # the newest message stays, even over budget
+            while self._window_tokens > self.max_tokens and len(self._window) > 1:
+                oldest, oldest_tokens, position = self._window.popleft()
+                self._window_tokens -= oldest_tokens
+                if self.summarize is not None:
+                    self._pending.append((oldest, position))
+
+        if self._pending and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._summarize_pending())
+
+    async def _summarize_pending(self) -> None:
+        assert self.summarize is not None
+        while self._pending:
+            batch = list(self._pending)
+            previous = self._summary
+            try:
+                text = await self.summarize(
+                    None if previous is None else previous.text,
+                    [message for message, _ in batch],
+                )
+            except Exception:
+                # retried when more messages leave the window
+                logger.warning(
+                    "Summarizing thread %s failed", self.thread_id, exc_info=True
+                )
+                return
+            del self._pending[: len(batch)]
+            self._summary = HistorySummary(text=text, covered=batch[-1][1] + 1)
+            self.summaries.set(self.thread_id, self._summary, size=len(text))
+
+
+@dataclass
+class ChatHistoryService(IChatHistoryService):
+    """Creates `TokenBudgetChatMessageStore`s over the chat message stores.
+
+    Messages are kept by `IChatMessageStoreService`; the window of each thread is
+    `CHAT_HISTORY_MAX_TOKENS`. Summaries are made by the history summary agent
+    and cached by thread id. With `CHAT_HISTORY_SUMMARY_ENABLED=false` the
+    messages leaving the window are dropped from the prompt.
+    """
+
+    env: ChatHistoryServiceEnv
+    stores: IChatMessageStoreService
+    chat_client_service: IAzureOpenAIChatClientService
+    _summaries: TTLLRUCache[str, HistorySummary] = field(init=False, repr=False)
+    _agent: ChatAgent | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._summaries = TTLLRUCache(
+            max_entries=self.env.chat_history_summary_cache_entries,
+            ttl=self.env.chat_history_summary_ttl_seconds,
+        )
+
+    def create_store(self, thread_id: str | None = None) -> TokenBudgetChatMessageStore:
+        thread_id = thread_id or uuid.uuid4().hex
+        return TokenBudgetChatMessageStore(
+            self.stores.create_store(thread_id),
+            thread_id,
+            self.env.chat_history_max_tokens,
+            self._summaries,
+            self._summarize if self.env.chat_history_summary_enabled else None,
+        )
+
+    def get_summary(self, thread_id: str) -> HistorySummary | None:
+        return self._summaries.get(thread_id)
+
+    async def _summarize(
+        self, summary: str | None, messages: Sequence[ChatMessage]
+    ) -> str:
+        if self._agent is None:
+            self._agent = history_summary_agent.create_chat_agent(
+                self.chat_client_service.get_client()
+            )
+        return await history_summary_agent.summarize(self._agent, summary, messages)
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import os
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from agent_framework import WorkflowCheckpoint
+from lagom.environment import Env
+
+from maf_workflow.models.workflow_request import RUN_ID_PATTERN
+from maf_workflow.protocols.i_workflow_checkpoint_service import (
+    IWorkflowCheckpointService,
+)
+
+
+class FileWorkflowCheckpointServiceEnv(Env):
+    workflow_checkpoint_enabled: bool = False
+    workflow_checkpoint_path: str = ".checkpoints"
+
+
+@dataclass
+class FileWorkflowCheckpointService(IWorkflowCheckpointService):
+    """Keeps workflow checkpoints as JSON files, one directory per run.
+
+    A checkpoint is `WORKFLOW_CHECKPOINT_PATH/<run id>/<checkpoint id>.json`,
+    written to a temporary file and renamed, so a crash never leaves half a
+    checkpoint. Listing the checkpoints of a run reads its directory only. The
+    files are read and written on a worker thread.
+
+    A checkpoint is looked up by id under the directory of its run, which is
+    known once the checkpoint was saved or its run listed by this service, as
+    the template does before resuming a run. Ids are not searched for across the
+    runs.
+    """
+
+    env: FileWorkflowCheckpointServiceEnv
+    # run id of every checkpoint saved or listed
+    _runs: dict[str, str] = field(default_factory=dict, init=False, repr=False)
+
+    @property
+    def enabled(self) -> bool:
+        return self.env.workflow_checkpoint_enabled
+
+    @property
+    def root(self) -> Path:
+        return Path(self.env.workflow_checkpoint_path)
+
+    async def save_checkpoint(self, checkpoint: WorkflowCheckpoint) -> str:
+        path = (
+            self._run_path(checkpoint.workflow_id) / f"{checkpoint.checkpoint_id}.json"
+        )
+        data = json.dumps(checkpoint.to_dict())
+
+        def write() -> None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_suffix(".tmp")
+            temporary.write_text(data)
+            os.replace(temporary, path)
+
+        await asyncio.to_thread(write)
+        self._runs[checkpoint.checkpoint_id] = checkpoint.workflow_id
+        return checkpoint.checkpoint_id
+
+    async def load_checkpoint(self, checkpoint_id: str) -> WorkflowCheckpoint | None:
+        path = self._checkpoint_path(checkpoint_id)
+        if path is None:
+            return None
+
+        def read() -> WorkflowCheckpoint | None:
+            try:
+                return _read(path)
+            except FileNotFoundError:
+                return None
+
+        return await asyncio.to_thread(read)
+
+    async def list_checkpoint_ids(self, workflow_id: str | None = None) -> list[str]:
+        return [c.checkpoint_id for c in await self.list_checkpoints(workflow_id)]
+
+    async def list_checkpoints(
+        self, workflow_id: str | None = None
+    ) -> list[WorkflowCheckpoint]:
+        pattern = "*/*.json" if workflow_id is None else "*.json"
+        root = self.root if workflow_id is None else self._run_path(workflow_id)
+
+        def read_all() -> list[WorkflowCheckpoint]:
+            return sorted(
+                (_read(path) for path in root.glob(pattern)),
+                key=lambda c: (c.iteration_count, c.timestamp),
+            )
+
+        checkpoints = await asyncio.to_thread(read_all)
+        for checkpoint in checkpoints:
+            self._runs[checkpoint.checkpoint_id] = checkpoint.workflow_id
+        return checkpoints
+
+    async def delete_checkpoint(self, checkpoint_id: str) -> bool:
+        path = self._checkpoint_path(checkpoint_id)
+        self._runs.pop(checkpoint_id, None)
+        if path is None:
+            return False
+
+        def delete() -> bool:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                return False
+            return True
+
+        return await asyncio.to_thread(delete)
+
+    async def get_latest_checkpoint_id(self, run_id: str) -> str | None:
+        checkpoints = await self.list_checkpoints(run_id)
+        return checkpoints[-1].checkpoint_id if checkpoints else None
+
+    async def delete_run(self, run_id: str) -> None:
+        path = self._run_path(run_id)
+
+        def delete() -> list[str]:
+            checkpoint_ids = [checkpoint.stem for checkpoint in path.glob("*.json")]
+            shutil.rmtree(path, True)
+            return checkpoint_ids
+
+        for checkpoint_id in await asyncio.to_thread(delete):
+            self._runs.pop(checkpoint_id, None)
+
+    def _checkpoint_path(self, checkpoint_id: str) -> Path | None:
+        run_id = self._runs.get(checkpoint_id)
+        if run_id is None:
+            return None
+        return self._run_path(run_id) / f"{checkpoint_id}.json"
+
+    def _run_path(self, run_id: str) -> Path:
+        # the run id names a directory
+        if not RUN_ID_PATTERN.fullmatch(run_id) or run_id in (".", ".."):
+            raise ValueError(f"Invalid run id: {run_id!r}")
+        return self.root / run_id
+
+
+def _read(path: Path) -> WorkflowCheckpoint:
+    return WorkflowCheckpoint.from_dict(json.loads(path.read_text()))
@@ -0,0 +1,170 @@
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from functools import partial
+
+from lagom.environment import Env
+
+from maf_workflow.models.cache_stats import CacheStats
+from maf_workflow.models.intent_detection_result import IntentDetectionResult
+from maf_workflow.protocols.i_intent_cache_service import IIntentCacheService
+from maf_workflow.utils.sqlite_thread import SQLiteThread
+from maf_workflow.utils.text import normalize_message
+from maf_workflow.utils.ttl_lru_cache import TTLLRUCache
+
+
+class IntentCacheServiceEnv(Env):
+    intent_cache_enabled: bool = False
+    intent_cache_max_entries: int = 10_000
+    intent_cache_max_bytes: int = 16 * 1024 * 1024
+    intent_cache_ttl_seconds: float = 24 * 60 * 60
+    intent_cache_sqlite_path: str | None = None
+
+
+@dataclass
+class IntentCacheService(IIntentCacheService):
+    """Caches intent detection results by normalized message.
+
+    Entries are kept in a bounded in-memory LRU cache with a TTL. When
+    `INTENT_CACHE_SQLITE_PATH` is set, entries are also written to a SQLite
+    database so that they survive restarts; the database holds at most
+    `INTENT_CACHE_MAX_ENTRIES` rows and is read on an in-memory miss. The
+    database is used from its own thread, off the event loop; the number of rows
+    is kept there too, so the least recently used rows are only looked for once
+    a new row goes over the limit.
+    """
+
+    env: IntentCacheServiceEnv
+    _memory: TTLLRUCache[str, IntentDetectionResult] = field(init=False, repr=False)
+    _db: SQLiteThread | None = field(default=None, init=False, repr=False)
+    _rows: int = field(default=0, init=False, repr=False)
+    _stats: CacheStats = field(default_factory=CacheStats, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # wall clock rather than monotonic, the expiry is persisted with the entry
+        self._memory = TTLLRUCache(
+            max_entries=self.env.intent_cache_max_entries,
+            ttl=self.env.intent_cache_ttl_seconds,
+            max_bytes=self.env.intent_cache_max_bytes,
+            clock=time.time,
+        )
+        if self.env.intent_cache_enabled and self.env.intent_cache_sqlite_path:
+            self._db = SQLiteThread(
+                partial(self._open_db, self.env.intent_cache_sqlite_path)
+            )
+
+    async def get(self, text: str) -> IntentDetectionResult | None:
+        if not self.env.intent_cache_enabled:
+            return None
+
+        key = normalize_message(text)
+        result = self._memory.get(key)
+        if result is None and self._db is not None:
+            row = await self._db.run(partial(self._load, key))
+            if row is not None:
+                value, expires_at = row
+                result = IntentDetectionResult.model_validate_json(value)
+                # promote to memory with the remaining lifetime of the row
+                self._memory.set(
+                    key,
+                    result,
+                    ttl=expires_at - time.time(),
+                    size=len(key) + len(value),
+                )
+
+        if result is None:
+            self._stats.misses += 1
+            return None
+
+        self._stats.hits += 1
+        return result.model_copy(update={"message_content": text})
+
+    async def set(self, text: str, result: IntentDetectionResult) -> None:
+        if not self.env.intent_cache_enabled:
+            return
+
+        key = normalize_message(text)
+        value = result.model_dump_json()
+        self._memory.set(key, result, size=len(key) + len(value))
+        if self._db is not None:
+            expires_at = time.time() + self.env.intent_cache_ttl_seconds
+            self._stats.evictions += await self._db.run(
+                partial(self._store, key, value, expires_at)
+            )
+
+    def get_stats(self) -> CacheStats:
+        memory = self._memory.get_stats()
+        return self._stats.model_copy(
+            update={
+                "evictions": self._stats.evictions + memory.evictions,
+                "expirations": self._stats.expirations + memory.expirations,
+                "entries": memory.entries,
+                "size_bytes": memory.size_bytes,
+            }
+        )
+
+    # the methods below run on the database thread
+
+    def _open_db(self, path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(path, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS intent_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        db.execute(
+            "CREATE INDEX IF NOT EXISTS intent_cache_accessed_at "
+            "ON intent_cache (accessed_at)"
+        )
+        db.execute("DELETE FROM intent_cache WHERE expires_at <= ?", (time.time(),))
+        (self._rows,) = db.execute("SELECT COUNT(*) FROM intent_cache").fetchone()
+        return db
+
+    def _load(self, key: str, db: sqlite3.Connection) -> tuple[str, float] | None:
+        row = db.execute(
+            "SELECT value, expires_at FROM intent_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, expires_at = row
+        now = time.time()
+        if expires_at <= now:
+            db.execute("DELETE FROM intent_cache WHERE key = ?", (key,))
+            self._rows -= 1
+            return None
+
+        db.execute("UPDATE intent_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return value, expires_at
+
+    def _store(
+        self, key: str, value: str, expires_at: float, db: sqlite3.Connection
+    ) -> int:
+        now = time.time()
+        updated = db.execute(
+            "UPDATE intent_cache SET value = ?, expires_at = ?, accessed_at = ? "
+            "WHERE key = ?",
+            (value, expires_at, now, key),
+        )
+        if updated.rowcount:
+            return 0
+
+        db.execute(
+            "INSERT INTO intent_cache VALUES (?, ?, ?, ?)",
+            (key, value, expires_at, now),
+        )
+        self._rows += 1
+        excess = self._rows - self.env.intent_cache_max_entries
+        if excess <= 0:
+            return 0
+
+        # the oldest rows, read from the start of the index
+        evicted = db.execute(
+            "DELETE FROM intent_cache WHERE key IN (SELECT key FROM intent_cache "
+            "ORDER BY accessed_at LIMIT ?)",
+            (excess,),
+        )
+        self._rows -= evicted.rowcount
+        return evicted.rowcount
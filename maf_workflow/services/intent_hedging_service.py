@@ -0,0 +1,125 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from lagom.environment import Env
+
+from maf_workflow.models.hedging_stats import HedgingStats
+from maf_workflow.protocols.i_intent_hedging_service import IIntentHedgingService
+from maf_workflow.utils.histogram import WindowedHistogram
+
+
+class IntentHedgingServiceEnv(Env):
+    intent_hedging_enabled: bool = False
+    intent_hedging_percentile: float = 0.95
+    intent_hedging_initial_delay_ms: float = 1000.0
+    intent_hedging_min_delay_ms: float = 50.0
+    intent_hedging_min_samples: int = 20
+    intent_hedging_budget: float = 0.1
+    intent_hedging_window_seconds: float = 60.0
+
+
+@dataclass
+class IntentHedgingService(IIntentHedgingService):
+    """Hedges the intent detection calls against tail latency.
+
+    A call that has not completed after the `intent_hedging_percentile` of the
+    latency of earlier calls gets a duplicate; the first to succeed is used and the
+    other is cancelled. The latency is that of the calls of the last one to two
+    `intent_hedging_window_seconds`, so the delay follows the latency as it
+    changes. A call cancelled after the delay is recorded with the time it ran,
+    a lower bound of its latency, so that the calls given up on do not pull the
+    percentile down. Until `intent_hedging_min_samples` calls are recorded, the
+    delay is `intent_hedging_initial_delay_ms`. At most `intent_hedging_budget`
+    of the calls are hedged, which caps the extra spend. When disabled, calls
+    are passed through.
+    """
+
+    env: IntentHedgingServiceEnv
+    _latency: WindowedHistogram = field(init=False, repr=False)
+    _stats: HedgingStats = field(default_factory=HedgingStats, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._latency = WindowedHistogram(self.env.intent_hedging_window_seconds)
+
+    @property
+    def delay(self) -> float:
+        if self._latency.count < self.env.intent_hedging_min_samples:
+            delay = self.env.intent_hedging_initial_delay_ms / 1000
+        else:
+            delay = self._latency.percentile(self.env.intent_hedging_percentile)
+        return max(delay, self.env.intent_hedging_min_delay_ms / 1000)
+
+    async def run[T](self, call: Callable[[], Awaitable[T]]) -> T:
+        if not self.env.intent_hedging_enabled:
+            return await call()
+
+        self._stats.calls += 1
+        delay = self.delay
+        first = self._start(call, delay)
+        try:
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if done or not self._within_budget():
+                return await first
+
+            self._stats.hedged += 1
+            second = self._start(call, delay)
+            result, winner = await self._first_success([first, second])
+            self._stats.hedge_wins += winner is second
+            return result
+        finally:
+            # when the caller is cancelled while waiting for the first call
+            first.cancel()
+
+    def get_stats(self) -> HedgingStats:
+        return self._stats.model_copy(update={"delay_seconds": self.delay})
+
+    def _within_budget(self) -> bool:
+        if self._stats.hedged < self.env.intent_hedging_budget * self._stats.calls:
+            return True
+        self._stats.budget_denied += 1
+        return False
+
+    def _start[T](
+        self, call: Callable[[], Awaitable[T]], delay: float
+    ) -> asyncio.Future[T]:
+        started = time.perf_counter()
+
+        async def timed() -> T:
+            try:
+                result = await call()
+            except asyncio.CancelledError:
+                # given up on once slower than the delay: its latency is at least
+                # the time it ran; cancelled earlier, it tells nothing
+                elapsed = time.perf_counter() - started
+                if elapsed >= delay:
+                    self._latency.record(elapsed)
+                raise
+            self._latency.record(time.perf_counter() - started)
+            return result
+
+        return asyncio.ensure_future(timed())
+
+    async def _first_success[T](
+        self, calls: list[asyncio.Future[T]]
+    ) -> tuple[T, asyncio.Future[T]]:
+        pending: set[asyncio.Future[T]] = set(calls)
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    if future.exception() is None:
+                        return future.result(), future
+                    error = error or future.exception()
+            assert error is not None
+            raise error
+        finally:
+            for future in calls:
+                if not future.done():
+                    future.cancel()
+                elif not future.cancelled():
+                    future.exception()  # the error of a loser is not raised
@@ -0,0 +1,278 @@
+import asyncio
+import itertools
+import json
+import math
+import random
+import re
+from collections.abc import AsyncIterable, AsyncIterator, MutableSequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from agent_framework import (
+    ChatMessage,
+    ChatOptions,
+    ChatResponse,
+    ChatResponseUpdate,
+    Role,
+    TextContent,
+    UsageContent,
+    UsageDetails,
+)
+from agent_framework.azure import AzureOpenAIChatClient
+from agent_framework.exceptions import ServiceResponseException
+from lagom.environment import Env
+
+from maf_workflow.models.chat_client_pool_stats import ChatClientPoolStats
+from maf_workflow.models.intent_answer_result import IntentAnswerResult
+from maf_workflow.models.intent_detection_result import (
+    INTENT_FLAGS,
+    IntentDetectionResult,
+)
+from maf_workflow.models.question_response import QuestionResponse
+from maf_workflow.protocols.i_azure_open_ai_chat_client_service import (
+    IAzureOpenAIChatClientService,
+)
+from maf_workflow.services.rule_based_intent_classifier_service import GREETING
+from maf_workflow.utils.prompt_cache import CACHED_TOKENS_KEY
+from maf_workflow.utils.rate_limit_scheduler import RateLimitScheduler
+from maf_workflow.utils.text import normalize_message
+
+INTERROGATIVE = re.compile(
+    r"^(what|who|whom|whose|when|where|why|how|which|can|could|would|will|should"
+    r"|is|are|was|were|do|does|did|may|might|shall|please|tell|explain|show|help)\b"
+)
+INAPPROPRIATE = re.compile(r"\b(stupid|idiot|dumb|hate you|shut up)\b")
+WORDS = (
+    "the service processes requests with care and returns a clear answer based "
+    "on the information available to the assistant at this time"
+).split()
+
+
+class MockChatClientServiceEnv(Env):
+    mock_chat_client_latency_ms: float = 200.0
+    mock_chat_client_latency_stddev_ms: float = 50.0
+    mock_chat_client_latency_distribution: Literal[
+        "constant", "uniform", "normal", "lognormal"
+    ] = "lognormal"
+    mock_chat_client_error_rate: float = 0.0
+    mock_chat_client_output_tokens: int = 64
+    mock_chat_client_responses_path: str | None = None
+    mock_chat_client_seed: int | None = None
+    mock_chat_client_requests_per_minute: int | None = None
+    mock_chat_client_tokens_per_minute: int | None = None
+    mock_chat_client_max_concurrency: int = 100
+
+
+class MockAzureOpenAIChatClient(AzureOpenAIChatClient):
+    """Azure OpenAI chat client that answers locally instead of calling Azure.
+
+    Only the request to the service is replaced, so agents built on it go through
+    the same middleware as with the real client. Replies are looked up in the
+    canned responses by normalized message, or generated for the requested
+    response format; latency, errors and token counts follow the environment.
+    Calls are queued by a `RateLimitScheduler`, as with the real client. The
+    system messages leading a request are reported as cached prompt tokens once
+    the same ones have been sent before, like a provider-side prompt cache.
+    """
+
+    def __init__(
+        self, env: MockChatClientServiceEnv, canned: dict[str, str], **kwargs: Any
+    ):
+        super().__init__(
+            endpoint="https://mock.openai.azure.com",
+            deployment_name="mock",
+            api_key="mock",
+            **kwargs,
+        )
+        self._env = env
+        self._canned = canned
+        self._random = random.Random(env.mock_chat_client_seed)
+        self.scheduler = RateLimitScheduler(
+            requests_per_minute=env.mock_chat_client_requests_per_minute,
+            tokens_per_minute=env.mock_chat_client_tokens_per_minute,
+            max_concurrency=env.mock_chat_client_max_concurrency,
+        )
+        self.requests = 0
+        self.in_flight = 0
+        self.failures = 0
+        self._prefixes: set[str] = set()
+
+    async def _inner_get_response(
+        self,
+        *,
+        messages: MutableSequence[ChatMessage],
+        chat_options: ChatOptions,
+        **kwargs: Any,
+    ) -> ChatResponse:
+        reply = self.reply(messages[-1].text, chat_options.response_format)
+        usage = self.usage(messages, reply)
+        async with self._call(usage):
+            await asyncio.sleep(self.latency())
+        return ChatResponse(
+            messages=[ChatMessage(Role.ASSISTANT, text=reply)],
+            usage_details=usage,
+            model_id="mock",
+            response_format=chat_options.response_format,
+        )
+
+    async def _inner_get_streaming_response(
+        self,
+        *,
+        messages: MutableSequence[ChatMessage],
+        chat_options: ChatOptions,
+        **kwargs: Any,
+    ) -> AsyncIterable[ChatResponseUpdate]:
+        reply = self.reply(messages[-1].text, chat_options.response_format)
+        usage = self.usage(messages, reply)
+        # half of the latency before the first token, the rest spread over tokens
+        latency = self.latency()
+        chunks = [reply[i : i + 4] for i in range(0, len(reply), 4)]
+        async with self._call(usage):
+            await asyncio.sleep(latency / 2)
+            for chunk in chunks:
+                yield ChatResponseUpdate(
+                    contents=[TextContent(text=chunk)],
+                    role=Role.ASSISTANT,
+                    model_id="mock",
+                )
+                await asyncio.sleep(latency / 2 / len(chunks))
+        yield ChatResponseUpdate(
+            contents=[UsageContent(usage)], role=Role.ASSISTANT, model_id="mock"
+        )
+
+    def reply(self, text: str, response_format: type | None) -> str:
+        canned = self._canned.get(normalize_message(text))
+        if canned is not None:
+            return canned
+        if response_format is IntentDetectionResult:
+            return self._intent(text).model_dump_json()
+        if response_format is IntentAnswerResult:
+            intent = self._intent(text)
+            return IntentAnswerResult(
+                **intent.model_dump(),
+                answer=self._words() if intent.is_question else "",
+            ).model_dump_json()
+        if response_format is QuestionResponse:
+            return QuestionResponse(
+                user_question=text, response=self._words()
+            ).model_dump_json()
+        return self._words()
+
+    def latency(self) -> float:
+        env = self._env
+        mean = env.mock_chat_client_latency_ms / 1000
+        stddev = env.mock_chat_client_latency_stddev_ms / 1000
+        match env.mock_chat_client_latency_distribution:
+            case "constant":
+                return mean
+            case "uniform":
+                return self._random.uniform(max(0.0, mean - stddev), mean + stddev)
+            case "normal":
+                return max(0.0, self._random.gauss(mean, stddev))
+            case "lognormal":
+                if mean <= 0:
+                    return 0.0
+                sigma = math.sqrt(math.log(1 + (stddev / mean) ** 2))
+                return self._random.lognormvariate(math.log(mean) - sigma**2 / 2, sigma)
+
+    def usage(self, messages: MutableSequence[ChatMessage], reply: str) -> UsageDetails:
+        # about four characters per token
+        input_tokens = sum(len(m.text) for m in messages) // 4 + 1
+        output_tokens = len(reply) // 4 + 1
+        prefix = "".join(
+            m.text
+            for m in itertools.takewhile(lambda m: m.role == Role.SYSTEM, messages)
+        )
+        cached = len(prefix) // 4 if prefix in self._prefixes else 0
+        self._prefixes.add(prefix)
+        return UsageDetails(
+            input_token_count=input_tokens,
+            output_token_count=output_tokens,
+            total_token_count=input_tokens + output_tokens,
+            **{CACHED_TOKENS_KEY: cached},
+        )
+
+    @asynccontextmanager
+    async def _call(self, usage: UsageDetails) -> AsyncIterator[None]:
+        # one request to the service, from its slot in the scheduler to its reply
+        await self.scheduler.acquire("mock", usage.total_token_count or 0)
+        self.requests += 1
+        self.in_flight += 1
+        status_code = 500
+        try:
+            yield
+            if self._random.random() < self._env.mock_chat_client_error_rate:
+                self.failures += 1
+                raise ServiceResponseException("Mock chat client error.")
+            status_code = 200
+        finally:
+            self.in_flight -= 1
+            self.scheduler.release("mock", status_code)
+
+    def _intent(self, text: str) -> IntentDetectionResult:
+        normalized = " ".join(re.sub(r"[^\w\s']", " ", text.casefold()).split())
+        if GREETING.match(normalized):
+            flag, response = "is_greeting", "Hello! How can I help you today?"
+        elif INAPPROPRIATE.search(normalized):
+            flag, response = "is_inappropriate", ""
+        elif text.rstrip().endswith("?") or INTERROGATIVE.match(normalized):
+            flag, response = "is_question", ""
+        else:
+            flag, response = "is_statement", ""
+        return IntentDetectionResult(
+            message_content=text,
+            response=response,
+            **{f: f == flag for f in INTENT_FLAGS},
+        )
+
+    def _words(self) -> str:
+        count = max(1, self._env.mock_chat_client_output_tokens)
+        return " ".join(self._random.choice(WORDS) for _ in range(count)).capitalize()
+
+
+@dataclass
+class MockChatClientService(IAzureOpenAIChatClientService):
+    """Local stand-in for `AzureOpenAIChatClientService`, see `MOCK_CHAT_CLIENT`."""
+
+    env: MockChatClientServiceEnv
+    _client: MockAzureOpenAIChatClient | None = field(
+        default=None, init=False, repr=False
+    )
+
+    def get_client(self) -> MockAzureOpenAIChatClient:
+        if self._client is None:
+            self._client = MockAzureOpenAIChatClient(self.env, self._load_canned())
+        return self._client
+
+    async def warmup(self, connections: int = 1) -> None:
+        # nothing to connect to
+        self.get_client()
+
+    def get_pool_stats(self) -> ChatClientPoolStats:
+        client = self.get_client()
+        return ChatClientPoolStats(
+            max_connections=0,
+            max_keepalive_connections=0,
+            keepalive_expiry=0.0,
+            http2=False,
+            requests=client.requests,
+            in_flight=client.in_flight,
+            failures=client.failures,
+            queued=client.scheduler.queued,
+            throttled=client.scheduler.throttled,
+            concurrency_limit=client.scheduler.concurrency_limit("mock"),
+        )
+
+    def _load_canned(self) -> dict[str, str]:
+        # a JSON object mapping messages to replies (a JSON string or object)
+        if not self.env.mock_chat_client_responses_path:
+            return {}
+        with open(self.env.mock_chat_client_responses_path, encoding="utf-8") as f:
+            responses = json.load(f)
+        return {
+            normalize_message(message): (
+                reply if isinstance(reply, str) else json.dumps(reply)
+            )
+            for message, reply in responses.items()
+        }
@@ -0,0 +1,76 @@
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from lagom.environment import Env
+
+from maf_workflow.models.question_response import QuestionResponse
+from maf_workflow.models.question_response_cache_stats import (
+    QuestionResponseCacheStats,
+)
+from maf_workflow.protocols.i_question_response_cache_service import (
+    IQuestionResponseCacheService,
+)
+from maf_workflow.utils.single_flight import SingleFlight
+from maf_workflow.utils.text import normalize_message
+from maf_workflow.utils.ttl_lru_cache import TTLLRUCache
+
+
+class QuestionResponseCacheServiceEnv(Env):
+    question_cache_enabled: bool = False
+    question_cache_max_entries: int = 1_000
+    question_cache_max_bytes: int = 16 * 1024 * 1024
+    question_cache_ttl_seconds: float = 60 * 60
+
+
+@dataclass
+class QuestionResponseCacheService(IQuestionResponseCacheService):
+    """Caches the customer agent answers by normalized question.
+
+    Only validated answers are cached. Identical questions arriving while an
+    answer is being fetched wait for that fetch instead of calling the agent
+    again. When disabled, every call is passed through to the agent.
+    """
+
+    env: QuestionResponseCacheServiceEnv
+    _memory: TTLLRUCache[str, QuestionResponse] = field(init=False, repr=False)
+    _in_flight: SingleFlight[str, QuestionResponse] = field(
+        default_factory=SingleFlight, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        self._memory = TTLLRUCache(
+            max_entries=self.env.question_cache_max_entries,
+            ttl=self.env.question_cache_ttl_seconds,
+            max_bytes=self.env.question_cache_max_bytes,
+        )
+
+    async def get_or_fetch(
+        self, question: str, fetch: Callable[[], Awaitable[QuestionResponse]]
+    ) -> QuestionResponse:
+        if not self.env.question_cache_enabled:
+            return await fetch()
+
+        key = normalize_message(question)
+        answer = self._memory.get(key)
+        if answer is None:
+            shared = key in self._in_flight
+            answer = await self._in_flight.do(key, lambda: self._fetch(key, fetch))
+            if not shared:
+                return answer
+
+        # the answer was fetched for another wording of the question
+        return answer.model_copy(update={"user_question": question})
+
+    def get_stats(self) -> QuestionResponseCacheStats:
+        return QuestionResponseCacheStats(
+            **self._memory.get_stats().model_dump(exclude={"hit_rate"}),
+            calls=self._in_flight.calls,
+            coalesced=self._in_flight.coalesced,
+        )
+
+    async def _fetch(
+        self, key: str, fetch: Callable[[], Awaitable[QuestionResponse]]
+    ) -> QuestionResponse:
+        answer = await fetch()
+        self._memory.set(key, answer, size=len(key) + len(answer.model_dump_json()))
+        return answer
@@ -0,0 +1,92 @@
+import re
+from dataclasses import dataclass, field
+
+from lagom.environment import Env
+
+from maf_workflow.models.intent_classifier_stats import IntentClassifierStats
+from maf_workflow.models.intent_detection_result import (
+    INTENT_FLAGS,
+    IntentDetectionResult,
+)
+from maf_workflow.protocols.i_intent_classifier_service import (
+    IIntentClassifierService,
+)
+
+GREETING = re.compile(
+    r"^(hi|hello|hey|hiya|howdy|greetings|good (morning|afternoon|evening|day))"
+    r"( (there|everyone|all|folks|team))?$"
+)
+ACKNOWLEDGEMENT = re.compile(
+    r"^(thanks|thank you|thank you so much|thanks a lot|many thanks|ok|okay|got it"
+    r"|cool|great|nice|noted|i see|sounds good|understood|perfect|awesome)$"
+)
+
+# confidence of each rule, a rule applies when it reaches the configured threshold
+GREETING_CONFIDENCE = 0.99
+ACKNOWLEDGEMENT_CONFIDENCE = 0.97
+
+
+class RuleBasedIntentClassifierServiceEnv(Env):
+    intent_fast_path_enabled: bool = False
+    intent_fast_path_confidence_threshold: float = 0.9
+    intent_fast_path_max_words: int = 12
+
+
+@dataclass
+class RuleBasedIntentClassifierService(IIntentClassifierService):
+    """Deterministic lexicon and rule based classifier placed in front of the LLM.
+
+    Messages are only answered locally when they match one of the neutral
+    greeting and acknowledgement lexicons. Anything else, questions included, may
+    be inappropriate and is left to the LLM, the only one that can tell.
+    """
+
+    env: RuleBasedIntentClassifierServiceEnv
+    _stats: IntentClassifierStats = field(
+        default_factory=IntentClassifierStats, init=False, repr=False
+    )
+
+    def classify(self, text: str) -> IntentDetectionResult | None:
+        if not self.env.intent_fast_path_enabled:
+            return None
+
+        self._stats.requests += 1
+        normalized = " ".join(re.sub(r"[^\w\s']", " ", text.casefold()).split())
+        if (
+            not normalized
+            or len(normalized.split()) > self.env.intent_fast_path_max_words
+        ):
+            return None
+
+        score = self._score(text, normalized)
+        if score is None:
+            return None
+        flag, confidence, response = score
+        if confidence < self.env.intent_fast_path_confidence_threshold:
+            return None
+
+        self._stats.hits += 1
+        self._stats.hits_by_intent[flag] = self._stats.hits_by_intent.get(flag, 0) + 1
+        return IntentDetectionResult(
+            message_content=text,
+            response=response,
+            **{f: f == flag for f in INTENT_FLAGS},
+        )
+
+    def get_stats(self) -> IntentClassifierStats:
+        return self._stats.model_copy(deep=True)
+
+    def _score(self, text: str, normalized: str) -> tuple[str, float, str] | None:
+        if GREETING.match(normalized):
+            greeting = normalized.split()[0]
+            if greeting == "good":
+                greeting = " ".join(normalized.split()[:2])
+            return (
+                "is_greeting",
+                GREETING_CONFIDENCE,
+                f"{greeting.capitalize()}! How can I help you today?",
+            )
+        if ACKNOWLEDGEMENT.match(normalized):
+            return "is_statement", ACKNOWLEDGEMENT_CONFIDENCE, ""
+        # any other message may be inappropriate, only the LLM can tell
+        return None
@@ -0,0 +1,302 @@
+import json
+import sqlite3
+import uuid
+from collections.abc import AsyncIterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any
+
+from agent_framework import ChatMessage
+from lagom.environment import Env
+
+from maf_workflow.protocols.i_chat_message_store_service import (
+    IChatMessageStoreService,
+)
+from maf_workflow.utils.sqlite_thread import SQLiteThread
+
+POSITION_KEY = "chat_message_store"
+"""Additional property of serialized messages holding their thread and position."""
+
+
+class SQLiteChatMessageStoreServiceEnv(Env):
+    chat_message_store_sqlite_path: str = ":memory:"
+    chat_message_store_max_messages: int | None = None
+    chat_message_store_page_size: int = 100
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Opens the message database, creating the table if needed."""
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    # clustered by thread, so the messages of a thread are contiguous on disk
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS chat_messages ("
+        "thread_id TEXT NOT NULL, seq INTEGER NOT NULL, message TEXT NOT NULL, "
+        "PRIMARY KEY (thread_id, seq)) WITHOUT ROWID"
+    )
+    return db
+
+
+class SQLiteChatMessageStore:
+    """Messages of one thread, appended to a SQLite table.
+
+    Only the position of the next message is kept in memory: adding messages
+    writes the new rows and nothing else, and `list_messages` and
+    `iter_messages` read the rows back a page at a time. `serialize` returns the
+    messages added since the previous call (a delta from the last checkpoint)
+    with their position, and `update_from_state` applies such deltas in order,
+    so a thread can be resumed or copied to another database. With
+    `max_messages`, the oldest messages of the thread are deleted once there are
+    more. The queries run on the thread of `db`, off the event loop, and the
+    bounds of the thread are read with the first of them, so creating a store
+    does no I/O. A thread should have one store writing to it at a time.
+    """
+
+    def __init__(
+        self,
+        db: SQLiteThread,
+        thread_id: str,
+        max_messages: int | None = None,
+        page_size: int = 100,
+    ):
+        self.db = db
+        self.thread_id = thread_id
+        self.max_messages = max_messages
+        self.page_size = page_size
+        self._loaded = False
+        self._first = self._end = self._checkpoint = 0
+
+    async def count(self) -> int:
+        """Gets the number of messages stored for the thread."""
+        return await self.db.run(self._count)
+
+    async def first_position(self) -> int:
+        """Gets the position in the thread of the oldest message still stored."""
+        return await self.db.run(self._first_position)
+
+    async def add_messages(self, messages: Sequence[ChatMessage]) -> None:
+        await self.db.run(partial(self._add, messages))
+
+    async def list_messages(
+        self, offset: int = 0, limit: int | None = None
+    ) -> list[ChatMessage]:
+        """Gets the messages of the thread, oldest first.
+
+        `offset` and `limit` select a page of them.
+        """
+        rows = await self.db.run(partial(self._select, offset, limit))
+        return [ChatMessage.from_json(message) for _, message in rows]
+
+    async def iter_messages(self) -> AsyncIterator[ChatMessage]:
+        """Yields the messages of the thread, oldest first, reading a page at a time."""
+        seq: int | None = None
+        while True:
+            rows = await self.db.run(partial(self._page, seq))
+            for _, message in rows:
+                yield ChatMessage.from_json(message)
+            if len(rows) < self.page_size:
+                return
+            seq = rows[-1][0] + 1
+
+    @classmethod
+    async def deserialize(
+        cls, serialized_store_state: Any, **kwargs: Any
+    ) -> "SQLiteChatMessageStore":
+        """Creates a store from serialized state; the `db` keyword is required."""
+        db = kwargs.pop("db", None)
+        if not isinstance(db, SQLiteThread):
+            raise ValueError("A `db` SQLiteThread is needed to deserialize the store.")
+        store = cls(db, uuid.uuid4().hex)
+        await store.update_from_state(serialized_store_state, **kwargs)
+        return store
+
+    async def update_from_state(
+        self, serialized_store_state: Any, **kwargs: Any
+    ) -> None:
+        """Switches to the thread of the state and applies the messages in it.
+
+        Messages already stored are left as they are, so applying a delta twice
+        or to the database it came from changes nothing. `AgentThread` only keeps
+        the messages of the state, the thread is then taken from them or from the
+        `thread_id` keyword. Messages without a position, such as those of the
+        framework's in-memory store, are added after the stored ones.
+        """
+        if not serialized_store_state:
+            return
+        if isinstance(serialized_store_state, Mapping):
+            thread_id = serialized_store_state.get("thread_id")
+            messages = serialized_store_state.get("messages", [])
+        else:
+            thread_id, messages = None, serialized_store_state.messages
+
+        rows: list[tuple[int | None, str]] = []
+        for message in messages:
+            data = (
+                message.to_dict() if isinstance(message, ChatMessage) else dict(message)
+            )
+            properties = dict(data.get("additional_properties") or {})
+            position = properties.pop(POSITION_KEY, None)
+            data["additional_properties"] = properties
+            if position is None:
+                rows.append((None, json.dumps(data)))
+            else:
+                thread_id = thread_id or position["thread_id"]
+                rows.append((position["seq"], json.dumps(data)))
+
+        self.thread_id = thread_id or kwargs.get("thread_id") or self.thread_id
+        await self.db.run(partial(self._apply, rows))
+
+    async def serialize(self, **kwargs: Any) -> Any:
+        """Serializes the messages added since the last call.
+
+        Pass `full=True` for all the stored messages instead. Each message keeps
+        its thread and position under `POSITION_KEY` of its additional
+        properties.
+        """
+        rows = await self.db.run(partial(self._delta, bool(kwargs.get("full"))))
+        messages: list[ChatMessage] = []
+        for seq, message in rows:
+            chat_message = ChatMessage.from_json(message)
+            chat_message.additional_properties[POSITION_KEY] = {
+                "thread_id": self.thread_id,
+                "seq": seq,
+            }
+            messages.append(chat_message)
+        return {"thread_id": self.thread_id, "messages": messages}
+
+    # the methods below run on the thread of `db`, one at a time
+
+    def _count(self, db: sqlite3.Connection) -> int:
+        self._ensure_bounds(db)
+        return self._end - self._first
+
+    def _first_position(self, db: sqlite3.Connection) -> int:
+        self._ensure_bounds(db)
+        return self._first
+
+    def _add(self, messages: Sequence[ChatMessage], db: sqlite3.Connection) -> None:
+        self._ensure_bounds(db)
+        with db:
+            db.executemany(
+                "INSERT INTO chat_messages VALUES (?, ?, ?)",
+                [
+                    (self.thread_id, self._end + i, message.to_json())
+                    for i, message in enumerate(messages)
+                ],
+            )
+        self._end += len(messages)
+        self._compact(db)
+
+    def _select(
+        self, offset: int, limit: int | None, db: sqlite3.Connection
+    ) -> list[tuple[int, str]]:
+        self._ensure_bounds(db)
+        return db.execute(
+            "SELECT seq, message FROM chat_messages WHERE thread_id = ? AND seq >= ? "
+            "ORDER BY seq LIMIT ?",
+            (self.thread_id, self._first + offset, -1 if limit is None else limit),
+        ).fetchall()
+
+    def _page(self, seq: int | None, db: sqlite3.Connection) -> list[tuple[int, str]]:
+        self._ensure_bounds(db)
+        return db.execute(
+            "SELECT seq, message FROM chat_messages WHERE thread_id = ? AND seq >= ? "
+            "ORDER BY seq LIMIT ?",
+            (self.thread_id, self._first if seq is None else seq, self.page_size),
+        ).fetchall()
+
+    def _apply(
+        self, rows: list[tuple[int | None, str]], db: sqlite3.Connection
+    ) -> None:
+        self._load_bounds(db)
+        start = rows[0][0] if rows else None
+        if self._end > self._first and start is not None and start > self._end:
+            raise ValueError(
+                f"Messages {self._end} to {start - 1} of thread {self.thread_id} "
+                "are missing, the deltas must be applied in order."
+            )
+        end = self._end
+        with db:
+            db.executemany(
+                "INSERT OR IGNORE INTO chat_messages VALUES (?, ?, ?)",
+                [
+                    (self.thread_id, end + i if seq is None else seq, message)
+                    for i, (seq, message) in enumerate(rows)
+                ],
+            )
+        self._load_bounds(db)
+        self._checkpoint = self._end
+        self._compact(db)
+
+    def _delta(self, full: bool, db: sqlite3.Connection) -> list[tuple[int, str]]:
+        self._ensure_bounds(db)
+        rows = db.execute(
+            "SELECT seq, message FROM chat_messages WHERE thread_id = ? "
+            "AND seq >= ? ORDER BY seq",
+            (self.thread_id, self._first if full else self._checkpoint),
+        ).fetchall()
+        self._checkpoint = self._end
+        return rows
+
+    def _ensure_bounds(self, db: sqlite3.Connection) -> None:
+        if not self._loaded:
+            self._load_bounds(db)
+
+    def _load_bounds(self, db: sqlite3.Connection) -> None:
+        first, last = db.execute(
+            "SELECT MIN(seq), MAX(seq) FROM chat_messages WHERE thread_id = ?",
+            (self.thread_id,),
+        ).fetchone()
+        self._first = 0 if first is None else first
+        self._end = 0 if last is None else last + 1
+        self._checkpoint = self._first
+        self._loaded = True
+
+    def _compact(self, db: sqlite3.Connection) -> None:
+        if self.max_messages is None or self._end - self._first <= self.max_messages:
+            return
+        first = self._end - self.max_messages
+        with db:
+            db.execute(
+                "DELETE FROM chat_messages WHERE thread_id = ? AND seq < ?",
+                (self.thread_id, first),
+            )
+        self._first = first
+        self._checkpoint = max(self._checkpoint, first)
+
+
+@dataclass
+class SQLiteChatMessageStoreService(IChatMessageStoreService):
+    """Creates `SQLiteChatMessageStore`s sharing one database connection.
+
+    The database is `CHAT_MESSAGE_STORE_SQLITE_PATH`, opened on first use by the
+    thread that runs its queries. The default, `:memory:`, is a database private
+    to this service and lost when the process exits; set a file path to keep the
+    messages, or to share them with other processes.
+    """
+
+    env: SQLiteChatMessageStoreServiceEnv
+    _db: SQLiteThread = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._db = SQLiteThread(
+            partial(connect, self.env.chat_message_store_sqlite_path)
+        )
+
+    def create_store(self, thread_id: str | None = None) -> SQLiteChatMessageStore:
+        return SQLiteChatMessageStore(
+            self._db,
+            thread_id or uuid.uuid4().hex,
+            self.env.chat_message_store_max_messages,
+            self.env.chat_message_store_page_size,
+        )
+
+    async def delete_thread(self, thread_id: str) -> None:
+        def delete(db: sqlite3.Connection) -> None:
+            with db:
+                db.execute(
+                    "DELETE FROM chat_messages WHERE thread_id = ?", (thread_id,)
+                )
+
+        await self._db.run(delete)
@@ -0,0 +1,149 @@
+import json
+import sqlite3
+from dataclasses import dataclass, field
+from functools import partial
+
+from agent_framework import WorkflowCheckpoint
+from lagom.environment import Env
+
+from maf_workflow.protocols.i_workflow_checkpoint_service import (
+    IWorkflowCheckpointService,
+)
+from maf_workflow.utils.sqlite_thread import SQLiteThread
+
+
+class SQLiteWorkflowCheckpointServiceEnv(Env):
+    workflow_checkpoint_enabled: bool = False
+    workflow_checkpoint_sqlite_path: str = "checkpoints.db"
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Opens the checkpoint database, creating the table if needed."""
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS workflow_checkpoints ("
+        "checkpoint_id TEXT PRIMARY KEY, run_id TEXT NOT NULL, "
+        "iteration INTEGER NOT NULL, timestamp TEXT NOT NULL, "
+        "checkpoint TEXT NOT NULL)"
+    )
+    db.execute(
+        "CREATE INDEX IF NOT EXISTS workflow_checkpoints_run "
+        "ON workflow_checkpoints (run_id, iteration, timestamp)"
+    )
+    return db
+
+
+@dataclass
+class SQLiteWorkflowCheckpointService(IWorkflowCheckpointService):
+    """Keeps workflow checkpoints in a SQLite table, indexed by run.
+
+    The database is `WORKFLOW_CHECKPOINT_SQLITE_PATH` and is opened on first
+    use. The queries, and the JSON encoding of the checkpoints, run on the
+    thread of a `SQLiteThread`, off the event loop. Each checkpoint is written
+    in its own transaction, so a crash keeps the checkpoints of the supersteps
+    that completed.
+    """
+
+    env: SQLiteWorkflowCheckpointServiceEnv
+    _db: SQLiteThread = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._db = SQLiteThread(
+            partial(connect, self.env.workflow_checkpoint_sqlite_path)
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.env.workflow_checkpoint_enabled
+
+    async def save_checkpoint(self, checkpoint: WorkflowCheckpoint) -> str:
+        await self._db.run(partial(_save, checkpoint))
+        return checkpoint.checkpoint_id
+
+    async def load_checkpoint(self, checkpoint_id: str) -> WorkflowCheckpoint | None:
+        return await self._db.run(partial(_load, checkpoint_id))
+
+    async def list_checkpoint_ids(self, workflow_id: str | None = None) -> list[str]:
+        rows = await self._db.run(partial(_select, "checkpoint_id", workflow_id))
+        return [row[0] for row in rows]
+
+    async def list_checkpoints(
+        self, workflow_id: str | None = None
+    ) -> list[WorkflowCheckpoint]:
+        def select(db: sqlite3.Connection) -> list[WorkflowCheckpoint]:
+            return [_parse(row[0]) for row in _select("checkpoint", workflow_id, db)]
+
+        return await self._db.run(select)
+
+    async def delete_checkpoint(self, checkpoint_id: str) -> bool:
+        return await self._db.run(partial(_delete, checkpoint_id))
+
+    async def get_latest_checkpoint_id(self, run_id: str) -> str | None:
+        return await self._db.run(partial(_latest, run_id))
+
+    async def delete_run(self, run_id: str) -> None:
+        await self._db.run(partial(_delete_run, run_id))
+
+
+# the functions below run on the thread of the database
+
+
+def _save(checkpoint: WorkflowCheckpoint, db: sqlite3.Connection) -> None:
+    with db:
+        db.execute(
+            "INSERT OR REPLACE INTO workflow_checkpoints VALUES (?, ?, ?, ?, ?)",
+            (
+                checkpoint.checkpoint_id,
+                checkpoint.workflow_id,
+                checkpoint.iteration_count,
+                checkpoint.timestamp,
+                json.dumps(checkpoint.to_dict()),
+            ),
+        )
+
+
+def _load(checkpoint_id: str, db: sqlite3.Connection) -> WorkflowCheckpoint | None:
+    row = db.execute(
+        "SELECT checkpoint FROM workflow_checkpoints WHERE checkpoint_id = ?",
+        (checkpoint_id,),
+    ).fetchone()
+    return None if row is None else _parse(row[0])
+
+
+def _select(
+    column: str, run_id: str | None, db: sqlite3.Connection
+) -> list[tuple[str]]:
+    where = "" if run_id is None else "WHERE run_id = ? "
+    return db.execute(
+        f"SELECT {column} FROM workflow_checkpoints {where}"
+        "ORDER BY run_id, iteration, timestamp",
+        () if run_id is None else (run_id,),
+    ).fetchall()
+
+
+def _delete(checkpoint_id: str, db: sqlite3.Connection) -> bool:
+    with db:
+        deleted = db.execute(
+            "DELETE FROM workflow_checkpoints WHERE checkpoint_id = ?",
+            (checkpoint_id,),
+        )
+    return deleted.rowcount > 0
+
+
+def _latest(run_id: str, db: sqlite3.Connection) -> str | None:
+    row = db.execute(
+        "SELECT checkpoint_id FROM workflow_checkpoints WHERE run_id = ? "
+        "ORDER BY iteration DESC, timestamp DESC LIMIT 1",
+        (run_id,),
+    ).fetchone()
+    return None if row is None else row[0]
+
+
+def _delete_run(run_id: str, db: sqlite3.Connection) -> None:
+    with db:
+        db.execute("DELETE FROM workflow_checkpoints WHERE run_id = ?", (run_id,))
+
+
+def _parse(checkpoint: str) -> WorkflowCheckpoint:
+    return WorkflowCheckpoint.from_dict(json.loads(checkpoint))
@@ -0,0 +1,71 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from lagom.environment import Env
+
+from maf_workflow.models.executor_stats import ExecutorStats
+from maf_workflow.protocols.i_workflow_metrics_service import (
+    IWorkflowMetricsService,
+)
+from maf_workflow.utils.histogram import Histogram
+
+
+class WorkflowMetricsServiceEnv(Env):
+    workflow_metrics_enabled: bool = True
+
+
+@dataclass
+class _ExecutorMetrics:
+    wall_time: Histogram = field(default_factory=Histogram)
+    queue_wait: Histogram = field(default_factory=Histogram)
+    stats: ExecutorStats = field(default_factory=ExecutorStats)
+
+
+@dataclass
+class WorkflowMetricsService(IWorkflowMetricsService):
+    """Keeps in-process histograms of the executions of each executor."""
+
+    env: WorkflowMetricsServiceEnv
+    _metrics: defaultdict[str, _ExecutorMetrics] = field(
+        default_factory=lambda: defaultdict(_ExecutorMetrics), init=False, repr=False
+    )
+
+    @property
+    def enabled(self) -> bool:
+        return self.env.workflow_metrics_enabled
+
+    def record(
+        self,
+        executor_id: str,
+        wall_time: float,
+        queue_wait: float,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cached_input_tokens: int = 0,
+        payload_size: int = 0,
+        failed: bool = False,
+    ) -> None:
+        metrics = self._metrics[executor_id]
+        metrics.wall_time.record(wall_time)
+        metrics.queue_wait.record(queue_wait)
+        stats = metrics.stats
+        stats.count += 1
+        stats.failures += failed
+        stats.input_tokens += input_tokens
+        stats.output_tokens += output_tokens
+        stats.cached_input_tokens += cached_input_tokens
+        stats.payload_size += payload_size
+
+    def get_stats(self) -> dict[str, ExecutorStats]:
+        return {
+            executor_id: metrics.stats.model_copy(
+                update={
+                    "wall_time": metrics.wall_time.summary(),
+                    "queue_wait": metrics.queue_wait.summary(),
+                }
+            )
+            for executor_id, metrics in sorted(self._metrics.items())
+        }
+
+    def reset(self) -> None:
+        self._metrics.clear()
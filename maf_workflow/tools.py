@@ -0,0 +1,57 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+from collections.abc import Sequence
+from concurrent.futures import Executor
+from typing import Any
+
+from agent_framework import AIFunction, ai_function
+from pydantic import BaseModel
+
+
+def run_in_thread[ArgsT: BaseModel, ReturnT](
+    function: AIFunction[ArgsT, ReturnT], executor: Executor | None = None
+) -> AIFunction[ArgsT, ReturnT]:
+    """Makes a sync tool run on a thread pool instead of the event loop.
+
+    The framework calls sync tools inline, so their I/O stalls every other
+    workflow of the process. The returned tool has the same name, description
+    and arguments, and runs the function on `executor`, the default executor of
+    the loop if not given, with the context variables of the caller. Async
+    tools, such as agents as tools, are returned as they are.
+    """
+    func = function.func
+    if inspect.iscoroutinefunction(func):
+        return function
+
+    async def run(**kwargs: Any) -> ReturnT:
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, functools.partial(context.run, func, **kwargs)
+        )
+
+    return AIFunction(
+        name=function.name,
+        description=function.description,
+        additional_properties=function.additional_properties,
+        func=run,
+        input_model=function.input_model,
+    )
+
+
+def run_sync_tools_in_threads(
+    tools: Sequence[Any], executor: Executor | None = None
+) -> list[Any]:
+    """Applies `run_in_thread` to the functions of a tool list.
+
+    Plain callables are made `ai_function`s first; other tools are kept.
+    """
+    threaded: list[Any] = []
+    for tool in tools:
+        if not isinstance(tool, AIFunction) and callable(tool):
+            tool = ai_function(tool)
+        if isinstance(tool, AIFunction):
+            tool = run_in_thread(tool, executor)
+        threaded.append(tool)
+    return threaded
@@ -0,0 +1,56 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+async def gather_first[T](
+    calls: Sequence[Callable[[], Awaitable[T]]],
+    count: int | None = None,
+    timeout: float | None = None,
+    on_result: Callable[[int, T], Awaitable[None]] | None = None,
+) -> list[tuple[int, T]]:
+    """Runs the calls concurrently and returns once enough of them succeeded.
+
+    Collection stops when `count` calls have succeeded (all of them by
+    default), when `timeout` seconds have passed or when every call is done.
+    The calls still running are then cancelled. Returns the index and result
+    of the successful calls, in the order they finished, and passes each one to
+    `on_result` as soon as it is collected. Failures are logged and skipped; if
+    every call failed, the first failure is raised.
+    """
+    count = len(calls) if count is None else count
+    tasks = {asyncio.ensure_future(call()): i for i, call in enumerate(calls)}
+    pending = set(tasks)
+    results: list[tuple[int, T]] = []
+    failures: list[BaseException] = []
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    try:
+        while pending and len(results) < count:
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            # in the order they were started when several finish together
+            for task in sorted(done, key=tasks.__getitem__):
+                exception = task.exception()
+                if exception is not None:
+                    logger.warning("Fan-out call failed", exc_info=exception)
+                    failures.append(exception)
+                elif len(results) < count:
+                    results.append((tasks[task], task.result()))
+                    if on_result is not None:
+                        await on_result(*results[-1])
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            # lets the cancelled calls release their connections
+            await asyncio.wait(pending)
+    if not results and failures and len(failures) == len(calls):
+        raise failures[0]
+    return results
@@ -0,0 +1,117 @@
+import math
+import time
+from collections.abc import Callable
+
+from maf_workflow.models.latency_summary import LatencySummary
+
+
+class Histogram:
+    """Histogram of non-negative values with log-spaced buckets.
+
+    Memory does not grow with the number of values; percentiles are accurate to
+    the width of a bucket, `growth - 1` relative (5% by default).
+    """
+
+    def __init__(
+        self, min_value: float = 1e-6, growth: float = 1.05, buckets: int = 512
+    ):
+        self.min_value = min_value
+        self.growth = growth
+        # bucket 0 holds the values below `min_value`, the last one the values above
+        # the range
+        self._counts = [0] * (buckets + 1)
+        self._log_growth = math.log(growth)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        if value < self.min_value:
+            index = 0
+        else:
+            index = 1 + int(math.log(value / self.min_value) / self._log_growth)
+            index = min(index, len(self._counts) - 1)
+        self._counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the `q` quantile (0 < q <= 1)."""
+        if not self.count:
+            return 0.0
+
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, count in enumerate(self._counts[:-1]):
+            seen += count
+            if seen >= rank:
+                return min(self.max, self.min_value * self.growth**index)
+        return self.max
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        """Returns a histogram of the values of both, which have the same buckets."""
+        merged = Histogram(self.min_value, self.growth, len(self._counts) - 1)
+        merged._counts = [a + b for a, b in zip(self._counts, other._counts)]
+        merged.count = self.count + other.count
+        merged.sum = self.sum + other.sum
+        merged.max = max(self.max, other.max)
+        return merged
+
+    def summary(self) -> LatencySummary:
+        return LatencySummary(
+            count=self.count,
+            mean=self.sum / self.count if self.count else 0.0,
+            p50=self.percentile(0.5),
+            p95=self.percentile(0.95),
+            p99=self.percentile(0.99),
+            max=self.max,
+        )
+
+
+class WindowedHistogram:
+    """Histogram of the values recorded over the last one to two `window`s.
+
+    Values are recorded in the current histogram, which replaces the previous one
+    once it is `window` seconds old. Old values are dropped a window at a time,
+    so the percentiles follow a change in the distribution instead of being held
+    back by every value seen since the start.
+    """
+
+    def __init__(
+        self,
+        window: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        min_value: float = 1e-6,
+        growth: float = 1.05,
+        buckets: int = 512,
+    ):
+        self.window = window
+        self._clock = clock
+        self._new = lambda: Histogram(min_value, growth, buckets)
+        self._previous = self._new()
+        self._current = self._new()
+        self._started = clock()
+
+    @property
+    def count(self) -> int:
+        self._rotate()
+        return self._previous.count + self._current.count
+
+    def record(self, value: float) -> None:
+        self._rotate()
+        self._current.record(value)
+
+    def percentile(self, q: float) -> float:
+        self._rotate()
+        return self._previous.merge(self._current).percentile(q)
+
+    def _rotate(self) -> None:
+        now = self._clock()
+        elapsed = now - self._started
+        if elapsed < self.window:
+            return
+        # after two windows or more without a rotation, nothing recent is left
+        self._previous = self._current if elapsed < 2 * self.window else self._new()
+        self._current = self._new()
+        self._started = now
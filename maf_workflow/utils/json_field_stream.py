@@ -0,0 +1,111 @@
+import json
+
+ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+class JsonStringFieldStream:
+    """Extracts a string field of a JSON object while the JSON is still arriving.
+
+    Chunks of the JSON document are passed to `feed`, which returns what it could
+    newly decode of the value of `field` (a string member of the top-level
+    object). Escape sequences split across chunks are handled. The document is not
+    validated; parse the complete text once it has arrived.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self.value = ""
+        self.done = False
+        self._depth = 0
+        self._expect_key = False
+        self._key: str | None = None
+        self._in_string = False
+        self._string_is_key = False
+        self._string_is_field = False
+        self._buffer: list[str] = []
+        self._escape: str | None = None
+        self._high_surrogate: str | None = None
+
+    def feed(self, chunk: str) -> str:
+        """Consumes the next chunk; returns the newly decoded part of the field."""
+        delta: list[str] = []
+        for ch in chunk:
+            if self._in_string:
+                self._feed_string(ch, delta)
+            else:
+                self._feed_structure(ch)
+
+        text = "".join(delta)
+        self.value += text
+        return text
+
+    def _feed_structure(self, ch: str) -> None:
+        if ch in "{[":
+            self._depth += 1
+            self._expect_key = self._depth == 1 and ch == "{"
+        elif ch in "}]":
+            self._depth -= 1
+        elif ch == "," and self._depth == 1:
+            self._expect_key = True
+        elif ch == '"':
+            self._in_string = True
+            top_level = self._depth == 1
+            self._string_is_key = top_level and self._expect_key
+            self._string_is_field = (
+                top_level
+                and not self._expect_key
+                and self._key == self.field
+                and not self.done
+            )
+            self._buffer = []
+
+    def _feed_string(self, ch: str, delta: list[str]) -> None:
+        if self._escape is not None:
+            self._escape += ch
+            decoded = self._decode_escape()
+            if decoded is not None:
+                self._escape = None
+                self._append(decoded, delta)
+        elif ch == "\\":
+            self._escape = ""
+        elif ch == '"':
+            self._in_string = False
+            if self._string_is_key:
+                self._key = "".join(self._buffer)
+                self._expect_key = False
+            elif self._string_is_field:
+                self.done = True
+        else:
+            self._append(ch, delta)
+
+    def _decode_escape(self) -> str | None:
+        assert self._escape is not None
+        if self._escape[0] != "u":
+            return ESCAPES.get(self._escape, self._escape)
+        if len(self._escape) < 5:
+            return None  # the rest of \uXXXX is in the next chunk
+        return json.loads(f'"\\{self._escape}"')
+
+    def _append(self, text: str, delta: list[str]) -> None:
+        # a surrogate pair arrives as two \u escapes, emit them together
+        if self._high_surrogate is not None:
+            pair = (self._high_surrogate + text).encode("utf-16", "surrogatepass")
+            text = pair.decode("utf-16", "surrogatepass")
+            self._high_surrogate = None
+        elif len(text) == 1 and "\ud800" <= text <= "\udbff":
+            self._high_surrogate = text
+            return
+
+        if self._string_is_key:
+            self._buffer.append(text)
+        elif self._string_is_field:
+            delta.append(text)
@@ -0,0 +1,65 @@
+import hashlib
+import json
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any
+
+from agent_framework import ChatAgent, ToolProtocol, UsageDetails
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from agent_framework.azure import AzureOpenAIChatClient
+
+CACHED_TOKENS_KEY = "prompt/cached_tokens"
+"""Key of the cached prompt tokens in `UsageDetails.additional_counts`."""
+
+
+def prompt_cache_key(
+    instructions: str,
+    response_format: type[BaseModel] | None = None,
+    tools: Sequence[ToolProtocol] = (),
+) -> str:
+    """Short hash of the static prefix of the requests of an agent.
+
+    Requests sharing a key are routed to the same prompt cache by the service, so
+    agents with the same instructions, response schema and tools share a key.
+    """
+    prefix = {
+        "instructions": instructions,
+        "response_format": (
+            response_format.model_json_schema() if response_format else None
+        ),
+        "tools": [tool.name for tool in tools],
+    }
+    digest = hashlib.sha256(json.dumps(prefix, sort_keys=True).encode())
+    return digest.hexdigest()[:32]
+
+
+def create_cached_prompt_agent(
+    chat_client: "AzureOpenAIChatClient",
+    instructions: str,
+    response_format: type[BaseModel] | None = None,
+    tools: Sequence[ToolProtocol] = (),
+    **kwargs: Any,
+) -> ChatAgent:
+    """Creates an agent whose requests start with an identical prefix.
+
+    The instructions go first, the tools in name order and the response schema
+    after them, and only the conversation varies between requests, so the
+    provider can reuse the prefill of the prefix. The requests carry a
+    `prompt_cache_key` of that prefix.
+    """
+    ordered = sorted(tools, key=lambda tool: tool.name)
+    return chat_client.create_agent(
+        instructions=instructions,
+        response_format=response_format,
+        tools=list(ordered),
+        request_kwargs={
+            "prompt_cache_key": prompt_cache_key(instructions, response_format, ordered)
+        },
+        **kwargs,
+    )
+
+
+def cached_tokens(usage: UsageDetails) -> int:
+    """Prompt tokens of a response that were served from the cache."""
+    return usage.additional_counts.get(CACHED_TOKENS_KEY, 0)
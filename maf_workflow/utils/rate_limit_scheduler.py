@@ -0,0 +1,230 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+
+DEFAULT_RETRY_AFTER = 1.0
+
+
+class Priority(IntEnum):
+    """Order in which queued model calls are sent, highest first."""
+
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+request_priority: ContextVar[Priority] = ContextVar(
+    "request_priority", default=Priority.NORMAL
+)
+"""Priority of the model calls made by the current task, see `priority`."""
+
+
+@contextmanager
+def priority(value: Priority) -> Iterator[None]:
+    """Sets the priority of the model calls made within the block."""
+    token = request_priority.set(value)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+def retry_after(headers: Mapping[str, str]) -> float:
+    """Seconds to wait before the next call, from the headers of a 429 response."""
+    for name, scale in (("retry-after-ms", 1000), ("retry-after", 1)):
+        try:
+            return float(headers[name]) / scale
+        except (KeyError, ValueError):
+            pass
+    return DEFAULT_RETRY_AFTER
+
+
+class _Bucket:
+    # a per-minute budget refilled continuously
+    def __init__(self, per_minute: int, now: float):
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        self.level = min(
+            self.capacity, self.level + (now - self.updated) * self.capacity / 60
+        )
+        self.updated = now
+
+    def wait_time(self, amount: int, now: float) -> float:
+        # more than the whole budget waits for a full bucket and overdraws it
+        self.refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing * 60 / self.capacity)
+
+
+class _Deployment:
+    def __init__(self, max_concurrency: int):
+        self.requests: _Bucket | None = None
+        self.tokens: _Bucket | None = None
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.waiters: list[tuple[Priority, int, int, asyncio.Future[None]]] = []
+        self.timer: asyncio.TimerHandle | None = None
+
+
+class RateLimitScheduler:
+    """Queues model calls so that they stay within the budgets of each deployment.
+
+    Calls wait in `acquire` until the deployment has a free concurrency slot and
+    enough of its requests-per-minute and tokens-per-minute budgets, then go in
+    priority order (first come, first served within a priority). The concurrency
+    limit adapts: it grows by about one per round trip while calls succeed and is
+    halved by a 429, after which the deployment is paused for the `retry-after` of
+    the response. The `x-ratelimit-remaining-*` headers of responses correct the
+    budgets, which are only estimates on this side.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+        max_concurrency: int = 100,
+        min_concurrency: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.clock = clock
+        self.throttled = 0
+        self._deployments: dict[str, _Deployment] = {}
+        self._sequence = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        """Number of calls waiting to be sent."""
+        return sum(
+            not future.done()
+            for state in self._deployments.values()
+            for *_, future in state.waiters
+        )
+
+    def concurrency_limit(self, deployment: str) -> int:
+        """Current concurrency limit of the deployment."""
+        state = self._deployments.get(deployment)
+        return self.max_concurrency if state is None else int(state.limit)
+
+    async def acquire(
+        self, deployment: str, tokens: int, priority: Priority | None = None
+    ) -> None:
+        """Waits until a call of about `tokens` tokens can be sent.
+
+        Every successful `acquire` must be followed by one `release`. The priority
+        defaults to the one set with `priority` for the current task.
+        """
+        state = self._deployment(deployment)
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            state.waiters,
+            (
+                request_priority.get() if priority is None else priority,
+                next(self._sequence),
+                tokens,
+                future,
+            ),
+        )
+        self._dispatch(state)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # granted while being cancelled, give the slot back
+                self.release(deployment)
+            raise
+
+    def release(
+        self,
+        deployment: str,
+        status_code: int | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> None:
+        """Frees the slot of a call and adapts to its response, if any."""
+        state = self._deployment(deployment)
+        state.in_flight -= 1
+        now = self.clock()
+        headers = headers or {}
+
+        if status_code == 429:
+            self.throttled += 1
+            state.limit = max(self.min_concurrency, state.limit / 2)
+            state.blocked_until = max(state.blocked_until, now + retry_after(headers))
+        elif status_code is not None and status_code < 400:
+            state.limit = min(self.max_concurrency, state.limit + 1 / state.limit)
+
+        for name, bucket in (
+            ("x-ratelimit-remaining-requests", state.requests),
+            ("x-ratelimit-remaining-tokens", state.tokens),
+        ):
+            try:
+                remaining = float(headers[name])
+            except (KeyError, ValueError):
+                continue
+            if bucket is not None:
+                bucket.refill(now)
+                bucket.level = min(bucket.level, remaining)
+            elif remaining <= 0:
+                # no budget configured, the server says it is used up
+                state.blocked_until = max(
+                    state.blocked_until, now + DEFAULT_RETRY_AFTER
+                )
+
+        self._dispatch(state)
+
+    def _deployment(self, deployment: str) -> _Deployment:
+        state = self._deployments.get(deployment)
+        if state is None:
+            state = _Deployment(self.max_concurrency)
+            now = self.clock()
+            if self.requests_per_minute:
+                state.requests = _Bucket(self.requests_per_minute, now)
+            if self.tokens_per_minute:
+                state.tokens = _Bucket(self.tokens_per_minute, now)
+            self._deployments[deployment] = state
+        return state
+
+    def _dispatch(self, state: _Deployment) -> None:
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+
+        while state.waiters:
+            _, _, tokens, future = state.waiters[0]
+            if future.done():  # cancelled while waiting
+                heapq.heappop(state.waiters)
+                continue
+            if state.in_flight >= int(state.limit):
+                return  # the next release dispatches again
+
+            now = self.clock()
+            wait = max(
+                state.blocked_until - now,
+                state.requests.wait_time(1, now) if state.requests else 0.0,
+                state.tokens.wait_time(tokens, now) if state.tokens else 0.0,
+            )
+            if wait > 0:
+                state.timer = asyncio.get_running_loop().call_later(
+                    wait, self._dispatch, state
+                )
+                return
+
+            heapq.heappop(state.waiters)
+            if state.requests:
+                state.requests.level -= 1
+            if state.tokens:
+                state.tokens.level -= tokens
+            state.in_flight += 1
+            future.set_result(None)
@@ -0,0 +1,36 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+
+
+class SingleFlight[K: Hashable, V]:
+    """Coalesces concurrent calls with the same key into a single call.
+
+    The first caller starts the call; callers arriving while it is in flight
+    wait for it and get the same result, or the same exception. The call runs in
+    its own task, so a cancelled waiter does not cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[K, asyncio.Future[V]] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._calls
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        call = self._calls.get(key)
+        if call is None:
+            self.calls += 1
+            call = asyncio.ensure_future(fn())
+            self._calls[key] = call
+            call.add_done_callback(lambda _: self._done(key, call))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(call)
+
+    def _done(self, key: K, call: asyncio.Future[V]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            call.exception()  # retrieved, even when every waiter was cancelled
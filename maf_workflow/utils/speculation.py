@@ -0,0 +1,83 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+type Emit = Callable[[str], Awaitable[None]]
+
+
+class Speculation[T]:
+    """Work started before it is known to be needed.
+
+    `work` starts right away. The pieces it emits are buffered until `join`,
+    which passes them on (and the ones that follow) and returns the result. If it
+    turns out not to be needed, `cancel` stops it. A speculation started within
+    an active `SpeculationScope` is also stopped when the scope is cancelled.
+    """
+
+    def __init__(self, work: Callable[[Emit], Awaitable[T]]):
+        self._pieces: asyncio.Queue[str] = asyncio.Queue()
+        self._task = asyncio.ensure_future(work(self._buffer))
+        scope = _scope.get()
+        if scope is not None:
+            scope.add(self)
+
+    async def join(self, emit: Emit) -> T:
+        piece: asyncio.Future[str] | None = None
+        try:
+            while not self._task.done() or not self._pieces.empty():
+                if not self._pieces.empty():
+                    await emit(self._pieces.get_nowait())
+                    continue
+                piece = asyncio.ensure_future(self._pieces.get())
+                await asyncio.wait(
+                    {piece, self._task}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if piece.done():
+                    await emit(piece.result())
+            return await self._task
+        finally:
+            if piece is not None:
+                piece.cancel()
+            # the caller gave up on the result
+            self._task.cancel()
+
+    def cancel(self) -> None:
+        self._task.cancel()
+
+    async def _buffer(self, piece: str) -> None:
+        self._pieces.put_nowait(piece)
+
+
+class SpeculationScope:
+    """The speculations started while the scope is active, such as by a run.
+
+    Tasks copy the active scope when they are created, so it covers the work
+    they start as well. Whatever path the run took, a speculation it did not
+    join is not needed once it is over, and `cancel` stops it.
+    """
+
+    def __init__(self) -> None:
+        self._started: list[Speculation[Any]] = []
+
+    @contextmanager
+    def active(self) -> Iterator[None]:
+        token = _scope.set(self)
+        try:
+            yield
+        finally:
+            _scope.reset(token)
+
+    def add(self, speculation: Speculation[Any]) -> None:
+        self._started.append(speculation)
+
+    def cancel(self) -> None:
+        for speculation in self._started:
+            speculation.cancel()
+        self._started.clear()
+
+
+_scope: ContextVar[SpeculationScope | None] = ContextVar(
+    "speculation_scope", default=None
+)
@@ -0,0 +1,38 @@
+import asyncio
+import sqlite3
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SQLiteThread:
+    """A SQLite connection owned by a single worker thread.
+
+    `run` calls a function with the connection on that thread, so the database
+    I/O stays off the event loop, and the calls are serialized without a lock:
+    a function sees the connection, and the state it keeps next to it, as the
+    previous call left them. The connection is opened by `connect` on first use.
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection]) -> None:
+        self._connect = connect
+        self._db: sqlite3.Connection | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+
+    async def run[T](self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, fn)
+
+    async def close(self) -> None:
+        """Closes the connection; the next call opens it again."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._close)
+
+    def _call[T](self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        if self._db is None:
+            self._db = self._connect()
+        return fn(self._db)
+
+    def _close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
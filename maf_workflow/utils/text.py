@@ -0,0 +1,3 @@
+def normalize_message(text: str) -> str:
+    """Case and whitespace insensitive cache key of a message."""
+    return " ".join(text.casefold().split())
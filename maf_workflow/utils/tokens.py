@@ -0,0 +1,9 @@
+from agent_framework import ChatMessage
+
+MESSAGE_OVERHEAD_TOKENS = 4
+"""Tokens taken by the role and separators of a chat message."""
+
+
+def count_tokens(message: ChatMessage) -> int:
+    """Estimated prompt tokens of a message, at about four characters per token."""
+    return len(message.text) // 4 + MESSAGE_OVERHEAD_TOKENS
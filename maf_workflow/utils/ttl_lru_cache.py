@@ -0,0 +1,95 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+from maf_workflow.models.cache_stats import CacheStats
+
+
+class TTLLRUCache[K: Hashable, V]:
+    """In-memory cache with least-recently-used eviction and per-entry TTL.
+
+    The cache is bounded by number of entries and, optionally, by the total size
+    reported for the entries. It is not thread safe; it is meant to be used from
+    a single event loop.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float | None = None,
+        max_bytes: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._clock = clock
+        # key -> (value, expires_at, size), least recently used first
+        self._entries: OrderedDict[K, tuple[V, float | None, int]] = OrderedDict()
+        self._size_bytes = 0
+        self._stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and not self._is_expired(entry[1])
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats.misses += 1
+            return default
+
+        value, expires_at, _ = entry
+        if self._is_expired(expires_at):
+            self._remove(key)
+            self._stats.expirations += 1
+            self._stats.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self._stats.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None, size: int = 0) -> None:
+        """Adds or replaces an entry; `ttl` overrides the cache wide TTL."""
+        if key in self._entries:
+            self._remove(key)
+
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = None if ttl is None else self._clock() + ttl
+        self._entries[key] = (value, expires_at, size)
+        self._size_bytes += size
+        self._evict()
+
+    def delete(self, key: K) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size_bytes = 0
+
+    def get_stats(self) -> CacheStats:
+        return self._stats.model_copy(
+            update={"entries": len(self._entries), "size_bytes": self._size_bytes}
+        )
+
+    def _is_expired(self, expires_at: float | None) -> bool:
+        return expires_at is not None and expires_at <= self._clock()
+
+    def _remove(self, key: K) -> None:
+        _, _, size = self._entries.pop(key)
+        self._size_bytes -= size
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None
+            and self._size_bytes > self.max_bytes
+            and len(self._entries) > 1
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self._stats.evictions += 1
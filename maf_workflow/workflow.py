@@ -1,3 +1,6 @@
+import logging
+from collections.abc import AsyncIterator
+from functools import cache, partial
 from typing import Any
 
 from agent_framework import (
@@ -7,86 +10,255 @@ from agent_framework import (
     Role,
     Workflow,
     WorkflowBuilder,
+    WorkflowOutputEvent,
 )
+from lagom.environment import Env
+from pydantic import ValidationError
 
-from maf_workflow.agents.customer_agent import create as create_customer_agent
-from maf_workflow.agents.intent_detection_agent import (
-    create_agent as create_intent_detection_agent,
-)
+from maf_workflow.events import ResponseDeltaEvent
 from maf_workflow.executors import (
+    dispatch_request,
+    get_intent,
     handle_greeting,
     handle_inappropriate,
     handle_question_response,
     handle_statement,
     to_assistant_request,
+    to_question_response,
 )
 from maf_workflow.hosting import container
-from maf_workflow.models.intent_detection_result import IntentDetectionResult
 from maf_workflow.protocols.i_azure_open_ai_chat_client_service import (
     IAzureOpenAIChatClientService,
 )
+from maf_workflow.protocols.i_intent_cache_service import IIntentCacheService
+from maf_workflow.protocols.i_intent_classifier_service import (
+    IIntentClassifierService,
+)
+from maf_workflow.protocols.i_intent_hedging_service import IIntentHedgingService
+from maf_workflow.protocols.i_question_response_cache_service import (
+    IQuestionResponseCacheService,
+)
+from maf_workflow.protocols.i_workflow_checkpoint_service import (
+    IWorkflowCheckpointService,
+)
+from maf_workflow.protocols.i_workflow_metrics_service import (
+    IWorkflowMetricsService,
+)
+from maf_workflow.workflow_template import WorkflowTemplate
 
+logger = logging.getLogger(__name__)
 
-def get_condition(field: str):
-    def condition(message: Any) -> bool:
-        if not isinstance(message, AgentExecutorResponse):
-            return True
 
-        try:
-            detection = IntentDetectionResult.model_validate_json(
-                message.agent_run_response.text
-            )
-            result = getattr(detection, field) is True
-            print(f"\033[92mCondition check on field '{field}': {result}\033[0m")
-            return result
-        except Exception:
-            return False
+class WorkflowEnv(Env):
+    # answer the message while its intent is detected, used if it is a question
+    workflow_speculative_answers: bool = False
+    # detect the intent and answer questions in one model call
+    workflow_single_shot: bool = False
 
-    return condition
 
+INTENT_HANDLERS: dict[str, str] = {
+    "is_question": to_assistant_request.id,
+    "is_greeting": handle_greeting.id,
+    "is_inappropriate": handle_inappropriate.id,
+    "is_statement": handle_statement.id,
+}
+
+SINGLE_SHOT_INTENT_HANDLERS: dict[str, str] = {
+    **INTENT_HANDLERS,
+    "is_question": to_question_response.id,
+}
+
+
+def select_intent_handler(
+    message: Any, target_ids: list[str], handlers: dict[str, str] = INTENT_HANDLERS
+) -> list[str]:
+    # one dispatch on the detected intent instead of one parse per edge condition
+    if not isinstance(message, AgentExecutorResponse):
+        return target_ids
+
+    try:
+        intent = get_intent(message).intent
+    except ValidationError:
+        return []
+
+    target_id = handlers[intent]
+    logger.debug("Intent '%s' routed to '%s'", intent, target_id)
+    return [target_id]
+
+
+def create_template(streaming: bool = False) -> WorkflowTemplate:
+    if container[WorkflowEnv].workflow_single_shot:
+        return create_single_shot_template(streaming)
+
+    # the agents are imported when a graph is built, not with this module
+    from maf_workflow.agents.customer_agent import (
+        create_chat_agent as create_customer_chat_agent,
+    )
+    from maf_workflow.agents.customer_agent import (
+        create_executor as create_customer_executor,
+    )
+    from maf_workflow.agents.intent_detection_agent import (
+        create_chat_agent as create_intent_detection_chat_agent,
+    )
+    from maf_workflow.agents.intent_detection_agent import (
+        create_executor as create_intent_detection_executor,
+    )
 
-def create() -> Workflow:
     chat_client = container[IAzureOpenAIChatClientService].get_client()
-    intent_detection_agent = create_intent_detection_agent(chat_client)
-    customer_assistant_agent = create_customer_agent(chat_client)
+    intent_detection_chat_agent = create_intent_detection_chat_agent(chat_client)
+    customer_chat_agent = create_customer_chat_agent(chat_client)
+    customer_assistant_agent = create_customer_executor(
+        customer_chat_agent, container[IQuestionResponseCacheService], streaming
+    )
+    intent_detection_agent = create_intent_detection_executor(
+        intent_detection_chat_agent,
+        container[IIntentClassifierService],
+        container[IIntentCacheService],
+        container[IIntentHedgingService],
+        customer_assistant_agent.speculate
+        if container[WorkflowEnv].workflow_speculative_answers
+        else None,
+    )
 
-    return (
+    workflow = (
         WorkflowBuilder()
         .set_start_executor(intent_detection_agent)
-        .add_edge(
+        .add_multi_selection_edge_group(
             intent_detection_agent,
-            to_assistant_request,
-            condition=get_condition("is_question"),
+            [
+                to_assistant_request,
+                handle_greeting,
+                handle_inappropriate,
+                handle_statement,
+            ],
+            selection_func=select_intent_handler,
         )
         .add_edge(to_assistant_request, customer_assistant_agent)
         .add_edge(customer_assistant_agent, handle_question_response)
-        .add_edge(
-            intent_detection_agent,
-            handle_greeting,
-            condition=get_condition("is_greeting"),
-        )
-        .add_edge(
-            intent_detection_agent,
-            handle_inappropriate,
-            condition=get_condition("is_inappropriate"),
-        )
-        .add_edge(
-            intent_detection_agent,
-            handle_statement,
-            condition=get_condition("is_statement"),
+        .build()
+    )
+
+    return WorkflowTemplate(
+        workflow,
+        metrics=container[IWorkflowMetricsService],
+        checkpoints=container[IWorkflowCheckpointService],
+    )
+
+
+def create_single_shot_template(streaming: bool = False) -> WorkflowTemplate:
+    """The graph in which one model call detects the intent and answers questions.
+
+    Routing and the handlers are the same; questions go to `to_question_response`
+    instead of the customer agent. The request is dispatched to the agent, so
+    that its answer is streamed while the call is in flight.
+    """
+    from maf_workflow.agents.single_shot_agent import (
+        create_chat_agent as create_single_shot_chat_agent,
+    )
+    from maf_workflow.agents.single_shot_agent import (
+        create_executor as create_single_shot_executor,
+    )
+
+    chat_client = container[IAzureOpenAIChatClientService].get_client()
+    single_shot_agent = create_single_shot_executor(
+        create_single_shot_chat_agent(chat_client),
+        container[IIntentClassifierService],
+        container[IIntentHedgingService],
+        streaming,
+    )
+
+    workflow = (
+        WorkflowBuilder()
+        .set_start_executor(dispatch_request)
+        .add_edge(dispatch_request, single_shot_agent)
+        .add_multi_selection_edge_group(
+            single_shot_agent,
+            [
+                to_question_response,
+                handle_greeting,
+                handle_inappropriate,
+                handle_statement,
+            ],
+            selection_func=partial(
+                select_intent_handler, handlers=SINGLE_SHOT_INTENT_HANDLERS
+            ),
         )
+        .add_edge(to_question_response, handle_question_response)
         .build()
     )
 
+    return WorkflowTemplate(
+        workflow,
+        metrics=container[IWorkflowMetricsService],
+        checkpoints=container[IWorkflowCheckpointService],
+    )
+
 
-async def execute_workflow(text: str) -> None:
-    print()
-    workflow = create()
-    request = AgentExecutorRequest(
+@cache
+def get_template(streaming: bool = False) -> WorkflowTemplate:
+    # built once per process (and mode) and reused by every request
+    return create_template(streaming)
+
+
+async def warmup(connections: int = 1) -> None:
+    """Creates the chat client, opens its connections and builds the graphs.
+
+    A worker calls it once it has started, before it takes traffic, so that its
+    first request does not pay for them.
+    """
+    await container[IAzureOpenAIChatClientService].warmup(connections)
+    get_template()
+    get_template(streaming=True)
+
+
+def create() -> Workflow:
+    return get_template().new_workflow()
+
+
+def create_request(text: str) -> AgentExecutorRequest:
+    return AgentExecutorRequest(
         messages=[ChatMessage(Role.USER, text=text)], should_respond=True
     )
-    events = await workflow.run(request)
+
+
+async def run_workflow(text: str, run_id: str | None = None) -> str | None:
+    """Runs a message through the workflow and returns its output, if any.
+
+    With checkpoints enabled, a run given a `run_id` resumes where a previous
+    attempt with the same id stopped.
+    """
+    events = await get_template().run(create_request(text), run_id)
     outputs = events.get_outputs()
-    if outputs:
+    return outputs[0] if outputs else None
+
+
+async def stream_workflow(text: str, run_id: str | None = None) -> AsyncIterator[str]:
+    """Runs a message through the workflow and yields the answer as it arrives.
+
+    The answer to a question is yielded piece by piece while the customer agent
+    generates it; the other intents yield their output in one piece.
+    """
+    streamed = False
+    events = get_template(streaming=True).run_stream(create_request(text), run_id)
+    async for event in events:
+        if isinstance(event, ResponseDeltaEvent):
+            streamed = True
+            yield event.data
+        elif isinstance(event, WorkflowOutputEvent) and not streamed:
+            yield str(event.data)
+
+
+async def execute_workflow(text: str, stream: bool = False) -> None:
+    print()
+    if stream:
+        prefix = "\n\033[1mWorkflow output: "
+        async for delta in stream_workflow(text):
+            print(prefix + delta, end="", flush=True)
+            prefix = ""
+        print("\033[0m")
+        return
+
+    output = await run_workflow(text)
+    if output:
         print()
-        print(f"\033[1mWorkflow output: {outputs[0]}\033[0m")
+        print(f"\033[1mWorkflow output: {output}\033[0m")
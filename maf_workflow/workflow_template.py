@@ -0,0 +1,155 @@
+from collections.abc import AsyncIterator, Mapping
+from types import MappingProxyType
+from typing import Any
+
+from agent_framework import (
+    Executor,
+    InProcRunnerContext,
+    Workflow,
+    WorkflowEvent,
+    WorkflowRunResult,
+)
+
+from maf_workflow.instrumentation import (
+    InstrumentedRunnerContext,
+    instrument_executor,
+)
+from maf_workflow.protocols.i_workflow_checkpoint_service import (
+    IWorkflowCheckpointService,
+)
+from maf_workflow.protocols.i_workflow_metrics_service import (
+    IWorkflowMetricsService,
+)
+from maf_workflow.utils.speculation import SpeculationScope
+
+
+class WorkflowTemplate:
+    """A prebuilt, immutable workflow graph from which isolated runs are started.
+
+    The graph is built and validated once with `WorkflowBuilder`. Every run gets
+    its own `Workflow` (runner, runner context and shared state), so any number
+    of runs can be in flight in the same event loop. Edge groups and executors
+    are shared between runs, so executors must keep their per-run state in the
+    workflow's shared state rather than on themselves. With `metrics`, every
+    execution of every executor is measured and recorded there.
+
+    With `checkpoints`, runs given a `run_id` are checkpointed after every
+    superstep, so the outputs of the executors that completed are persisted. A
+    run started again with the same id resumes from its latest checkpoint and
+    skips those executors; its checkpoints are deleted once it completes. A run
+    whose latest checkpoint has no messages left completed before its
+    checkpoints could be deleted, so it starts over rather than resuming with
+    nothing to do and no output.
+
+    The speculations started by a run (see `Speculation`) and still going when
+    it ends, because it failed or took another branch, are cancelled.
+    """
+
+    def __init__(
+        self,
+        workflow: Workflow,
+        metrics: IWorkflowMetricsService | None = None,
+        checkpoints: IWorkflowCheckpointService | None = None,
+    ) -> None:
+        self._metrics = metrics if metrics is not None and metrics.enabled else None
+        self._checkpoints = (
+            checkpoints if checkpoints is not None and checkpoints.enabled else None
+        )
+        self._edge_groups = tuple(workflow.edge_groups)
+        self._executors = MappingProxyType(
+            {
+                executor_id: self._instrument(executor)
+                for executor_id, executor in workflow.executors.items()
+            }
+        )
+        self._start_executor_id = workflow.start_executor_id
+        self._max_iterations = workflow.max_iterations
+
+    @property
+    def executors(self) -> Mapping[str, Executor]:
+        return self._executors
+
+    def new_workflow(self, run_id: str | None = None) -> Workflow:
+        """Returns a fresh workflow for a single run, sharing the prebuilt graph.
+
+        With a `run_id` and checkpoints, the run is checkpointed under that id.
+        """
+        storage = self._checkpoints if run_id is not None else None
+        context = (
+            InProcRunnerContext(storage)
+            if self._metrics is None
+            else InstrumentedRunnerContext(storage)
+        )
+        workflow = Workflow(
+            list(self._edge_groups),
+            dict(self._executors),
+            self._start_executor_id,
+            context,
+            self._max_iterations,
+        )
+        if run_id is not None:
+            # after the workflow, which gives the context a random id
+            context.set_workflow_id(run_id)
+        return workflow
+
+    async def run(self, message: Any, run_id: str | None = None) -> WorkflowRunResult:
+        checkpoint_id = await self._latest_checkpoint_id(run_id)
+        workflow = self.new_workflow(run_id)
+        speculations = SpeculationScope()
+        try:
+            with speculations.active():
+                if checkpoint_id is None:
+                    result = await workflow.run(message)
+                else:
+                    result = await workflow.run_from_checkpoint(checkpoint_id)
+        finally:
+            speculations.cancel()
+        await self._completed(run_id)
+        return result
+
+    async def run_stream(
+        self, message: Any, run_id: str | None = None
+    ) -> AsyncIterator[WorkflowEvent]:
+        checkpoint_id = await self._latest_checkpoint_id(run_id)
+        workflow = self.new_workflow(run_id)
+        if checkpoint_id is None:
+            events = workflow.run_stream(message)
+        else:
+            events = workflow.run_stream_from_checkpoint(checkpoint_id)
+        steps = aiter(events)
+        speculations = SpeculationScope()
+        try:
+            while True:
+                # only while the run steps, not while the caller has the event
+                with speculations.active():
+                    event = await anext(steps, None)
+                if event is None:
+                    break
+                yield event
+        finally:
+            speculations.cancel()
+        await self._completed(run_id)
+
+    async def _latest_checkpoint_id(self, run_id: str | None) -> str | None:
+        if self._checkpoints is None or run_id is None:
+            return None
+        checkpoint_id = await self._checkpoints.get_latest_checkpoint_id(run_id)
+        if checkpoint_id is None:
+            return None
+        checkpoint = await self._checkpoints.load_checkpoint(checkpoint_id)
+        if checkpoint is None or not any(checkpoint.messages.values()):
+            # checkpointed after its last superstep, then stopped before
+            # `_completed`; its outputs were not kept
+            await self._checkpoints.delete_run(run_id)
+            return None
+        return checkpoint_id
+
+    async def _completed(self, run_id: str | None) -> None:
+        # a finished run starts over when run again
+        if self._checkpoints is not None and run_id is not None:
+            await self._checkpoints.delete_run(run_id)
+
+    def _instrument(self, executor: Executor) -> Executor:
+        if self._metrics is None:
+            return executor
+        return instrument_executor(executor, self._metrics)
@@ -1,8 +1,11 @@
 import asyncio
 
 from agent_framework import Context, ContextProvider
-from agent_framework._memory import AggregateContextProvider
 
+from maf_workflow.context_providers import (
+    CachedContextProvider,
+    ConcurrentContextProvider,
+)
 from maf_workflow.hosting import container
 from maf_workflow.protocols.i_azure_open_ai_chat_client_service import (
     IAzureOpenAIChatClientService,
@@ -21,6 +24,17 @@ SYSTEM_PROMPT = (
 old_guy = "john_doe"
 yound_lady = "mary_ann"
 
+# demo harness: stands in for the profile database. The delay only makes the
+# effect of the concurrent and cached lookups visible, it is not part of them.
+PROFILE_LOOKUP_SECONDS = 0.2
+
+
+async def lookup_profile(user_id: str) -> dict[str, object]:
+    await asyncio.sleep(PROFILE_LOOKUP_SECONDS)
+    if user_id == old_guy:
+        return {"age": 60, "gender": "Male"}
+    return {"age": 16, "gender": "Female"}
+
 
 class UserAgeProvider(ContextProvider):
     def __init__(self, user_id: str):
@@ -28,8 +42,8 @@ class UserAgeProvider(ContextProvider):
 
     async def invoking(self, messages, **kwargs) -> Context:
         # base on the user_id, fetch user preferences from a database or service
-        # for now, we will mock this behavior
-        user_age = 60 if self.user_id == old_guy else 16
+        profile = await lookup_profile(self.user_id)
+        user_age = profile["age"]
 
         # 2. Return a Context object with the new information
         # This will be merged into the prompt for this specific invocation
@@ -64,7 +78,8 @@ class UserGenderProvider(ContextProvider):
         self.user_id = user_id
 
     async def invoking(self, messages, **kwargs) -> Context:
-        user_gender = "Male" if self.user_id == old_guy else "Female"
+        profile = await lookup_profile(self.user_id)
+        user_gender = profile["gender"]
 
         return Context(
             instructions=f"Gender: {user_gender}.",
@@ -87,19 +102,22 @@ async def main():
     user_id = old_guy
     agent = chat_client.create_agent(
         system_prompt=SYSTEM_PROMPT,
-        context_providers=[
-            UserAgeProvider(user_id),
-            UserGenderProvider(user_id),
-        ],
+        # the profile lookups run concurrently, each bounded by a timeout, and
+        # are cached so later turns do not hit the profile database again
+        context_providers=ConcurrentContextProvider(
+            [
+                CachedContextProvider(UserAgeProvider(user_id), ttl=300),
+                CachedContextProvider(UserGenderProvider(user_id), ttl=300),
+            ],
+            timeout=1.0,
+        ),
     )
-    # since we have 2 context providers, the agent combine both context during
-    # invocation, an AggregateContextProvider is created internally
-    #
-    print(isinstance(agent.context_provider, AggregateContextProvider))
 
     # Run the agent; the 'invoking' method will trigger automatically
-    result = await agent.run("list 5 favorite songs")
-    print(result.text)
+    thread = agent.get_new_thread()
+    for prompt in ("list 5 favorite songs", "list 5 more"):
+        result = await agent.run(prompt, thread=thread)
+        print(result.text)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,68 @@
+import asyncio
+from typing import Never
+
+from agent_framework import (
+    AgentExecutorResponse,
+    WorkflowBuilder,
+    WorkflowContext,
+    executor,
+)
+
+from maf_workflow.fan_out_executor import FanOutExecutor
+from maf_workflow.hosting import container
+from maf_workflow.protocols.i_azure_open_ai_chat_client_service import (
+    IAzureOpenAIChatClientService,
+)
+
+# sample code to demonstrate fan-out that does not wait for every participant
+# the same question goes to three experts, the workflow goes on with the first
+# answers and the model calls of the others are cancelled
+
+chat_client = container[IAzureOpenAIChatClientService].get_client()
+
+EXPERTS = {
+    "fact_expert": "You're an expert fact provider. Answer in 50 words or less.",
+    "travel_expert": "You're an expert travel agent. Answer in 50 words or less.",
+    "food_expert": "You're an expert food critic. Answer in 50 words or less.",
+}
+
+
+@executor(id="aggregator")
+async def aggregator(
+    responses: list[AgentExecutorResponse], ctx: WorkflowContext[Never, str]
+) -> None:
+    # the responses come in the order they finished
+    await ctx.yield_output(
+        "\n\n".join(f"{r.executor_id}:\n{r.agent_run_response.text}" for r in responses)
+    )
+
+
+async def run(fan_out: FanOutExecutor) -> None:
+    workflow = (
+        WorkflowBuilder()
+        .set_start_executor(fan_out)
+        .add_edge(fan_out, aggregator)
+        .build()
+    )
+    output = await workflow.run("We are planning a trip to Japan.")
+    print(f"\033[92m{fan_out.id}\033[0m")
+    print(output.get_outputs()[0])
+    print()
+
+
+async def main() -> None:
+    agents = [
+        chat_client.create_agent(name=name, instructions=instructions)
+        for name, instructions in EXPERTS.items()
+    ]
+
+    # the first successful answer
+    await run(FanOutExecutor(agents, id="first_success", quorum=1))
+    # the first 2 of 3 answers
+    await run(FanOutExecutor(agents, id="quorum", quorum=2))
+    # the answers ready within 2 seconds
+    await run(FanOutExecutor(agents, id="deadline", timeout=2.0))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
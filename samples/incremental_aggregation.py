@@ -0,0 +1,89 @@
+import asyncio
+from collections.abc import Sequence
+from typing import Any
+
+from agent_framework import (
+    AgentExecutorResponse,
+    WorkflowBuilder,
+    WorkflowContext,
+    WorkflowOutputEvent,
+    executor,
+)
+
+from maf_workflow.fan_out_executor import FanOutExecutor, IncrementalAggregator
+from maf_workflow.hosting import container
+from maf_workflow.protocols.i_azure_open_ai_chat_client_service import (
+    IAzureOpenAIChatClientService,
+)
+
+# sample code to demonstrate incremental aggregation of a fan-out
+# the fact answer is printed as soon as it is ready, while the poem is still
+# being written, instead of waiting for both as a fan-in aggregator does
+
+chat_client = container[IAzureOpenAIChatClientService].get_client()
+
+TITLES = {"fact_expert": "Fact Expert Output", "poem_expert": "Poem Expert Output"}
+
+
+class Consolidator(IncrementalAggregator):
+    async def add(
+        self,
+        response: AgentExecutorResponse,
+        received: Sequence[AgentExecutorResponse],
+        ctx: WorkflowContext[Any, Any],
+    ) -> None:
+        # yield each answer as a partial output as soon as it arrives
+        title = TITLES[response.executor_id]
+        await ctx.yield_output(f"{title}:\n{response.agent_run_response.text}\n")
+
+    async def complete(
+        self,
+        responses: Sequence[AgentExecutorResponse],
+        ctx: WorkflowContext[Any, Any],
+    ) -> None:
+        await ctx.yield_output(f"{len(responses)} experts answered.")
+
+
+@executor(id="dispatcher")
+async def dispatcher(user_query: str, ctx: WorkflowContext[str]) -> None:
+    # the fan-out comes after the start executor, whose events are only
+    # streamed once it is done
+    await ctx.send_message(user_query)
+
+
+async def main() -> None:
+    fan_out = FanOutExecutor(
+        [
+            chat_client.create_agent(
+                name="fact_expert",
+                instructions=(
+                    "You're an expert fact provider. Given a user's query, provide "
+                    "concise and accurate factual information about the country or "
+                    "place. Keep your responses to 50 words or less."
+                ),
+            ),
+            chat_client.create_agent(
+                name="poem_expert",
+                instructions=(
+                    "You are a creative poet. Given a user's query, compose a short "
+                    "and engaging poem that captures the essence of the topic. "
+                    "Keep your responses to 50 words or less."
+                ),
+            ),
+        ],
+        aggregator=Consolidator(),
+    )
+    workflow = (
+        WorkflowBuilder()
+        .set_start_executor(dispatcher)
+        .add_edge(dispatcher, fan_out)
+        .build()
+    )
+
+    async for event in workflow.run_stream("We are planning a trip to Japan."):
+        if isinstance(event, WorkflowOutputEvent):
+            print(event.data)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import os
+
+from maf_workflow.batch_runner import read_records
+from maf_workflow.hosting import container
+from maf_workflow.load_generator import generate_load
+from maf_workflow.models.latency_summary import LatencySummary
+from maf_workflow.protocols.i_azure_open_ai_chat_client_service import (
+    IAzureOpenAIChatClientService,
+)
+from maf_workflow.protocols.i_intent_hedging_service import IIntentHedgingService
+from maf_workflow.protocols.i_workflow_metrics_service import (
+    IWorkflowMetricsService,
+)
+from maf_workflow.workflow import create_request, get_template
+
+MESSAGES = [
+    "Hello",
+    "What is the capital of France?",
+    "I love programming.",
+    "You are stupid!",
+    "Can you explain how vaccines work?",
+    "thanks",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Drives the conditional workflow at a target request rate."
+    )
+    parser.add_argument("--rps", type=float, default=20.0, help="runs per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--messages", help="JSONL file of messages to send")
+    parser.add_argument(
+        "--stream", action="store_true", help="run the streaming workflow"
+    )
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="call Azure OpenAI instead of the mock chat client",
+    )
+    return parser.parse_args()
+
+
+def load_messages(path: str | None) -> list[str]:
+    if path is None:
+        return MESSAGES
+    with open(path, encoding="utf-8") as f:
+        return [r.text for r in read_records(f) if r.text is not None]
+
+
+def print_row(name: str, summary: LatencySummary) -> None:
+    print(
+        f"{name:<28}{summary.count:>8}"
+        + "".join(
+            f"{v * 1000:>10.1f}"
+            for v in (summary.p50, summary.p95, summary.p99, summary.max)
+        )
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    template = get_template(streaming=args.stream)
+    report = await generate_load(
+        lambda text: template.run_stream(create_request(text)),
+        load_messages(args.messages),
+        args.rps,
+        args.duration,
+        args.max_in_flight,
+    )
+
+    print(
+        f"target {report.target_rps:.1f} rps, throughput {report.throughput:.1f} "
+        f"rps, {report.requests} runs, {report.errors} errors, "
+        f"{report.duration_seconds:.1f}s"
+    )
+    print(
+        f"{'':<28}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    )
+    print_row("workflow", report.latency)
+    for executor_id, summary in report.executors.items():
+        print_row(executor_id, summary)
+
+    print(
+        f"{'':<28}{'count':>8}{'wait p50':>10}{'wait p95':>10}"
+        f"{'in tok':>10}{'cached':>10}{'out tok':>10}"
+    )
+    for executor_id, stats in container[IWorkflowMetricsService].get_stats().items():
+        print(
+            f"{executor_id:<28}{stats.count:>8}"
+            f"{stats.queue_wait.p50 * 1000:>10.1f}{stats.queue_wait.p95 * 1000:>10.1f}"
+            f"{stats.input_tokens:>10}{stats.cached_input_tokens:>10}"
+            f"{stats.output_tokens:>10}"
+        )
+    print(container[IAzureOpenAIChatClientService].get_pool_stats())
+    print(container[IIntentHedgingService].get_stats())
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if not args.live:
+        os.environ["MOCK_CHAT_CLIENT"] = "true"
+    asyncio.run(main(args))
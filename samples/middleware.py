@@ -17,9 +17,11 @@ from agent_framework import (
 from pydantic import BaseModel
 
 from maf_workflow.hosting import container
+from maf_workflow.middleware import ToolResultCacheMiddleware
 from maf_workflow.protocols.i_azure_open_ai_chat_client_service import (
     IAzureOpenAIChatClientService,
 )
+from maf_workflow.tools import run_sync_tools_in_threads
 
 # a sample use case: flight booking with priority boarding for gold members
 # initialize chat client and user status
@@ -31,6 +33,10 @@ from maf_workflow.protocols.i_azure_open_ai_chat_client_service import (
 chat_client = container[IAzureOpenAIChatClientService].get_client()
 is_gold_member = True
 
+# availability changes slowly, checks for the same destination are reused for
+# a minute; booking tools with side effects would be left out of `ttls`
+tool_cache = ToolResultCacheMiddleware(ttls={"booking_tool": 60})
+
 
 class BookingResult(BaseModel):
     # booking result from flight booking tool
@@ -89,9 +95,11 @@ booking_agent = AgentExecutor(
             "The message should summarize the availability status and mention "
             "if priority override occurred."
         ),
-        tools=[booking_tool],
+        tools=run_sync_tools_in_threads([booking_tool]),  # kept off the event loop
         response_format=BookingResult,
-        middleware=[priority_check_middleware],  # MIDDLEWARE INJECTION
+        # MIDDLEWARE INJECTION, the cache is inside the priority check so it
+        # keeps the result of the tool, not the one changed for the user
+        middleware=[priority_check_middleware, tool_cache],
     ),
     id="booking_agent",
 )
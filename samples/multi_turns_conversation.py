@@ -1,12 +1,10 @@
 import asyncio
-from typing import Any, Sequence
-
-from agent_framework import ChatMessage, ChatMessageStoreProtocol
 
 from maf_workflow.hosting import container
 from maf_workflow.protocols.i_azure_open_ai_chat_client_service import (
     IAzureOpenAIChatClientService,
 )
+from maf_workflow.protocols.i_chat_history_service import IChatHistoryService
 
 chat_client = container[IAzureOpenAIChatClientService].get_client()
 SYSTEM_PROMPT = (
@@ -14,42 +12,13 @@ SYSTEM_PROMPT = (
 )
 
 
-class ChatMessageStore(ChatMessageStoreProtocol):
-    def __init__(self):
-        self.messages: list[ChatMessage] = []
-
-    async def list_messages(self) -> list[ChatMessage]:
-        return self.messages
-
-    async def add_messages(self, messages: Sequence[ChatMessage]) -> None:
-        for msg in messages:
-            self.messages.append(msg)
-
-    @classmethod
-    async def deserialize(
-        cls, serialized_store_state: Any, **kwargs: Any
-    ) -> "ChatMessageStore":
-        instance = ChatMessageStore()
-        instance.messages = [
-            ChatMessage.from_dict(msg_dict)
-            for msg_dict in serialized_store_state.get("messages", [])
-        ]
-        return instance
-
-    async def update_from_state(
-        self, serialized_store_state: Any, **kwargs: Any
-    ) -> None:
-        self.messages += serialized_store_state.messages
-
-    async def serialize(self, **kwargs: Any) -> Any:
-        return {"messages": self.messages}
-
-
 async def multi_turns():
     # this is where it starts
     agent = chat_client.create_agent(
         system_prompt=SYSTEM_PROMPT,
-        chat_message_store_factory=lambda: ChatMessageStore(),  # custom store
+        # messages are appended to a SQLite table, see CHAT_MESSAGE_STORE_*, and
+        # the prompt keeps to CHAT_HISTORY_MAX_TOKENS with a rolling summary
+        chat_message_store_factory=container[IChatHistoryService].create_store,
     )
     thread1 = agent.get_new_thread()  # let's create a conversation thread
 
@@ -59,7 +28,7 @@ async def multi_turns():
         print(f"Assistant: {response}")
         message = input("User: ")
 
-    # serialize the conversation
+    # serialize the conversation, only the messages added since the last time
     chat_data = await thread1.serialize()
 
     # resume the conversation
@@ -5,9 +5,11 @@ from agent_framework import ai_function
 from pydantic import Field
 
 from maf_workflow.hosting import container
+from maf_workflow.middleware import ToolConcurrencyMiddleware
 from maf_workflow.protocols.i_azure_open_ai_chat_client_service import (
     IAzureOpenAIChatClientService,
 )
+from maf_workflow.tools import run_sync_tools_in_threads
 
 chat_client = container[IAzureOpenAIChatClientService].get_client()
 
@@ -43,7 +45,10 @@ async def main():
             "3 place of interests for that location. IMPORTANT: do not provide any "
             "more information."
         ),
-        tools=[get_place, tourist_guide_agent],
+        # the sync get_place runs on a thread pool, so both tools run
+        # concurrently when the model calls them in the same turn
+        tools=run_sync_tools_in_threads([get_place, tourist_guide_agent]),
+        middleware=[ToolConcurrencyMiddleware(max_concurrency=4)],
     )
     result = await agent.run(
         "Tell me about my favorite place to visit. My user id is 123."
@@ -4,12 +4,14 @@ import sys
 from maf_workflow.workflow import execute_workflow
 
 
-async def main(message) -> None:
-    await execute_workflow(message)
+async def main(message, stream: bool = False) -> None:
+    await execute_workflow(message, stream)
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python main.py '<message_text>'")
+    stream = "--stream" in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != "--stream"]
+    if not args:
+        print("Usage: python main.py [--stream] '<message_text>'")
     else:
-        asyncio.run(main(sys.argv[1]))
+        asyncio.run(main(args[0], stream))
@@ -0,0 +1,125 @@
+import argparse
+import asyncio
+import contextlib
+import os
+import stat
+import sys
+import time
+from typing import TextIO
+
+from maf_workflow.batch_runner import aread_records, read_pipe, read_records, run_batch
+from maf_workflow.models.batch_progress import BatchProgress
+from maf_workflow.models.batch_result import BatchResult
+from maf_workflow.workflow import run_workflow, warmup
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Runs the messages of a JSONL file through the conditional "
+        "workflow and writes the results as JSONL."
+    )
+    parser.add_argument(
+        "input", nargs="?", default="-", help="JSONL input file, - for stdin"
+    )
+    parser.add_argument("-o", "--output", help="JSONL output file, stdout if unset")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="write results as they complete instead of in input order",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip the records whose results are already in the output file and "
+        "append the others to it",
+    )
+    parser.add_argument("--text-field", help="field holding the message")
+    parser.add_argument("--id-field", help="field holding the id of the message")
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=5.0,
+        help="seconds between progress reports on stderr",
+    )
+    args = parser.parse_args()
+    if args.resume and args.output is None:
+        parser.error("--resume needs an --output file")
+    return args
+
+
+def completed_offsets(path: str) -> set[int]:
+    # the offsets of the results written, in whatever order they were written; a
+    # line cut short by a crash is not a result, and is ended so that the next
+    # result starts on a line of its own
+    offsets: set[int] = set()
+    line = "\n"
+    with contextlib.suppress(FileNotFoundError), open(path, encoding="utf-8") as f:
+        for line in f:
+            with contextlib.suppress(ValueError):
+                offsets.add(BatchResult.model_validate_json(line).offset)
+    if not line.endswith("\n"):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n")
+    return offsets
+
+
+def progress_reporter(interval: float):
+    last_report = 0.0
+
+    def report(progress: BatchProgress) -> None:
+        nonlocal last_report
+        now = time.monotonic()
+        if now - last_report >= interval:
+            last_report = now
+            print(
+                f"processed {progress.processed} ({progress.failed} failed), "
+                f"{progress.rate:.1f}/s",
+                file=sys.stderr,
+            )
+
+    return report
+
+
+async def main(
+    args: argparse.Namespace, lines: TextIO, out: TextIO, completed: set[int]
+) -> None:
+    await warmup(args.concurrency)
+    # a pipe is read on the loop, so stopping does not wait for its next line
+    records = (
+        read_records(lines, completed, args.text_field, args.id_field)
+        if stat.S_ISREG(os.fstat(lines.fileno()).st_mode)
+        else aread_records(
+            read_pipe(lines.buffer), completed, args.text_field, args.id_field
+        )
+    )
+    results = run_batch(
+        records,
+        run_workflow,
+        concurrency=args.concurrency,
+        ordered=not args.unordered,
+        on_progress=progress_reporter(args.progress_interval),
+    )
+    async for result in results:
+        out.write(result.model_dump_json() + "\n")
+        out.flush()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    with contextlib.ExitStack() as stack:
+        lines = (
+            sys.stdin
+            if args.input == "-"
+            else stack.enter_context(open(args.input, encoding="utf-8"))
+        )
+        completed = completed_offsets(args.output) if args.resume else set()
+        # append when resuming, so the output of the earlier run is kept
+        out = (
+            sys.stdout
+            if args.output is None
+            else stack.enter_context(
+                open(args.output, "a" if args.resume else "w", encoding="utf-8")
+            )
+        )
+        asyncio.run(main(args, lines, out, completed))
@@ -0,0 +1,91 @@
+import argparse
+import os
+
+import uvicorn
+from starlette.applications import Starlette
+
+from maf_workflow.hosting import container
+from maf_workflow.protocols.i_azure_open_ai_chat_client_service import (
+    IAzureOpenAIChatClientService,
+)
+from maf_workflow.protocols.i_workflow_metrics_service import (
+    IWorkflowMetricsService,
+)
+from maf_workflow.server import WorkflowServerEnv
+from maf_workflow.server import create_app as create_workflow_app
+from maf_workflow.workflow import run_workflow, stream_workflow, warmup
+
+
+def parse_args() -> argparse.Namespace:
+    env = container[WorkflowServerEnv]
+    parser = argparse.ArgumentParser(
+        description="Serves the conditional workflow over HTTP."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers", type=int, default=1, help="worker processes sharing the port"
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=env.workflow_server_max_in_flight,
+        help="requests served at once by a worker before it answers 503",
+    )
+    parser.add_argument(
+        "--drain-timeout",
+        type=float,
+        default=env.workflow_server_drain_timeout_seconds,
+        help="seconds given to the requests in flight on shutdown",
+    )
+    parser.add_argument(
+        "--batch-concurrency",
+        type=int,
+        default=env.workflow_server_batch_concurrency,
+        help="records of a batch request run at once",
+    )
+    parser.add_argument(
+        "--batch-max-records",
+        type=int,
+        default=env.workflow_server_batch_max_records,
+        help="records of a batch request before it is answered 413",
+    )
+    return parser.parse_args()
+
+
+def create_app() -> Starlette:
+    # called by uvicorn in each worker process, so every worker builds its own
+    # client and graph once and shares them between its requests
+    env = container[WorkflowServerEnv]
+    chat_client_service = container[IAzureOpenAIChatClientService]
+    metrics = container[IWorkflowMetricsService]
+
+    return create_workflow_app(
+        run_workflow,
+        stream_workflow,
+        max_in_flight=env.workflow_server_max_in_flight,
+        drain_timeout=env.workflow_server_drain_timeout_seconds,
+        batch_concurrency=env.workflow_server_batch_concurrency,
+        batch_max_records=env.workflow_server_batch_max_records,
+        executor_stats=metrics.get_stats,
+        pool_stats=chat_client_service.get_pool_stats,
+        startup=warmup,
+    )
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    # the workers are separate processes and read their settings from the
+    # environment they inherit
+    os.environ["WORKFLOW_SERVER_MAX_IN_FLIGHT"] = str(args.max_in_flight)
+    os.environ["WORKFLOW_SERVER_DRAIN_TIMEOUT_SECONDS"] = str(args.drain_timeout)
+    os.environ["WORKFLOW_SERVER_BATCH_CONCURRENCY"] = str(args.batch_concurrency)
+    os.environ["WORKFLOW_SERVER_BATCH_MAX_RECORDS"] = str(args.batch_max_records)
+    uvicorn.run(
+        "samples.workflow_conditional_server:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=int(args.drain_timeout),
+    )
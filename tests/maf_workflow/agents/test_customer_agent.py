@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+from agent_framework import (
+    AgentExecutorRequest,
+    AgentRunResponse,
+    AgentRunResponseUpdate,
+    ChatMessage,
+    Role,
+    TextContent,
+    Workflow,
+    WorkflowBuilder,
+    WorkflowOutputEvent,
+)
+from pytest_mock import MockerFixture
+
+from maf_workflow.agents.customer_agent import CustomerAgentExecutor
+from maf_workflow.events import ResponseDeltaEvent
+from maf_workflow.executors import handle_question_response
+from maf_workflow.models.question_response import QuestionResponse
+from maf_workflow.services.question_response_cache_service import (
+    QuestionResponseCacheService,
+    QuestionResponseCacheServiceEnv,
+)
+
+ANSWER = QuestionResponse(user_question="What is 1 + 1?", response="It is two.")
+
+
+async def _run(customer: CustomerAgentExecutor) -> list[str]:
+    events = await _workflow(customer).run(_request())
+    return events.get_outputs()
+
+
+async def _stream(customer: CustomerAgentExecutor) -> tuple[list[str], list[str]]:
+    deltas: list[str] = []
+    outputs: list[str] = []
+    async for event in _workflow(customer).run_stream(_request()):
+        if isinstance(event, ResponseDeltaEvent):
+            deltas.append(event.data)
+        elif isinstance(event, WorkflowOutputEvent):
+            outputs.append(str(event.data))
+    return deltas, outputs
+
+
+def _workflow(customer: CustomerAgentExecutor) -> Workflow:
+    return (
+        WorkflowBuilder()
+        .set_start_executor(customer)
+        .add_edge(customer, handle_question_response)
+        .build()
+    )
+
+
+def _request() -> AgentExecutorRequest:
+    return AgentExecutorRequest(
+        messages=[ChatMessage(Role.USER, text="What is 1 + 1?")],
+        should_respond=True,
+    )
+
+
+def _agent(mocker: MockerFixture):
+    agent = mocker.AsyncMock()
+    agent.run.return_value = AgentRunResponse(
+        messages=[ChatMessage(Role.ASSISTANT, text=ANSWER.model_dump_json())]
+    )
+
+    async def run_stream(messages):
+        text = ANSWER.model_dump_json()
+        for i in range(0, len(text), 4):
+            yield AgentRunResponseUpdate(
+                contents=[TextContent(text=text[i : i + 4])], role=Role.ASSISTANT
+            )
+
+    agent.run_stream = run_stream
+    return agent
+
+
+async def _fetch(question, fetch):
+    return await fetch()
+
+
+def _cache() -> QuestionResponseCacheService:
+    return QuestionResponseCacheService(
+        env=QuestionResponseCacheServiceEnv(question_cache_enabled=True)
+    )
+
+
+async def _ignore(delta: str) -> None:
+    pass
+
+
+@pytest.mark.asyncio
+async def test_without_cache(mocker: MockerFixture) -> None:
+    agent = _agent(mocker)
+
+    assert await _run(CustomerAgentExecutor(agent)) == ["What is 1 + 1?\nIt is two."]
+    agent.run.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_with_cache(mocker: MockerFixture) -> None:
+    agent = _agent(mocker)
+    cache = mocker.AsyncMock()
+    cache.get_or_fetch.side_effect = _fetch
+
+    assert await _run(CustomerAgentExecutor(agent, cache)) == [
+        "What is 1 + 1?\nIt is two."
+    ]
+    assert cache.get_or_fetch.await_args.args[0] == "What is 1 + 1?"
+    agent.run.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_streaming(mocker: MockerFixture) -> None:
+    deltas, outputs = await _stream(CustomerAgentExecutor(_agent(mocker), None, True))
+
+    assert len(deltas) > 1
+    assert "".join(deltas) == "It is two."
+    assert outputs == ["What is 1 + 1?\nIt is two."]
+
+
+@pytest.mark.asyncio
+async def test_streaming_with_cache(mocker: MockerFixture) -> None:
+    cache = mocker.AsyncMock()
+    cache.get_or_fetch.side_effect = _fetch
+    customer = CustomerAgentExecutor(_agent(mocker), cache, True)
+
+    deltas, outputs = await _stream(customer)
+    assert "".join(deltas) == "It is two."
+    assert outputs == ["What is 1 + 1?\nIt is two."]
+
+    # an answer that was not fetched by this run is emitted in one piece
+    cache.get_or_fetch.side_effect = None
+    cache.get_or_fetch.return_value = ANSWER
+    deltas, outputs = await _stream(customer)
+    assert deltas == ["It is two."]
+
+
+@pytest.mark.asyncio
+async def test_speculation_is_cached_once_used(mocker: MockerFixture) -> None:
+    agent = _agent(mocker)
+    cache = _cache()
+    customer = CustomerAgentExecutor(agent, cache)
+    messages = _request().messages
+
+    # a message that was not a question
+    customer.speculate(messages).cancel()
+    await asyncio.sleep(0)
+    assert cache.get_stats().entries == 0
+
+    response = await customer.answer(messages, _ignore, customer.speculate(messages))
+    assert response.value == ANSWER
+    assert cache.get_stats().entries == 1
+    assert agent.run.await_count == 1
+
+    # answered by the cache, the speculation is cancelled
+    speculation = customer.speculate(messages)
+    response = await customer.answer(messages, _ignore, speculation)
+    assert response.value == ANSWER
+    assert response.usage_details is None
+    await asyncio.sleep(0)
+    assert speculation._task.cancelled()
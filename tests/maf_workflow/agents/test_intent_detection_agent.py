@@ -0,0 +1,329 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from agent_framework import (
+    AgentExecutorRequest,
+    AgentExecutorResponse,
+    AgentRunResponse,
+    ChatMessage,
+    Role,
+    WorkflowBuilder,
+    WorkflowContext,
+    executor,
+)
+from pytest_mock import MockerFixture
+from typing_extensions import Never
+
+from maf_workflow.agents.customer_agent import CustomerAgentExecutor
+from maf_workflow.agents.intent_detection_agent import IntentDetectionExecutor
+from maf_workflow.executors import (
+    get_intent,
+    handle_question_response,
+    to_assistant_request,
+)
+from maf_workflow.models.intent_detection_result import IntentDetectionResult
+from maf_workflow.models.question_response import QuestionResponse
+from maf_workflow.services.file_workflow_checkpoint_service import (
+    FileWorkflowCheckpointService,
+    FileWorkflowCheckpointServiceEnv,
+)
+from maf_workflow.services.rule_based_intent_classifier_service import (
+    RuleBasedIntentClassifierService,
+    RuleBasedIntentClassifierServiceEnv,
+)
+from maf_workflow.workflow_template import WorkflowTemplate
+
+GREETING = IntentDetectionResult(
+    message_content="hi",
+    is_greeting=True,
+    is_inappropriate=False,
+    is_question=False,
+    is_statement=False,
+    response="Hi!",
+)
+
+QUESTION = GREETING.model_copy(
+    update={"is_greeting": False, "is_question": True, "response": ""}
+)
+
+
+def _reply(intent: IntentDetectionResult) -> AgentRunResponse:
+    return AgentRunResponse(
+        messages=[ChatMessage(Role.ASSISTANT, text=intent.model_dump_json())]
+    )
+
+
+@executor(id="emit_intent")
+async def emit_intent(
+    response: AgentExecutorResponse, ctx: WorkflowContext[Never, IntentDetectionResult]
+) -> None:
+    await ctx.yield_output(get_intent(response))
+
+
+async def _run(
+    detector: IntentDetectionExecutor, text: str = "hi"
+) -> list[IntentDetectionResult]:
+    workflow = (
+        WorkflowBuilder()
+        .set_start_executor(detector)
+        .add_edge(detector, emit_intent)
+        .build()
+    )
+    events = await workflow.run(
+        AgentExecutorRequest(messages=[ChatMessage(Role.USER, text=text)])
+    )
+    return events.get_outputs()
+
+
+@pytest.mark.asyncio
+async def test_fast_path_skips_llm(mocker: MockerFixture) -> None:
+    agent = mocker.AsyncMock()
+    classifier = mocker.Mock()
+    classifier.classify.return_value = GREETING
+
+    outputs = await _run(IntentDetectionExecutor(agent, classifier))
+
+    assert outputs == [GREETING]
+    classifier.classify.assert_called_once_with("hi")
+    agent.run.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_llm(mocker: MockerFixture) -> None:
+    agent = mocker.AsyncMock()
+    agent.run.return_value = AgentRunResponse(
+        messages=[ChatMessage(Role.ASSISTANT, text=GREETING.model_dump_json())]
+    )
+    classifier = mocker.Mock()
+    classifier.classify.return_value = None
+
+    outputs = await _run(IntentDetectionExecutor(agent, classifier))
+
+    assert outputs == [GREETING]
+    agent.run.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_abusive_question_reaches_llm(mocker: MockerFixture) -> None:
+    text = "Why are you so stupid?"
+    inappropriate = GREETING.model_copy(
+        update={
+            "message_content": text,
+            "is_greeting": False,
+            "is_inappropriate": True,
+            "response": "Please keep it civil.",
+        }
+    )
+    agent = mocker.AsyncMock()
+    agent.run.return_value = _reply(inappropriate)
+    classifier = RuleBasedIntentClassifierService(
+        env=RuleBasedIntentClassifierServiceEnv(intent_fast_path_enabled=True)
+    )
+
+    outputs = await _run(IntentDetectionExecutor(agent, classifier), text)
+
+    assert outputs == [inappropriate]
+    agent.run.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_skips_llm(mocker: MockerFixture) -> None:
+    agent = mocker.AsyncMock()
+    cache = mocker.AsyncMock()
+    cache.get.return_value = GREETING
+
+    outputs = await _run(IntentDetectionExecutor(agent, cache=cache))
+
+    assert outputs == [GREETING]
+    cache.get.assert_called_once_with("hi")
+    agent.run.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_llm_result_is_cached(mocker: MockerFixture) -> None:
+    agent = mocker.AsyncMock()
+    agent.run.return_value = AgentRunResponse(
+        messages=[ChatMessage(Role.ASSISTANT, text=GREETING.model_dump_json())]
+    )
+    cache = mocker.AsyncMock()
+    cache.get.return_value = None
+    detector = IntentDetectionExecutor(agent, cache=cache)
+
+    assert await _run(detector) == [GREETING]
+    cache.set.assert_called_once_with("hi", GREETING)
+
+    # malformed replies are not cached
+    await detector._cache_response(
+        "hi", AgentRunResponse(messages=[ChatMessage(Role.ASSISTANT, text="{")])
+    )
+    cache.set.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_llm_call_is_hedged(mocker: MockerFixture) -> None:
+    agent = mocker.AsyncMock()
+    agent.run.return_value = AgentRunResponse(
+        messages=[ChatMessage(Role.ASSISTANT, text=GREETING.model_dump_json())]
+    )
+    hedging = mocker.Mock()
+
+    async def run(call):
+        return await call()
+
+    hedging.run = mocker.AsyncMock(side_effect=run)
+
+    outputs = await _run(IntentDetectionExecutor(agent, hedging=hedging))
+
+    assert outputs == [GREETING]
+    hedging.run.assert_awaited_once()
+    agent.run.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_speculative_answer_is_used_for_questions(
+    mocker: MockerFixture,
+) -> None:
+    agent = mocker.AsyncMock()
+    agent.run.return_value = _reply(QUESTION)
+    customer_agent = mocker.AsyncMock()
+    customer_agent.run.return_value = AgentRunResponse(
+        messages=[
+            ChatMessage(
+                Role.ASSISTANT,
+                text=QuestionResponse(
+                    user_question="hi", response="hello"
+                ).model_dump_json(),
+            )
+        ]
+    )
+    customer = CustomerAgentExecutor(customer_agent)
+    detector = IntentDetectionExecutor(agent, speculate=customer.speculate)
+    workflow = (
+        WorkflowBuilder()
+        .set_start_executor(detector)
+        .add_edge(detector, to_assistant_request)
+        .add_edge(to_assistant_request, customer)
+        .add_edge(customer, handle_question_response)
+        .build()
+    )
+
+    events = await workflow.run(
+        AgentExecutorRequest(messages=[ChatMessage(Role.USER, text="hi")])
+    )
+
+    assert events.get_outputs() == ["hi\nhello"]
+    customer_agent.run.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_resume_with_speculative_answers(
+    mocker: MockerFixture, tmp_path: Path
+) -> None:
+    agent = mocker.AsyncMock()
+    agent.run.return_value = _reply(QUESTION)
+    customer_agent = mocker.AsyncMock()
+    answer = QuestionResponse(user_question="hi", response="hello")
+    customer_agent.run.side_effect = [
+        RuntimeError("process died"),
+        AgentRunResponse(
+            messages=[ChatMessage(Role.ASSISTANT, text=answer.model_dump_json())]
+        ),
+    ]
+    customer = CustomerAgentExecutor(customer_agent)
+    detector = IntentDetectionExecutor(agent, speculate=customer.speculate)
+    workflow = (
+        WorkflowBuilder()
+        .set_start_executor(detector)
+        .add_edge(detector, to_assistant_request)
+        .add_edge(to_assistant_request, customer)
+        .add_edge(customer, handle_question_response)
+        .build()
+    )
+    checkpoints = FileWorkflowCheckpointService(
+        env=FileWorkflowCheckpointServiceEnv(
+            workflow_checkpoint_enabled=True, workflow_checkpoint_path=str(tmp_path)
+        )
+    )
+    template = WorkflowTemplate(workflow, checkpoints=checkpoints)
+    request = AgentExecutorRequest(messages=[ChatMessage(Role.USER, text="hi")])
+
+    with pytest.raises(RuntimeError):
+        await template.run(request, run_id="r1")
+    # the speculation is not checkpointed, the resumed run answers again
+    result = await template.run(request, run_id="r1")
+
+    assert result.get_outputs() == ["hi\nhello"]
+    agent.run.assert_awaited_once()
+    assert customer_agent.run.await_count == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("streaming", [False, True])
+async def test_speculative_answer_is_cancelled_when_the_run_ends(
+    mocker: MockerFixture, streaming: bool
+) -> None:
+    agent = mocker.AsyncMock()
+    agent.run.return_value = _reply(QUESTION)
+    cancelled = asyncio.Event()
+
+    async def never_answers(*args, **kwargs) -> AgentRunResponse:
+        try:
+            await asyncio.Event().wait()
+        finally:
+            cancelled.set()
+        raise AssertionError("not reached")
+
+    customer_agent = mocker.AsyncMock()
+    customer_agent.run.side_effect = never_answers
+    customer = CustomerAgentExecutor(customer_agent)
+
+    @executor(id="fails")
+    async def fails(
+        request: AgentExecutorRequest, ctx: WorkflowContext[AgentExecutorRequest]
+    ) -> None:
+        raise RuntimeError("boom")
+
+    # the speculation is handed over, but the run fails before the customer agent
+    detector = IntentDetectionExecutor(agent, speculate=customer.speculate)
+    workflow = (
+        WorkflowBuilder()
+        .set_start_executor(detector)
+        .add_edge(detector, to_assistant_request)
+        .add_edge(to_assistant_request, fails)
+        .add_edge(fails, customer)
+        .build()
+    )
+    template = WorkflowTemplate(workflow)
+    request = AgentExecutorRequest(messages=[ChatMessage(Role.USER, text="hi")])
+
+    with pytest.raises(RuntimeError):
+        if streaming:
+            async for _ in template.run_stream(request):
+                pass
+        else:
+            await template.run(request)
+
+    await asyncio.wait_for(cancelled.wait(), 1)
+    customer_agent.run.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_speculative_answer_is_cancelled(mocker: MockerFixture) -> None:
+    agent = mocker.AsyncMock()
+    agent.run.return_value = _reply(GREETING)
+    speculate = mocker.Mock()
+
+    assert await _run(IntentDetectionExecutor(agent, speculate=speculate)) == [GREETING]
+    speculate.return_value.cancel.assert_called_once()
+
+    # also when the reply is malformed or the call fails
+    agent.run.return_value = AgentRunResponse(
+        messages=[ChatMessage(Role.ASSISTANT, text="{")]
+    )
+    with pytest.raises(Exception):
+        await _run(IntentDetectionExecutor(agent, speculate=speculate))
+    agent.run.side_effect = RuntimeError("boom")
+    with pytest.raises(Exception):
+        await _run(IntentDetectionExecutor(agent, speculate=speculate))
+    assert speculate.return_value.cancel.call_count == 3
@@ -0,0 +1,174 @@
+import asyncio
+
+import pytest
+from agent_framework import (
+    AgentExecutorRequest,
+    AgentExecutorResponse,
+    AgentRunResponse,
+    AgentRunResponseUpdate,
+    ChatMessage,
+    Role,
+    TextContent,
+    WorkflowBuilder,
+    WorkflowContext,
+    WorkflowOutputEvent,
+    executor,
+)
+from pytest_mock import MockerFixture
+from typing_extensions import Never
+
+from maf_workflow.agents.single_shot_agent import SingleShotAgentExecutor
+from maf_workflow.events import ResponseDeltaEvent
+from maf_workflow.executors import (
+    dispatch_request,
+    get_intent,
+    handle_question_response,
+    to_question_response,
+)
+from maf_workflow.models.intent_answer_result import IntentAnswerResult
+from maf_workflow.models.intent_detection_result import IntentDetectionResult
+
+QUESTION = IntentAnswerResult(
+    message_content="What is 1 + 1?",
+    is_greeting=False,
+    is_inappropriate=False,
+    is_question=True,
+    is_statement=False,
+    response="",
+    answer="It is two.",
+)
+GREETING = QUESTION.model_copy(
+    update={"is_greeting": True, "is_question": False, "response": "Hi!", "answer": ""}
+)
+
+
+@executor(id="emit_greeting")
+async def emit_greeting(
+    response: AgentExecutorResponse, ctx: WorkflowContext[Never, str]
+) -> None:
+    await ctx.yield_output("greeting")
+
+
+def _select(message: AgentExecutorResponse, target_ids: list[str]) -> list[str]:
+    intent = get_intent(message)
+    return [to_question_response.id if intent.is_question else emit_greeting.id]
+
+
+def _agent(
+    mocker: MockerFixture,
+    intent: IntentAnswerResult,
+    streamed: asyncio.Event | None = None,
+):
+    agent = mocker.AsyncMock()
+    text = intent.model_dump_json()
+    agent.run.return_value = AgentRunResponse(
+        messages=[ChatMessage(Role.ASSISTANT, text=text)]
+    )
+
+    async def run_stream(messages):
+        for i in range(0, len(text), 4):
+            if streamed is not None and i + 4 >= len(text):
+                # the last piece once a delta has reached the caller
+                await asyncio.wait_for(streamed.wait(), 1)
+            yield AgentRunResponseUpdate(
+                contents=[TextContent(text=text[i : i + 4])], role=Role.ASSISTANT
+            )
+
+    agent.run_stream = run_stream
+    return agent
+
+
+async def _run(
+    detector: SingleShotAgentExecutor, streamed: asyncio.Event | None = None
+) -> tuple[list[str], list[str]]:
+    workflow = (
+        WorkflowBuilder()
+        .set_start_executor(dispatch_request)
+        .add_edge(dispatch_request, detector)
+        .add_multi_selection_edge_group(
+            detector, [to_question_response, emit_greeting], selection_func=_select
+        )
+        .add_edge(to_question_response, handle_question_response)
+        .build()
+    )
+    deltas: list[str] = []
+    outputs: list[str] = []
+    request = AgentExecutorRequest(messages=[ChatMessage(Role.USER, text="hi")])
+    async for event in workflow.run_stream(request):
+        if isinstance(event, ResponseDeltaEvent):
+            deltas.append(event.data)
+            if streamed is not None:
+                streamed.set()
+        elif isinstance(event, WorkflowOutputEvent):
+            outputs.append(str(event.data))
+    return deltas, outputs
+
+
+@pytest.mark.asyncio
+async def test_answers_questions(mocker: MockerFixture) -> None:
+    agent = _agent(mocker, QUESTION)
+
+    deltas, outputs = await _run(SingleShotAgentExecutor(agent))
+
+    assert deltas == []
+    assert outputs == ["What is 1 + 1?\nIt is two."]
+    agent.run.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_other_intents(mocker: MockerFixture) -> None:
+    _, outputs = await _run(SingleShotAgentExecutor(_agent(mocker, GREETING)))
+
+    assert outputs == ["greeting"]
+
+
+@pytest.mark.asyncio
+async def test_streaming(mocker: MockerFixture) -> None:
+    detector = SingleShotAgentExecutor(_agent(mocker, QUESTION), streaming=True)
+
+    deltas, outputs = await _run(detector)
+
+    assert len(deltas) > 1
+    assert "".join(deltas) == "It is two."
+    assert outputs == ["What is 1 + 1?\nIt is two."]
+
+
+@pytest.mark.asyncio
+async def test_streams_while_the_call_is_in_flight(mocker: MockerFixture) -> None:
+    streamed = asyncio.Event()
+    detector = SingleShotAgentExecutor(
+        _agent(mocker, QUESTION, streamed), streaming=True
+    )
+
+    deltas, outputs = await _run(detector, streamed)
+
+    assert "".join(deltas) == "It is two."
+    assert outputs == ["What is 1 + 1?\nIt is two."]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("streaming", [False, True])
+async def test_fast_path_leaves_questions_to_the_call(
+    mocker: MockerFixture, streaming: bool
+) -> None:
+    classifier = mocker.Mock()
+    classifier.classify.return_value = IntentDetectionResult.model_validate(
+        QUESTION.model_dump(exclude={"answer"})
+    )
+    agent = _agent(mocker, QUESTION)
+    agent.run_stream = mocker.Mock(wraps=agent.run_stream)
+    detector = SingleShotAgentExecutor(agent, classifier, streaming=streaming)
+
+    _, outputs = await _run(detector)
+    assert outputs == ["What is 1 + 1?\nIt is two."]
+    assert (agent.run.await_count, agent.run_stream.call_count) == (
+        (0, 1) if streaming else (1, 0)
+    )
+
+    # the other intents are answered without the call
+    classifier.classify.return_value = IntentDetectionResult.model_validate(
+        GREETING.model_dump(exclude={"answer"})
+    )
+    _, outputs = await _run(detector)
+    assert outputs == ["greeting"]
+    assert agent.run.await_count + agent.run_stream.call_count == 1
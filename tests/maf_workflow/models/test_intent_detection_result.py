@@ -39,3 +39,25 @@ def test_intent_detection_result_validation_err():
     }
     with pytest.raises(ValueError):
         IntentDetectionResult(**_params)
+
+
+@pytest.mark.parametrize(
+    "flag",
+    [
+        "is_greeting",
+        "is_inappropriate",
+        "is_question",
+        "is_statement",
+    ],
+)
+def test_intent_detection_result_intent(flag: str):
+    _params: dict[str, Any] = {
+        "is_greeting": False,
+        "is_inappropriate": False,
+        "is_question": False,
+        "is_statement": False,
+        "message_content": "Hello there!",
+        "response": "",
+    }
+    _params[flag] = True
+    assert IntentDetectionResult(**_params).intent == flag
@@ -1,27 +1,39 @@
+import httpx
 import pytest
+from agent_framework import ChatOptions
 from pytest_mock import MockerFixture
 
 from maf_workflow.services.azure_open_ai_chat_client_service import (
     AzureOpenAIChatClientService,
     AzureOpenAIChatClientServiceEnv,
+    CredentialAzureOpenAI,
+    InstrumentedTransport,
+    RateLimitedTransport,
+    SingleInstructionsChatClient,
 )
+from maf_workflow.utils.rate_limit_scheduler import RateLimitScheduler
+
+
+def _env(api_key: str | None = "test-api-key") -> AzureOpenAIChatClientServiceEnv:
+    return AzureOpenAIChatClientServiceEnv(
+        azure_openai_endpoint="https://test-endpoint.openai.azure.com/",
+        azure_openai_chat_deployment_name="test-deployment",
+        azure_openai_api_version="2025-04-01-preview",
+        azure_openai_api_key=api_key,
+        azure_openai_max_connections=10,
+        azure_openai_max_keepalive_connections=5,
+    )
 
 
 @pytest.mark.parametrize("api_key", ["test-api-key", None])
 def test_get_client(api_key, mocker: MockerFixture) -> None:
     mock_client = mocker.patch(
-        "maf_workflow.services.azure_open_ai_chat_client_service.AzureOpenAIChatClient"
+        "maf_workflow.services.azure_open_ai_chat_client_service.SingleInstructionsChatClient"
     )
     mock_def_cred = mocker.patch(
         "maf_workflow.services.azure_open_ai_chat_client_service.DefaultAzureCredential"
     )
-    env = AzureOpenAIChatClientServiceEnv(
-        azure_openai_endpoint="https://test-endpoint.openai.azure.com/",
-        azure_openai_chat_deployment_name="test-deployment",
-        azure_openai_api_version="2025-04-01-preview",
-        azure_openai_api_key=api_key,
-    )
-    service = AzureOpenAIChatClientService(env=env)
+    service = AzureOpenAIChatClientService(env=_env(api_key))
     client = service.get_client()
 
     assert client is not None
@@ -31,3 +43,178 @@ def test_get_client(api_key, mocker: MockerFixture) -> None:
         assert mock_def_cred.call_count == 0
     else:
         mock_def_cred.assert_called_once()
+
+
+def test_get_client_is_shared(mocker: MockerFixture) -> None:
+    mock_client = mocker.patch(
+        "maf_workflow.services.azure_open_ai_chat_client_service.SingleInstructionsChatClient"
+    )
+    service = AzureOpenAIChatClientService(env=_env())
+
+    assert service.get_client() is service.get_client()
+    mock_client.assert_called_once()
+
+
+@pytest.mark.parametrize("h2_installed", [True, False])
+def test_http2(h2_installed: bool, mocker: MockerFixture) -> None:
+    mocker.patch(
+        "maf_workflow.services.azure_open_ai_chat_client_service.importlib.util.find_spec",
+        return_value=object() if h2_installed else None,
+    )
+    service = AzureOpenAIChatClientService(env=_env())
+
+    assert service.http2 is h2_installed
+
+
+def test_get_pool_stats(mocker: MockerFixture) -> None:
+    mocker.patch(
+        "maf_workflow.services.azure_open_ai_chat_client_service.SingleInstructionsChatClient"
+    )
+    service = AzureOpenAIChatClientService(env=_env())
+
+    stats = service.get_pool_stats()
+    assert stats.max_connections == 10
+    assert stats.max_keepalive_connections == 5
+    assert stats.requests == 0
+
+    service.get_client()
+    stats = service.get_pool_stats()
+    assert stats.connections == 0
+    assert stats.requests == 0
+    assert (stats.queued, stats.throttled, stats.concurrency_limit) == (0, 0, 100)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("api_key", ["test-api-key", None])
+async def test_warmup(
+    api_key: str | None, mocker: MockerFixture, caplog: pytest.LogCaptureFixture
+) -> None:
+    mocker.patch(
+        "maf_workflow.services.azure_open_ai_chat_client_service.SingleInstructionsChatClient"
+    )
+    mocker.patch(
+        "maf_workflow.services.azure_open_ai_chat_client_service.DefaultAzureCredential"
+    )
+    token_provider = mocker.AsyncMock(side_effect=RuntimeError("no credential"))
+    mocker.patch(
+        "maf_workflow.services.azure_open_ai_chat_client_service.get_bearer_token_provider",
+        return_value=token_provider,
+    )
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if len(requests) == 3:
+            raise httpx.ConnectError("boom")
+        return httpx.Response(404)
+
+    service = AzureOpenAIChatClientService(env=_env(api_key))
+    service.get_client()
+    assert service._transport is not None
+    service._transport.transport = httpx.MockTransport(handler)
+
+    await service.warmup(connections=3)
+
+    assert [(r.method, str(r.url)) for r in requests] == [
+        ("HEAD", "https://test-endpoint.openai.azure.com/")
+    ] * 3
+    assert "Could not open a connection on warmup: boom" in caplog.text
+    assert token_provider.await_count == (0 if api_key else 1)
+    assert ("Could not get a token" in caplog.text) is (api_key is None)
+    # warming up is not a request of the client
+    assert service.get_pool_stats().requests == 0
+
+
+@pytest.mark.asyncio
+async def test_credential_is_closed_with_the_client(mocker: MockerFixture) -> None:
+    credential = mocker.AsyncMock()
+    client = CredentialAzureOpenAI(
+        credential,
+        azure_endpoint="https://test-endpoint.openai.azure.com/",
+        api_version="2025-04-01-preview",
+        azure_ad_token_provider=mocker.AsyncMock(return_value="token"),
+    )
+
+    async with client:
+        credential.close.assert_not_awaited()
+
+    credential.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_instrumented_transport() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/fail":
+            raise httpx.ConnectError("boom")
+        return httpx.Response(200)
+
+    transport = InstrumentedTransport(httpx.MockTransport(handler))
+    async with httpx.AsyncClient(transport=transport) as client:
+        await client.get("https://test/ok")
+        with pytest.raises(httpx.ConnectError):
+            await client.get("https://test/fail")
+
+    assert transport.requests == 2
+    assert transport.failures == 1
+    assert transport.in_flight == 0
+    assert transport.connections() == []
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_transport() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/fail"):
+            raise httpx.ConnectError("boom")
+        # bodies that are read from the network, as with the real transport
+        if "throttled" in request.url.path:
+            return httpx.Response(
+                429, headers={"retry-after-ms": "10"}, stream=httpx.ByteStream(b"")
+            )
+        return httpx.Response(200, stream=httpx.ByteStream(b'{"ok": true}'))
+
+    scheduler = RateLimitScheduler(max_concurrency=4)
+    transport = RateLimitedTransport(httpx.MockTransport(handler), scheduler, 100)
+    async with httpx.AsyncClient(transport=transport) as client:
+        response = await client.post(
+            "https://test/openai/deployments/chat/completions", json={}
+        )
+        assert response.json() == {"ok": True}
+        await client.post("https://test/openai/deployments/throttled/completions")
+        with pytest.raises(httpx.ConnectError):
+            await client.get("https://test/fail")
+
+    assert scheduler.throttled == 1
+    assert scheduler.concurrency_limit("throttled") == 2
+    assert scheduler.concurrency_limit("chat") == 4
+    # every slot was given back
+    for deployment in ("chat", "throttled", "test"):
+        for _ in range(scheduler.concurrency_limit(deployment)):
+            await scheduler.acquire(deployment, 1)
+
+
+def test_estimate_tokens() -> None:
+    transport = RateLimitedTransport(
+        httpx.MockTransport(lambda r: httpx.Response(200)), RateLimitScheduler(), 100
+    )
+
+    def request(content: bytes) -> httpx.Request:
+        return httpx.Request("POST", "https://test", content=content)
+
+    assert transport.estimate_tokens(request(b'{"max_tokens": 10}')) == 4 + 10
+    assert transport.estimate_tokens(request(b"[1, 2, 3]")) == 2 + 100
+    assert transport.estimate_tokens(request(b"not json")) == 100
+
+
+def test_instructions_are_sent_once() -> None:
+    client = SingleInstructionsChatClient(
+        endpoint="https://test-endpoint.openai.azure.com/",
+        deployment_name="test-deployment",
+        api_key="test-api-key",
+    )
+    chat_options = ChatOptions(instructions="Be brief.")
+    messages = client.prepare_messages("hi", chat_options)
+
+    options = client._prepare_options(messages, chat_options)
+
+    assert [m["role"] for m in options["messages"]] == ["system", "user"]
+    assert chat_options.instructions == "Be brief."
@@ -0,0 +1,247 @@
+import asyncio
+from collections.abc import Sequence
+
+import pytest
+from agent_framework import (
+    ChatAgent,
+    ChatMessage,
+    ChatMessageStore,
+    ChatMessageStoreProtocol,
+    Role,
+)
+
+from maf_workflow.models.history_summary import HistorySummary
+from maf_workflow.services.chat_history_service import (
+    ChatHistoryService,
+    ChatHistoryServiceEnv,
+    TokenBudgetChatMessageStore,
+)
+from maf_workflow.services.mock_chat_client_service import (
+    MockChatClientService,
+    MockChatClientServiceEnv,
+)
+from maf_workflow.services.sqlite_chat_message_store_service import (
+    SQLiteChatMessageStoreService,
+    SQLiteChatMessageStoreServiceEnv,
+)
+from maf_workflow.utils.ttl_lru_cache import TTLLRUCache
+
+# 8 tokens each: 16 characters plus the message overhead
+A, B, C, D = ("a" * 16, "b" * 16, "c" * 16, "d" * 16)
+
+
+class FakeSummarizer:
+    def __init__(self, fail: bool = False):
+        self.calls: list[tuple[str | None, list[str]]] = []
+        self.fail = fail
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, summary: str | None, messages: Sequence[ChatMessage]):
+        self.calls.append((summary, [m.text for m in messages]))
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("failed")
+        return (summary or "") + "".join(m.text[0] for m in messages)
+
+
+def _store(
+    summarize: FakeSummarizer | None = None,
+    max_tokens: int = 16,
+    summaries: TTLLRUCache[str, HistorySummary] | None = None,
+    inner: ChatMessageStoreProtocol | None = None,
+) -> TokenBudgetChatMessageStore:
+    return TokenBudgetChatMessageStore(
+        inner or ChatMessageStore(),
+        "t1",
+        max_tokens,
+        TTLLRUCache(max_entries=10) if summaries is None else summaries,
+        summarize,
+    )
+
+
+def _messages(*texts: str) -> list[ChatMessage]:
+    return [ChatMessage(Role.USER, text=text) for text in texts]
+
+
+async def _texts(store: TokenBudgetChatMessageStore) -> list[str]:
+    return [m.text for m in await store.list_messages()]
+
+
+@pytest.mark.asyncio
+async def test_window_within_budget() -> None:
+    store = _store()
+
+    await store.add_messages(_messages(A, B))
+    assert await _texts(store) == [A, B]
+    assert store.window_tokens == 16
+
+    await store.add_messages(_messages(C))
+    assert await _texts(store) == [B, C]
+    assert store.window_tokens == 16
+    assert len(await store.store.list_messages()) == 3
+
+
+@pytest.mark.asyncio
+async def test_newest_message_is_kept_over_budget() -> None:
+    store = _store(max_tokens=4)
+
+    await store.add_messages(_messages(A, B))
+
+    assert await _texts(store) == [B]
+
+
+@pytest.mark.asyncio
+async def test_summarizes_in_background() -> None:
+    summarize = FakeSummarizer()
+    summarize.release.clear()
+    summaries: TTLLRUCache[str, HistorySummary] = TTLLRUCache(max_entries=10)
+    store = _store(summarize, summaries=summaries)
+
+    await store.add_messages(_messages(A, B, C))
+    await asyncio.sleep(0)
+    # the turn does not wait for the summary
+    assert await _texts(store) == [B, C]
+    await store.add_messages(_messages(D))
+
+    summarize.release.set()
+    await store.wait_summarized()
+
+    assert summarize.calls == [(None, [A]), ("a", [B])]
+    messages = await store.list_messages()
+    assert messages[0].role == Role.SYSTEM
+    assert messages[0].text.endswith("\nab")
+    assert [m.text for m in messages[1:]] == [C, D]
+    assert summaries.get("t1") == HistorySummary(text="ab", covered=2)
+
+
+@pytest.mark.asyncio
+async def test_failed_summary_is_retried() -> None:
+    summarize = FakeSummarizer(fail=True)
+    store = _store(summarize)
+
+    await store.add_messages(_messages(A, B, C))
+    await store.wait_summarized()
+    assert await _texts(store) == [B, C]
+
+    summarize.fail = False
+    await store.add_messages(_messages(D))
+    await store.wait_summarized()
+
+    assert summarize.calls[-1] == (None, [A, B])
+    assert (await store.list_messages())[0].text.endswith("\nab")
+
+
+@pytest.mark.asyncio
+async def test_without_summaries_old_messages_are_dropped() -> None:
+    store = _store()
+
+    await store.add_messages(_messages(A, B, C))
+    await store.wait_summarized()
+
+    assert await _texts(store) == [B, C]
+
+
+@pytest.mark.asyncio
+async def test_restores_from_stored_messages_and_cached_summary() -> None:
+    summarize = FakeSummarizer()
+    summaries: TTLLRUCache[str, HistorySummary] = TTLLRUCache(max_entries=10)
+    first = _store(summarize, summaries=summaries)
+    await first.add_messages(_messages(A, B, C))
+    await first.wait_summarized()
+
+    inner = ChatMessageStore(await first.store.list_messages())
+    restored = _store(summarize, summaries=summaries, inner=inner)
+
+    messages = await restored.list_messages()
+    assert messages[0].text.endswith("\na")
+    assert [m.text for m in messages[1:]] == [B, C]
+    assert len(summarize.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_serialization_is_delegated() -> None:
+    store = _store()
+    await store.add_messages(_messages(A))
+    state = await store.serialize()
+
+    restored = _store()
+    await restored.update_from_state(state)
+
+    assert await _texts(restored) == [A]
+
+    deserialized = await TokenBudgetChatMessageStore.deserialize(
+        state, store=ChatMessageStore(), max_tokens=16, summaries=TTLLRUCache(10)
+    )
+    assert await _texts(deserialized) == [A]
+    with pytest.raises(ValueError, match="max_tokens"):
+        await TokenBudgetChatMessageStore.deserialize(state, store=ChatMessageStore())
+
+
+@pytest.mark.asyncio
+async def test_restores_after_the_stored_messages_are_compacted() -> None:
+    summarize = FakeSummarizer()
+    summaries: TTLLRUCache[str, HistorySummary] = TTLLRUCache(max_entries=10)
+    stores = SQLiteChatMessageStoreService(
+        env=SQLiteChatMessageStoreServiceEnv(chat_message_store_max_messages=3)
+    )
+    first = _store(summarize, summaries=summaries, inner=stores.create_store("t1"))
+    await first.add_messages(_messages(A, B, C, D))
+    await first.wait_summarized()
+    assert summaries.get("t1") == HistorySummary(text="ab", covered=2)
+
+    # A was dropped by the wrapped store, B is summarized
+    restored = _store(summarize, summaries=summaries, inner=stores.create_store("t1"))
+    messages = await restored.list_messages()
+    assert messages[0].text.endswith("\nab")
+    assert [m.text for m in messages[1:]] == [C, D]
+
+    await restored.add_messages(_messages(A))
+    await restored.wait_summarized()
+    assert summaries.get("t1") == HistorySummary(text="abc", covered=3)
+
+
+def _service(**kwargs) -> ChatHistoryService:
+    return ChatHistoryService(
+        env=ChatHistoryServiceEnv(**kwargs),
+        stores=SQLiteChatMessageStoreService(env=SQLiteChatMessageStoreServiceEnv()),
+        chat_client_service=MockChatClientService(
+            env=MockChatClientServiceEnv(
+                mock_chat_client_latency_ms=0,
+                mock_chat_client_output_tokens=32,
+                mock_chat_client_seed=0,
+            )
+        ),
+    )
+
+
+@pytest.mark.asyncio
+async def test_service() -> None:
+    service = _service(chat_history_max_tokens=100)
+    agent = ChatAgent(
+        service.chat_client_service.get_client(),
+        chat_message_store_factory=service.create_store,
+    )
+    thread = agent.get_new_thread()
+
+    for text in ("hello", "how are you?", "bye"):
+        await agent.run(text, thread=thread)
+    store = thread.message_store
+    assert isinstance(store, TokenBudgetChatMessageStore)
+    await store.wait_summarized()
+
+    summary = service.get_summary(store.thread_id)
+    assert summary is not None and summary.covered > 0
+    assert store.window_tokens <= 100
+    resumed = await agent.deserialize_thread(await thread.serialize(full=True))
+    assert isinstance(resumed.message_store, TokenBudgetChatMessageStore)
+    assert resumed.message_store.thread_id == store.thread_id
+    assert (await resumed.message_store.list_messages())[0].role == Role.SYSTEM
+
+
+@pytest.mark.asyncio
+async def test_service_without_summaries() -> None:
+    store = _service(chat_history_summary_enabled=False).create_store("t1")
+
+    assert store.summarize is None
+    assert store.thread_id == "t1"
@@ -0,0 +1,121 @@
+from pathlib import Path
+
+import pytest
+from agent_framework import WorkflowCheckpoint
+
+from maf_workflow.services.file_workflow_checkpoint_service import (
+    FileWorkflowCheckpointService,
+    FileWorkflowCheckpointServiceEnv,
+)
+
+
+def _service(path: Path) -> FileWorkflowCheckpointService:
+    return FileWorkflowCheckpointService(
+        env=FileWorkflowCheckpointServiceEnv(
+            workflow_checkpoint_enabled=True, workflow_checkpoint_path=str(path)
+        )
+    )
+
+
+def _checkpoint(run_id: str, iteration: int) -> WorkflowCheckpoint:
+    return WorkflowCheckpoint(
+        workflow_id=run_id,
+        iteration_count=iteration,
+        messages={"start": [{"data": f"step {iteration}"}]},
+    )
+
+
+@pytest.mark.asyncio
+async def test_save_and_load(tmp_path: Path) -> None:
+    service = _service(tmp_path)
+    checkpoint = _checkpoint("r1", 0)
+
+    assert await service.save_checkpoint(checkpoint) == checkpoint.checkpoint_id
+
+    assert service.enabled
+    assert (tmp_path / "r1" / f"{checkpoint.checkpoint_id}.json").exists()
+    assert list(tmp_path.glob("*/*.tmp")) == []
+    loaded = await service.load_checkpoint(checkpoint.checkpoint_id)
+    assert loaded is not None
+    assert loaded.to_dict() == checkpoint.to_dict()
+    assert await service.load_checkpoint("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_list_and_latest(tmp_path: Path) -> None:
+    service = _service(tmp_path)
+    second, first, other = (
+        _checkpoint("r1", 1),
+        _checkpoint("r1", 0),
+        _checkpoint("r2", 0),
+    )
+    for checkpoint in (second, first, other):
+        await service.save_checkpoint(checkpoint)
+
+    assert await service.list_checkpoint_ids("r1") == [
+        first.checkpoint_id,
+        second.checkpoint_id,
+    ]
+    assert len(await service.list_checkpoints()) == 3
+    assert await service.list_checkpoints("r3") == []
+    assert await service.get_latest_checkpoint_id("r1") == second.checkpoint_id
+    assert await service.get_latest_checkpoint_id("r3") is None
+
+
+@pytest.mark.asyncio
+async def test_delete(tmp_path: Path) -> None:
+    service = _service(tmp_path)
+    first, second, other = (
+        _checkpoint("r1", 0),
+        _checkpoint("r1", 1),
+        _checkpoint("r2", 0),
+    )
+    for checkpoint in (first, second, other):
+        await service.save_checkpoint(checkpoint)
+
+    assert await service.delete_checkpoint(first.checkpoint_id)
+    assert not await service.delete_checkpoint(first.checkpoint_id)
+    assert await service.list_checkpoint_ids("r1") == [second.checkpoint_id]
+
+    await service.delete_run("r1")
+    await service.delete_run("r1")
+    assert not (tmp_path / "r1").exists()
+    assert await service.list_checkpoint_ids() == [other.checkpoint_id]
+
+
+@pytest.mark.asyncio
+async def test_lookup_under_the_run(tmp_path: Path) -> None:
+    first, other = _checkpoint("r1", 0), _checkpoint("r2", 0)
+    for checkpoint in (first, other):
+        await _service(tmp_path).save_checkpoint(checkpoint)
+    # the same id in another run is not looked at
+    (tmp_path / "r3").mkdir()
+    (tmp_path / "r3" / f"{first.checkpoint_id}.json").write_text("{not json")
+
+    # after a restart, a checkpoint is found once its run is listed
+    service = _service(tmp_path)
+    assert await service.load_checkpoint(first.checkpoint_id) is None
+    assert not await service.delete_checkpoint(other.checkpoint_id)
+    assert await service.get_latest_checkpoint_id("r1") == first.checkpoint_id
+    loaded = await service.load_checkpoint(first.checkpoint_id)
+    assert loaded is not None
+    assert loaded.to_dict() == first.to_dict()
+
+    # gone from under the service, as deleted by another worker
+    (tmp_path / "r1" / f"{first.checkpoint_id}.json").unlink()
+    assert await service.load_checkpoint(first.checkpoint_id) is None
+    assert not await service.delete_checkpoint(first.checkpoint_id)
+    await service.list_checkpoints("r2")
+    await service.delete_run("r2")
+    assert await service.load_checkpoint(other.checkpoint_id) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("run_id", ["..", ".", "../r1", "a/b", ""])
+async def test_invalid_run_id(tmp_path: Path, run_id: str) -> None:
+    service = _service(tmp_path)
+
+    with pytest.raises(ValueError):
+        await service.save_checkpoint(_checkpoint(run_id, 0))
+    with pytest.raises(ValueError):
+        await service.delete_run(run_id)
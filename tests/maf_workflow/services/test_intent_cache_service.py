@@ -0,0 +1,126 @@
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from maf_workflow.models.intent_detection_result import IntentDetectionResult
+from maf_workflow.services.intent_cache_service import (
+    IntentCacheService,
+    IntentCacheServiceEnv,
+)
+
+QUESTION = IntentDetectionResult(
+    message_content="What is 1 + 1?",
+    is_greeting=False,
+    is_inappropriate=False,
+    is_question=True,
+    is_statement=False,
+    response="",
+)
+
+
+def _service(
+    enabled: bool = True, sqlite_path: str | None = None, max_entries: int = 10
+) -> IntentCacheService:
+    env = IntentCacheServiceEnv(
+        intent_cache_enabled=enabled,
+        intent_cache_max_entries=max_entries,
+        intent_cache_max_bytes=1024,
+        intent_cache_ttl_seconds=60,
+        intent_cache_sqlite_path=sqlite_path,
+    )
+    return IntentCacheService(env=env)
+
+
+@pytest.mark.asyncio
+async def test_hit_after_set() -> None:
+    service = _service()
+    assert await service.get("What is 1 + 1?") is None
+
+    await service.set("What is 1 + 1?", QUESTION)
+    result = await service.get("what is  1 + 1?")
+
+    assert result is not None
+    assert result.is_question
+    assert result.message_content == "what is  1 + 1?"
+
+    stats = service.get_stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_disabled() -> None:
+    service = _service(enabled=False)
+    await service.set("What is 1 + 1?", QUESTION)
+
+    assert await service.get("What is 1 + 1?") is None
+    assert service.get_stats().misses == 0
+
+
+@pytest.mark.asyncio
+async def test_evictions_are_counted() -> None:
+    service = _service(max_entries=1)
+    await service.set("a", QUESTION)
+    await service.set("b", QUESTION)
+
+    assert await service.get("a") is None
+    assert service.get_stats().evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_sqlite_survives_restart(tmp_path: Path) -> None:
+    path = str(tmp_path / "intent_cache.db")
+    await _service(sqlite_path=path).set("What is 1 + 1?", QUESTION)
+
+    service = _service(sqlite_path=path)
+    result = await service.get("WHAT is 1 + 1?")
+    assert result is not None
+    assert result.is_question
+    assert service.get_stats().entries == 1  # promoted to memory
+    assert await service.get("unknown") is None
+
+
+@pytest.mark.asyncio
+async def test_sqlite_is_bounded(tmp_path: Path) -> None:
+    path = str(tmp_path / "intent_cache.db")
+    service = _service(sqlite_path=path, max_entries=1)
+    await service.set("a", QUESTION)
+    await service.set("b", QUESTION)
+
+    assert service.get_stats().evictions == 2  # one in memory, one on disk
+    assert await _service(sqlite_path=path).get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_sqlite_expired_rows(tmp_path: Path, mocker: MockerFixture) -> None:
+    path = str(tmp_path / "intent_cache.db")
+    await _service(sqlite_path=path).set("a", QUESTION)
+    service = _service(sqlite_path=path)
+    assert await service.get("b") is None  # opened before the row expires
+
+    time = mocker.patch("maf_workflow.services.intent_cache_service.time")
+    time.time.return_value = 10**12
+    assert await service.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_sqlite_evicts_only_over_the_limit(tmp_path: Path) -> None:
+    path = str(tmp_path / "intent_cache.db")
+    service = _service(sqlite_path=path, max_entries=2)
+    await service.set("a", QUESTION)
+    await service.set("a", QUESTION)  # replaces its row
+    await service.set("b", QUESTION)
+    assert service.get_stats().evictions == 0
+
+    # the rows are counted again after a restart
+    restarted = _service(sqlite_path=path, max_entries=2)
+    assert await restarted.get("a") is not None  # now the most recently used
+    await restarted.set("c", QUESTION)
+
+    assert restarted.get_stats().evictions == 1
+    reopened = _service(sqlite_path=path, max_entries=2)
+    assert [await reopened.get(key) is not None for key in "abc"] == [
+        True,
+        False,
+        True,
+    ]
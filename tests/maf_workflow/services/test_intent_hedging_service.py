@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+
+from maf_workflow.services.intent_hedging_service import (
+    IntentHedgingService,
+    IntentHedgingServiceEnv,
+)
+
+
+def _service(
+    enabled: bool = True,
+    budget: float = 1.0,
+    min_samples: int = 20,
+    initial_delay_ms: float = 20,
+) -> IntentHedgingService:
+    env = IntentHedgingServiceEnv(
+        intent_hedging_enabled=enabled,
+        intent_hedging_percentile=0.5,
+        intent_hedging_initial_delay_ms=initial_delay_ms,
+        intent_hedging_min_delay_ms=1,
+        intent_hedging_min_samples=min_samples,
+        intent_hedging_budget=budget,
+    )
+    return IntentHedgingService(env=env)
+
+
+class Agent:
+    """Answers each call after its delay; the calls in `failing` raise instead."""
+
+    def __init__(self, *delays: float, failing: tuple[int, ...] = ()):
+        self.delays = delays
+        self.failing = failing
+        self.calls = 0
+        self.cancelled = 0
+
+    async def ask(self) -> int:
+        call = self.calls
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delays[call])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if call in self.failing:
+            raise RuntimeError(f"call {call} failed")
+        return call
+
+
+@pytest.mark.asyncio
+async def test_disabled() -> None:
+    service = _service(enabled=False)
+    agent = Agent(0.05)
+
+    assert await service.run(agent.ask) == 0
+    assert service.get_stats().calls == 0
+
+
+@pytest.mark.asyncio
+async def test_fast_call_is_not_hedged() -> None:
+    service = _service()
+    agent = Agent(0.0)
+
+    assert await service.run(agent.ask) == 0
+
+    stats = service.get_stats()
+    assert (stats.calls, stats.hedged, agent.calls) == (1, 0, 1)
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged() -> None:
+    service = _service()
+    agent = Agent(1.0, 0.0)
+
+    assert await service.run(agent.ask) == 1
+
+    stats = service.get_stats()
+    assert (stats.hedged, stats.hedge_wins, stats.hedge_rate) == (1, 1, 1.0)
+    await asyncio.sleep(0)
+    assert agent.cancelled == 1
+    # the first call counts too, with the time it ran before it was cancelled
+    assert service._latency.count == 2
+    assert service._latency.percentile(1.0) >= 0.02
+
+
+@pytest.mark.asyncio
+async def test_first_call_can_still_win() -> None:
+    service = _service(initial_delay_ms=100)
+    agent = Agent(0.11, 1.0)
+
+    assert await service.run(agent.ask) == 0
+
+    assert service.get_stats().hedge_wins == 0
+    await asyncio.sleep(0)
+    assert agent.cancelled == 1
+    # the duplicate ran for less than the delay, its latency is unknown
+    assert service._latency.count == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_duplicate_waits_for_first() -> None:
+    service = _service()
+    agent = Agent(0.1, 0.0, failing=(1,))
+
+    assert await service.run(agent.ask) == 0
+
+
+@pytest.mark.asyncio
+async def test_both_calls_fail() -> None:
+    service = _service()
+    agent = Agent(0.1, 0.0, failing=(0, 1))
+
+    with pytest.raises(RuntimeError, match="call 1 failed"):
+        await service.run(agent.ask)
+
+
+@pytest.mark.asyncio
+async def test_failure_before_delay_is_raised() -> None:
+    service = _service()
+    agent = Agent(0.0, failing=(0,))
+
+    with pytest.raises(RuntimeError):
+        await service.run(agent.ask)
+    assert service.get_stats().hedged == 0
+
+
+@pytest.mark.asyncio
+async def test_budget() -> None:
+    service = _service(budget=0.5)
+    agent = Agent(1.0, 0.0, 0.03)
+
+    assert await service.run(agent.ask) == 1  # 0 of 1 hedged, within budget
+    assert await service.run(agent.ask) == 2  # 1 of 2 hedged, at the budget
+
+    stats = service.get_stats()
+    assert (stats.calls, stats.hedged, stats.budget_denied) == (2, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_delay_follows_latency() -> None:
+    service = _service(min_samples=3)
+    assert service.get_stats().delay_seconds == 0.02
+
+    for _ in range(3):
+        await service.run(Agent(0.0).ask)
+
+    assert service.get_stats().delay_seconds == 0.001
+
+
+@pytest.mark.asyncio
+async def test_caller_cancelled() -> None:
+    service = _service(initial_delay_ms=1000)
+    agent = Agent(1.0)
+
+    task = asyncio.create_task(service.run(agent.ask))
+    await asyncio.sleep(0.005)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    await asyncio.sleep(0)
+    assert agent.cancelled == 1
+    # cancelled before the delay, its latency is unknown
+    assert service._latency.count == 0
@@ -0,0 +1,159 @@
+import json
+from pathlib import Path
+
+import pytest
+from agent_framework import ChatMessage, Role
+from agent_framework.exceptions import ServiceResponseException
+
+from maf_workflow.models.intent_answer_result import IntentAnswerResult
+from maf_workflow.models.intent_detection_result import IntentDetectionResult
+from maf_workflow.models.question_response import QuestionResponse
+from maf_workflow.services.mock_chat_client_service import (
+    MockChatClientService,
+    MockChatClientServiceEnv,
+)
+from maf_workflow.utils.prompt_cache import cached_tokens
+
+
+def _service(**kwargs) -> MockChatClientService:
+    settings = {
+        "mock_chat_client_latency_ms": 0.0,
+        "mock_chat_client_latency_stddev_ms": 0.0,
+        "mock_chat_client_latency_distribution": "constant",
+        "mock_chat_client_output_tokens": 8,
+        "mock_chat_client_seed": 1,
+    } | kwargs
+    return MockChatClientService(env=MockChatClientServiceEnv(**settings))
+
+
+@pytest.mark.parametrize(
+    "text, intent",
+    [
+        ("Good morning!", "is_greeting"),
+        ("You are stupid!", "is_inappropriate"),
+        ("What is 1 + 1?", "is_question"),
+        ("explain vaccines", "is_question"),
+        ("I love programming.", "is_statement"),
+    ],
+)
+def test_generates_intents(text: str, intent: str) -> None:
+    client = _service().get_client()
+
+    reply = client.reply(text, IntentDetectionResult)
+
+    result = IntentDetectionResult.model_validate_json(reply)
+    assert result.intent == intent
+    assert result.message_content == text
+    assert bool(result.response) == (intent == "is_greeting")
+
+
+def test_generates_single_shot_replies() -> None:
+    client = _service().get_client()
+
+    question = IntentAnswerResult.model_validate_json(
+        client.reply("What is 1 + 1?", IntentAnswerResult)
+    )
+    greeting = IntentAnswerResult.model_validate_json(
+        client.reply("Hello", IntentAnswerResult)
+    )
+
+    assert question.is_question and len(question.answer.split()) == 8
+    assert greeting.is_greeting and greeting.answer == ""
+
+
+def test_generates_answers_and_text() -> None:
+    client = _service().get_client()
+
+    answer = QuestionResponse.model_validate_json(
+        client.reply("What is 1 + 1?", QuestionResponse)
+    )
+    assert answer.user_question == "What is 1 + 1?"
+    assert len(answer.response.split()) == 8
+    assert len(client.reply("Tell me a story", None).split()) == 8
+
+
+def test_canned_responses(tmp_path: Path) -> None:
+    path = tmp_path / "responses.json"
+    path.write_text(
+        json.dumps({"Hello  There": "General Kenobi", "ping": {"pong": True}})
+    )
+    client = _service(mock_chat_client_responses_path=str(path)).get_client()
+
+    assert client.reply("hello there", IntentDetectionResult) == "General Kenobi"
+    assert json.loads(client.reply("PING", None)) == {"pong": True}
+
+
+@pytest.mark.parametrize("distribution", ["constant", "uniform", "normal", "lognormal"])
+def test_latency_distributions(distribution: str) -> None:
+    client = _service(
+        mock_chat_client_latency_ms=100.0,
+        mock_chat_client_latency_stddev_ms=20.0,
+        mock_chat_client_latency_distribution=distribution,
+    ).get_client()
+
+    samples = [client.latency() for _ in range(2000)]
+
+    assert all(s >= 0 for s in samples)
+    assert sum(samples) / len(samples) == pytest.approx(0.1, rel=0.05)
+
+
+def test_lognormal_with_zero_latency() -> None:
+    client = _service(mock_chat_client_latency_distribution="lognormal").get_client()
+    assert client.latency() == 0.0
+
+
+@pytest.mark.asyncio
+async def test_warmup() -> None:
+    service = _service()
+
+    await service.warmup()
+
+    assert service._client is not None
+    assert service.get_pool_stats().requests == 0
+
+
+@pytest.mark.asyncio
+async def test_get_response() -> None:
+    service = _service()
+    agent = service.get_client().create_agent(response_format=QuestionResponse)
+
+    response = await agent.run("What is 1 + 1?")
+
+    assert QuestionResponse.model_validate_json(response.text).response
+    assert response.usage_details is not None
+    assert response.usage_details.output_token_count == len(response.text) // 4 + 1
+    stats = service.get_pool_stats()
+    assert (stats.requests, stats.in_flight, stats.failures) == (1, 0, 0)
+
+
+@pytest.mark.asyncio
+async def test_repeated_system_prompt_is_cached() -> None:
+    agent = _service().get_client().create_agent(instructions="x" * 400)
+
+    first = await agent.run("hi")
+    second = await agent.run("hello")
+
+    assert first.usage_details is not None and second.usage_details is not None
+    assert cached_tokens(first.usage_details) == 0
+    assert cached_tokens(second.usage_details) == 100
+
+
+@pytest.mark.asyncio
+async def test_get_streaming_response() -> None:
+    agent = _service().get_client().create_agent(response_format=QuestionResponse)
+
+    updates = [u async for u in agent.run_stream("What is 1 + 1?")]
+
+    assert len(updates) > 2
+    text = "".join(u.text for u in updates)
+    assert QuestionResponse.model_validate_json(text).user_question == "What is 1 + 1?"
+
+
+@pytest.mark.asyncio
+async def test_errors() -> None:
+    service = _service(mock_chat_client_error_rate=1.0)
+    client = service.get_client()
+
+    with pytest.raises(ServiceResponseException):
+        await client.get_response([ChatMessage(Role.USER, text="hi")])
+    assert service.get_pool_stats().failures == 1
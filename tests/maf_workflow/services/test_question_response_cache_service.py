@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from maf_workflow.models.question_response import QuestionResponse
+from maf_workflow.services.question_response_cache_service import (
+    QuestionResponseCacheService,
+    QuestionResponseCacheServiceEnv,
+)
+
+ANSWER = QuestionResponse(user_question="What is 1 + 1?", response="2")
+
+
+def _service(enabled: bool = True) -> QuestionResponseCacheService:
+    env = QuestionResponseCacheServiceEnv(
+        question_cache_enabled=enabled,
+        question_cache_max_entries=10,
+        question_cache_max_bytes=1024,
+        question_cache_ttl_seconds=60,
+    )
+    return QuestionResponseCacheService(env=env)
+
+
+class Agent:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def ask(self) -> QuestionResponse:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return ANSWER
+
+
+@pytest.mark.asyncio
+async def test_caches_answers() -> None:
+    service = _service()
+    agent = Agent()
+
+    first = await service.get_or_fetch("What is 1 + 1?", agent.ask)
+    second = await service.get_or_fetch("what is 1 +  1?", agent.ask)
+
+    assert first is ANSWER
+    assert second.user_question == "what is 1 +  1?"
+    assert second.response == "2"
+    assert agent.calls == 1
+
+    stats = service.get_stats()
+    assert (stats.hits, stats.misses, stats.calls, stats.coalesced) == (1, 1, 1, 0)
+    assert stats.entries == 1
+
+
+@pytest.mark.asyncio
+async def test_coalesces_identical_questions() -> None:
+    service = _service()
+    agent = Agent()
+
+    answers = await asyncio.gather(
+        service.get_or_fetch("What is 1 + 1?", agent.ask),
+        service.get_or_fetch("WHAT is 1 + 1?", agent.ask),
+    )
+
+    assert [a.user_question for a in answers] == ["What is 1 + 1?", "WHAT is 1 + 1?"]
+    assert agent.calls == 1
+    assert service.get_stats().coalesced == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_answers_are_not_cached() -> None:
+    service = _service()
+
+    async def fail() -> QuestionResponse:
+        raise ValueError("invalid reply")
+
+    with pytest.raises(ValueError):
+        await service.get_or_fetch("What is 1 + 1?", fail)
+    assert service.get_stats().entries == 0
+
+
+@pytest.mark.asyncio
+async def test_disabled() -> None:
+    service = _service(enabled=False)
+    agent = Agent()
+
+    await service.get_or_fetch("What is 1 + 1?", agent.ask)
+    await service.get_or_fetch("What is 1 + 1?", agent.ask)
+
+    assert agent.calls == 2
+    assert service.get_stats().calls == 0
@@ -0,0 +1,103 @@
+import pytest
+
+from maf_workflow.services.rule_based_intent_classifier_service import (
+    RuleBasedIntentClassifierService,
+    RuleBasedIntentClassifierServiceEnv,
+)
+
+
+def _service(
+    enabled: bool = True, threshold: float = 0.9
+) -> RuleBasedIntentClassifierService:
+    env = RuleBasedIntentClassifierServiceEnv(
+        intent_fast_path_enabled=enabled,
+        intent_fast_path_confidence_threshold=threshold,
+        intent_fast_path_max_words=12,
+    )
+    return RuleBasedIntentClassifierService(env=env)
+
+
+@pytest.mark.parametrize(
+    "text, response",
+    [
+        ("hi", "Hi! How can I help you today?"),
+        ("Hello there!", "Hello! How can I help you today?"),
+        ("  good   MORNING :)", "Good morning! How can I help you today?"),
+    ],
+)
+def test_classify_greeting(text: str, response: str) -> None:
+    result = _service().classify(text)
+
+    assert result is not None
+    assert result.is_greeting
+    assert result.message_content == text
+    assert result.response == response
+
+
+@pytest.mark.parametrize("text", ["thanks!", "OK", "sounds good."])
+def test_classify_acknowledgement(text: str) -> None:
+    result = _service().classify(text)
+
+    assert result is not None
+    assert result.is_statement
+    assert result.response == ""
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "What is the capital of France?",
+        "I love programming.",
+        "how do I reset my password",
+        "hi, can you help me with my order?",
+        "",
+        "one two three four five six seven eight nine ten eleven twelve thirteen",
+    ],
+)
+def test_classify_falls_back_to_llm(text: str) -> None:
+    assert _service().classify(text) is None
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "What is the capital of France?",
+        "Why are you so stupid?",
+        "I love programming.",
+        "You are stupid.",
+        "how do I reset my password",
+    ],
+)
+@pytest.mark.parametrize("threshold", [0.7, 0.0])
+def test_classify_with_lower_threshold(text: str, threshold: float) -> None:
+    # a question may be inappropriate as well, it is left to the LLM
+    assert _service(threshold=threshold).classify(text) is None
+
+
+@pytest.mark.parametrize("text", ["hi", "thanks"])
+def test_classify_with_higher_threshold(text: str) -> None:
+    assert _service(threshold=0.995).classify(text) is None
+
+
+def test_classify_disabled() -> None:
+    service = _service(enabled=False)
+
+    assert service.classify("hi") is None
+    assert service.get_stats().requests == 0
+
+
+def test_get_stats() -> None:
+    service = _service()
+    for text in ["hi", "hello", "thanks", "What is MAF?"]:
+        service.classify(text)
+
+    stats = service.get_stats()
+    assert stats.requests == 4
+    assert stats.hits == 3
+    assert stats.misses == 1
+    assert stats.hit_rate == 0.75
+    assert stats.hits_by_intent == {"is_greeting": 2, "is_statement": 1}
+
+    # a snapshot, not a live view
+    service.classify("hi")
+    assert stats.requests == 4
@@ -0,0 +1,226 @@
+import threading
+from pathlib import Path
+
+import pytest
+from agent_framework import ChatAgent, ChatMessage, ChatMessageStore, Role
+from pytest_mock import MockerFixture
+
+from maf_workflow.services.mock_chat_client_service import (
+    MockChatClientService,
+    MockChatClientServiceEnv,
+)
+from maf_workflow.services.sqlite_chat_message_store_service import (
+    POSITION_KEY,
+    SQLiteChatMessageStore,
+    SQLiteChatMessageStoreService,
+    SQLiteChatMessageStoreServiceEnv,
+    connect,
+)
+
+
+def _service(**kwargs) -> SQLiteChatMessageStoreService:
+    return SQLiteChatMessageStoreService(env=SQLiteChatMessageStoreServiceEnv(**kwargs))
+
+
+def _messages(*texts: str) -> list[ChatMessage]:
+    return [ChatMessage(Role.USER, text=text) for text in texts]
+
+
+async def _texts(store: SQLiteChatMessageStore) -> list[str]:
+    return [m.text for m in await store.list_messages()]
+
+
+def _positions(state: dict) -> list[int]:
+    return [m.additional_properties[POSITION_KEY]["seq"] for m in state["messages"]]
+
+
+@pytest.mark.asyncio
+async def test_add_and_list_messages() -> None:
+    service = _service()
+    store = service.create_store("t1")
+    other = service.create_store("t2")
+
+    await store.add_messages(_messages("a", "b"))
+    await other.add_messages(_messages("x"))
+    await store.add_messages([ChatMessage(Role.ASSISTANT, text="c")])
+
+    messages = await store.list_messages()
+    assert [m.text for m in messages] == ["a", "b", "c"]
+    assert messages[2].role == Role.ASSISTANT
+    assert [m.text for m in await store.list_messages(offset=1, limit=1)] == ["b"]
+    assert await _texts(other) == ["x"]
+    assert await store.count() == 3
+
+
+@pytest.mark.asyncio
+async def test_queries_run_off_the_loop(mocker: MockerFixture) -> None:
+    opened: list[int] = []
+
+    def open_db(path: str):
+        opened.append(threading.get_ident())
+        return connect(path)
+
+    mocker.patch(
+        "maf_workflow.services.sqlite_chat_message_store_service.connect", open_db
+    )
+    service = _service()
+    store = service.create_store("t1")
+    assert opened == []  # creating a store does no I/O
+
+    await store.add_messages(_messages("a"))
+
+    assert opened != [threading.get_ident()]
+    # the stores of the service share its in-memory database
+    assert await _texts(service.create_store("t1")) == ["a"]
+    assert len(opened) == 1
+
+
+@pytest.mark.asyncio
+async def test_iter_messages_pages() -> None:
+    store = _service(chat_message_store_page_size=2).create_store()
+    await store.add_messages(_messages(*"abcde"))
+
+    assert [m.text async for m in store.iter_messages()] == list("abcde")
+
+
+@pytest.mark.asyncio
+async def test_serialize_deltas() -> None:
+    store = _service().create_store("t1")
+    await store.add_messages(_messages("a", "b"))
+
+    first = await store.serialize()
+    await store.add_messages(_messages("c"))
+    second = await store.serialize()
+    third = await store.serialize()
+    full = await store.serialize(full=True)
+
+    assert first["thread_id"] == "t1"
+    assert _positions(first) == [0, 1]
+    assert _positions(second) == [2]
+    assert third["messages"] == []
+    assert _positions(full) == [0, 1, 2]
+    assert POSITION_KEY not in (await store.list_messages())[0].additional_properties
+
+
+@pytest.mark.asyncio
+async def test_update_from_state_replays_deltas() -> None:
+    source = _service().create_store("t1")
+    target = _service().create_store()
+    await source.add_messages(_messages("a", "b"))
+    first = await source.serialize()
+    await source.add_messages(_messages("c"))
+    second = await source.serialize()
+
+    await target.update_from_state(first)
+    await target.update_from_state(first)  # applying twice changes nothing
+    await target.update_from_state(second)
+    await target.update_from_state(None)
+
+    assert target.thread_id == "t1"
+    assert await _texts(target) == ["a", "b", "c"]
+    assert (await target.serialize())["messages"] == []
+
+
+@pytest.mark.asyncio
+async def test_update_from_state_rejects_gaps() -> None:
+    source = _service().create_store("t1")
+    target = _service().create_store()
+    await source.add_messages(_messages("a"))
+    first = await source.serialize()
+    await source.add_messages(_messages("b"))
+    await source.serialize()
+    await source.add_messages(_messages("c"))
+    third = await source.serialize()
+    await target.update_from_state(first)
+
+    with pytest.raises(ValueError, match="missing"):
+        await target.update_from_state(third)
+
+
+@pytest.mark.asyncio
+async def test_update_from_messages_only() -> None:
+    source = _service().create_store("t1")
+    target = _service().create_store("t2")
+    await source.add_messages(_messages("a"))
+    state = await source.serialize()
+
+    # AgentThread keeps the messages of the state only
+    await target.update_from_state(ChatMessageStore(state["messages"]))
+    await target.update_from_state(
+        await ChatMessageStore(_messages("b")).serialize(), thread_id="t1"
+    )
+
+    assert target.thread_id == "t1"
+    assert await _texts(target) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_deserialize() -> None:
+    service = _service()
+    store = service.create_store("t1")
+    await store.add_messages(_messages("a"))
+    state = await store.serialize()
+
+    restored = await SQLiteChatMessageStore.deserialize(
+        state, db=_service().create_store().db
+    )
+
+    assert await _texts(restored) == ["a"]
+    with pytest.raises(ValueError):
+        await SQLiteChatMessageStore.deserialize(state)
+
+
+@pytest.mark.asyncio
+async def test_compacts_to_max_messages() -> None:
+    store = _service(chat_message_store_max_messages=2).create_store()
+
+    await store.add_messages(_messages("a", "b", "c"))
+    await store.add_messages(_messages("d"))
+
+    assert await _texts(store) == ["c", "d"]
+    assert [m.text async for m in store.iter_messages()] == ["c", "d"]
+    assert _positions(await store.serialize()) == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_persists_to_file(tmp_path: Path) -> None:
+    path = str(tmp_path / "messages.db")
+    await (
+        _service(chat_message_store_sqlite_path=path)
+        .create_store("t1")
+        .add_messages(_messages("a", "b"))
+    )
+
+    store = _service(chat_message_store_sqlite_path=path).create_store("t1")
+    await store.add_messages(_messages("c"))
+
+    assert await _texts(store) == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_delete_thread() -> None:
+    service = _service()
+    await service.create_store("t1").add_messages(_messages("a"))
+
+    await service.delete_thread("t1")
+
+    assert await _texts(service.create_store("t1")) == []
+
+
+@pytest.mark.asyncio
+async def test_agent_thread_round_trip() -> None:
+    service = _service()
+    client = MockChatClientService(
+        env=MockChatClientServiceEnv(mock_chat_client_latency_ms=0)
+    ).get_client()
+    agent = ChatAgent(client, chat_message_store_factory=service.create_store)
+    thread = agent.get_new_thread()
+
+    await agent.run("hello", thread=thread)
+    resumed = await agent.deserialize_thread(await thread.serialize())
+    await agent.run("again", thread=resumed)
+
+    assert isinstance(resumed.message_store, SQLiteChatMessageStore)
+    texts = await _texts(resumed.message_store)
+    assert len(texts) == 4
+    assert texts[0] == "hello" and texts[2] == "again"
@@ -0,0 +1,117 @@
+import threading
+from pathlib import Path
+
+import pytest
+from agent_framework import WorkflowCheckpoint
+from pytest_mock import MockerFixture
+
+from maf_workflow.services.sqlite_workflow_checkpoint_service import (
+    SQLiteWorkflowCheckpointService,
+    SQLiteWorkflowCheckpointServiceEnv,
+    connect,
+)
+
+
+def _service(path: str = ":memory:") -> SQLiteWorkflowCheckpointService:
+    return SQLiteWorkflowCheckpointService(
+        env=SQLiteWorkflowCheckpointServiceEnv(
+            workflow_checkpoint_enabled=True, workflow_checkpoint_sqlite_path=path
+        )
+    )
+
+
+def _checkpoint(run_id: str, iteration: int) -> WorkflowCheckpoint:
+    return WorkflowCheckpoint(
+        workflow_id=run_id,
+        iteration_count=iteration,
+        messages={"start": [{"data": f"step {iteration}"}]},
+    )
+
+
+@pytest.mark.asyncio
+async def test_save_and_load() -> None:
+    service = _service()
+    checkpoint = _checkpoint("r1", 0)
+
+    assert await service.save_checkpoint(checkpoint) == checkpoint.checkpoint_id
+
+    assert service.enabled
+    loaded = await service.load_checkpoint(checkpoint.checkpoint_id)
+    assert loaded is not None
+    assert loaded.to_dict() == checkpoint.to_dict()
+    assert await service.load_checkpoint("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_list_and_latest() -> None:
+    service = _service()
+    second, first, other = (
+        _checkpoint("r1", 1),
+        _checkpoint("r1", 0),
+        _checkpoint("r2", 0),
+    )
+    for checkpoint in (second, first, other):
+        await service.save_checkpoint(checkpoint)
+
+    assert await service.list_checkpoint_ids("r1") == [
+        first.checkpoint_id,
+        second.checkpoint_id,
+    ]
+    assert [c.workflow_id for c in await service.list_checkpoints()] == [
+        "r1",
+        "r1",
+        "r2",
+    ]
+    assert await service.list_checkpoints("r3") == []
+    assert await service.get_latest_checkpoint_id("r1") == second.checkpoint_id
+    assert await service.get_latest_checkpoint_id("r3") is None
+
+
+@pytest.mark.asyncio
+async def test_delete() -> None:
+    service = _service()
+    first, second, other = (
+        _checkpoint("r1", 0),
+        _checkpoint("r1", 1),
+        _checkpoint("r2", 0),
+    )
+    for checkpoint in (first, second, other):
+        await service.save_checkpoint(checkpoint)
+
+    assert await service.delete_checkpoint(first.checkpoint_id)
+    assert not await service.delete_checkpoint(first.checkpoint_id)
+    assert await service.list_checkpoint_ids("r1") == [second.checkpoint_id]
+
+    await service.delete_run("r1")
+    assert await service.list_checkpoint_ids() == [other.checkpoint_id]
+
+
+@pytest.mark.asyncio
+async def test_survives_reopen(tmp_path: Path) -> None:
+    path = str(tmp_path / "checkpoints.db")
+    checkpoint = _checkpoint("r1", 0)
+    await _service(path).save_checkpoint(checkpoint)
+
+    assert await _service(path).get_latest_checkpoint_id("r1") == (
+        checkpoint.checkpoint_id
+    )
+
+
+@pytest.mark.asyncio
+async def test_queries_run_off_the_loop(mocker: MockerFixture) -> None:
+    opened: list[int] = []
+
+    def open_db(path: str):
+        opened.append(threading.get_ident())
+        return connect(path)
+
+    mocker.patch(
+        "maf_workflow.services.sqlite_workflow_checkpoint_service.connect", open_db
+    )
+    service = _service()
+    checkpoint = _checkpoint("r1", 0)
+    await service.save_checkpoint(checkpoint)
+
+    assert opened != [threading.get_ident()]
+    assert await service.get_latest_checkpoint_id("r1") == checkpoint.checkpoint_id
+    assert len(opened) == 1
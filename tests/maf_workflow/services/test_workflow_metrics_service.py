@@ -0,0 +1,63 @@
+import pytest
+
+from maf_workflow.services.workflow_metrics_service import (
+    WorkflowMetricsService,
+    WorkflowMetricsServiceEnv,
+)
+
+
+def _service(enabled: bool = True) -> WorkflowMetricsService:
+    return WorkflowMetricsService(
+        env=WorkflowMetricsServiceEnv(workflow_metrics_enabled=enabled)
+    )
+
+
+def test_enabled() -> None:
+    assert _service().enabled
+    assert not _service(enabled=False).enabled
+
+
+def test_record() -> None:
+    service = _service()
+    service.record(
+        "b",
+        0.2,
+        0.01,
+        input_tokens=10,
+        output_tokens=5,
+        cached_input_tokens=4,
+        payload_size=7,
+    )
+    service.record("b", 0.4, 0.03, failed=True)
+    service.record("a", 0.1, 0.0)
+
+    stats = service.get_stats()
+
+    assert list(stats) == ["a", "b"]
+    b = stats["b"]
+    assert (b.count, b.failures) == (2, 1)
+    assert (b.input_tokens, b.output_tokens, b.payload_size) == (10, 5, 7)
+    assert b.cached_input_tokens == 4
+    assert b.wall_time.count == 2
+    assert b.wall_time.mean == pytest.approx(0.3)
+    assert b.wall_time.max == 0.4
+    assert b.queue_wait.max == 0.03
+
+
+def test_stats_are_snapshots() -> None:
+    service = _service()
+    service.record("a", 0.1, 0.0)
+
+    stats = service.get_stats()
+    service.record("a", 0.1, 0.0)
+
+    assert stats["a"].count == 1
+
+
+def test_reset() -> None:
+    service = _service()
+    service.record("a", 0.1, 0.0)
+
+    service.reset()
+
+    assert service.get_stats() == {}
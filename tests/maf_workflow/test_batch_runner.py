@@ -0,0 +1,203 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+
+import pytest
+
+from maf_workflow.batch_runner import (
+    aread_records,
+    read_pipe,
+    read_records,
+    run_batch,
+)
+from maf_workflow.models.batch_progress import BatchProgress
+from maf_workflow.models.batch_record import BatchRecord
+
+
+def test_read_records() -> None:
+    lines = [
+        json.dumps({"request_id": "r1", "title": "t", "body": "hello"}),
+        "",
+        json.dumps("what is 1 + 1?"),
+        json.dumps({"id": 7, "text": "hi", "body": "ignored"}),
+        "{not json",
+        json.dumps({"title": "no message"}),
+        json.dumps([1, 2]),
+    ]
+
+    records = list(read_records(lines))
+
+    assert [(r.offset, r.id, r.text) for r in records[:3]] == [
+        (0, "r1", "hello"),
+        (2, None, "what is 1 + 1?"),
+        (3, "7", "hi"),
+    ]
+    assert [r.offset for r in records[3:]] == [4, 5, 6]
+    assert all(r.error for r in records[3:])
+
+
+def test_read_records_skips_completed_with_fields() -> None:
+    lines = [json.dumps({"key": str(i), "msg": f"m{i}"}) for i in range(4)]
+
+    # as left by an unordered batch, which completed records 0 and 2
+    records = list(
+        read_records(lines, completed={2, 0}, text_field="msg", id_field="key")
+    )
+
+    assert [(r.offset, r.id, r.text) for r in records] == [
+        (1, "1", "m1"),
+        (3, "3", "m3"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_aread_records() -> None:
+    async def lines() -> AsyncIterator[str]:
+        for line in ['"a"', "", json.dumps({"key": "k", "msg": "b"}), "{", '"c"']:
+            yield line
+
+    records = [
+        r async for r in aread_records(lines(), {4}, text_field="msg", id_field="key")
+    ]
+
+    assert [(r.offset, r.id, r.text) for r in records] == [
+        (0, None, "a"),
+        (2, "k", "b"),
+        (3, None, None),
+    ]
+    assert [r.error is not None for r in records] == [False, False, True]
+
+
+def _records(count: int) -> list[BatchRecord]:
+    return [BatchRecord(offset=i, text=str(i)) for i in range(count)]
+
+
+async def _echo(text: str) -> str:
+    # later records complete first
+    await asyncio.sleep(0.01 / (int(text) + 1))
+    if text == "3":
+        raise RuntimeError("boom")
+    return f"echo {text}"
+
+
+@pytest.mark.asyncio
+async def test_run_batch_ordered() -> None:
+    progress: list[BatchProgress] = []
+    results = [
+        r
+        async for r in run_batch(
+            _records(6) + [BatchRecord(offset=6, error="ValueError: bad line")],
+            _echo,
+            concurrency=2,
+            on_progress=lambda p: progress.append(p.model_copy()),
+        )
+    ]
+
+    assert [r.offset for r in results] == list(range(7))
+    assert results[0].output == "echo 0"
+    assert results[3].error == "RuntimeError: boom"
+    assert results[6].error == "ValueError: bad line"
+    assert [p.processed for p in progress] == list(range(1, 8))
+    assert progress[-1].failed == 2
+    assert progress[-1].rate > 0
+
+
+@pytest.mark.asyncio
+async def test_run_batch_unordered_is_bounded() -> None:
+    in_flight = max_in_flight = 0
+    full = asyncio.Event()
+
+    async def process(text: str) -> str:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        if in_flight == 3:
+            full.set()
+        if int(text) < 2:  # the first records finish after the third one
+            await full.wait()
+            await asyncio.sleep(0.01)
+        in_flight -= 1
+        return text
+
+    results = [
+        r async for r in run_batch(_records(10), process, concurrency=3, ordered=False)
+    ]
+
+    assert sorted(r.offset for r in results) == list(range(10))
+    assert [r.offset for r in results] != list(range(10))
+    assert max_in_flight == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ordered", [True, False])
+async def test_run_batch_reads_records_off_the_loop(ordered: bool) -> None:
+    more = threading.Event()
+
+    def records() -> Iterator[BatchRecord]:
+        yield BatchRecord(offset=0, text="0")
+        more.wait(5)  # as stdin waits for the next line
+        yield BatchRecord(offset=1, text="1")
+
+    started = time.monotonic()
+    results = run_batch(records(), _echo, concurrency=2, ordered=ordered)
+
+    # the first result is yielded while the next record is awaited
+    first = await anext(results)
+    assert time.monotonic() - started < 1
+    more.set()
+    assert [first.offset] + [r.offset async for r in results] == [0, 1]
+
+    # stopped while the next record is awaited
+    more.clear()
+    results = run_batch(records(), _echo, concurrency=2, ordered=ordered)
+    await anext(results)
+    await results.aclose()
+    more.set()
+
+
+@pytest.mark.asyncio
+async def test_run_batch_stops_while_reading_a_pipe() -> None:
+    read, write = os.pipe()
+    os.write(write, b'"0"\n"1"\n')
+    try:
+        with open(read, "rb") as pipe:
+            results = run_batch(aread_records(read_pipe(pipe)), _echo, concurrency=2)
+            assert [(await anext(results)).output for _ in range(2)] == [
+                "echo 0",
+                "echo 1",
+            ]
+            # the pipe is still open, stopping does not wait for its next line
+            await asyncio.wait_for(results.aclose(), 1)
+    finally:
+        os.close(write)
+
+
+@pytest.mark.asyncio
+async def test_run_batch_stops_early() -> None:
+    started = asyncio.Event()
+    cancelled = 0
+
+    async def process(text: str) -> str:
+        nonlocal cancelled
+        if text == "0":
+            await started.wait()  # the next record is in flight
+            return "first"
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled += 1
+            raise
+        return text
+
+    results = run_batch(_records(10), process, concurrency=2)
+    first = await anext(results)
+    await results.aclose()
+    await asyncio.sleep(0)
+
+    assert first.output == "first"
+    assert cancelled == 1
+    assert BatchProgress().rate == 0.0
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+from typing import Any
+
+import pytest
+from agent_framework import ChatMessage, Context, ContextProvider, Role
+
+from maf_workflow.context_providers import (
+    CachedContextProvider,
+    ConcurrentContextProvider,
+    TimeoutContextProvider,
+    is_empty,
+)
+from maf_workflow.utils.ttl_lru_cache import TTLLRUCache
+
+
+class FakeProvider(ContextProvider):
+    def __init__(
+        self,
+        instructions: str | None = "Age: 60.",
+        delay: float = 0,
+        fail: bool = False,
+    ):
+        self.instructions = instructions
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.events: list[str] = []
+
+    async def invoking(self, messages, **kwargs: Any) -> Context:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("profile database unavailable")
+        return Context(instructions=self.instructions)
+
+    async def thread_created(self, thread_id: str | None = None) -> None:
+        self.events.append(f"thread_created {thread_id}")
+
+    async def invoked(
+        self,
+        request_messages,
+        response_messages=None,
+        invoke_exception=None,
+        **kwargs: Any,
+    ) -> None:
+        self.events.append("invoked")
+
+    async def __aenter__(self):
+        self.events.append("enter")
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        self.events.append("exit")
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+MESSAGES = [ChatMessage(Role.USER, text="list 5 favorite songs")]
+
+
+def test_is_empty() -> None:
+    assert is_empty(Context())
+    assert not is_empty(Context(instructions="Age: 60."))
+    assert not is_empty(Context(messages=MESSAGES))
+
+
+@pytest.mark.asyncio
+async def test_cached_context_is_reused_until_it_expires() -> None:
+    clock = FakeClock()
+    provider = FakeProvider()
+    cached = CachedContextProvider(
+        provider, ttl=60, cache=TTLLRUCache(max_entries=10, clock=clock)
+    )
+
+    first = await cached.invoking(MESSAGES)
+    assert await cached.invoking(MESSAGES) is first
+    assert provider.calls == 1
+
+    clock.now = 61
+    assert (await cached.invoking(MESSAGES)).instructions == "Age: 60."
+    assert provider.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_empty_context_is_cached_for_negative_ttl() -> None:
+    clock = FakeClock()
+    provider = FakeProvider(instructions=None)
+    cached = CachedContextProvider(
+        provider,
+        ttl=60,
+        negative_ttl=5,
+        cache=TTLLRUCache(max_entries=10, clock=clock),
+    )
+
+    await cached.invoking(MESSAGES)
+    await cached.invoking(MESSAGES)
+    assert provider.calls == 1
+
+    clock.now = 6
+    await cached.invoking(MESSAGES)
+    assert provider.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_key_and_shared_cache() -> None:
+    cache: TTLLRUCache = TTLLRUCache(max_entries=10)
+    john = FakeProvider("Age: 60.")
+    mary = FakeProvider("Age: 16.")
+    cached_john = CachedContextProvider(
+        john, ttl=60, key=lambda _: ("age", "john"), cache=cache
+    )
+    cached_mary = CachedContextProvider(
+        mary, ttl=60, key=lambda _: ("age", "mary"), cache=cache
+    )
+
+    assert (await cached_john.invoking(MESSAGES)).instructions == "Age: 60."
+    assert (await cached_mary.invoking(MESSAGES)).instructions == "Age: 16."
+    # a provider made for the next agent of the same user reuses the entry
+    again = FakeProvider("Age: 60.")
+    await CachedContextProvider(
+        again, ttl=60, key=lambda _: ("age", "john"), cache=cache
+    ).invoking(MESSAGES)
+    assert (john.calls, mary.calls, again.calls) == (1, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_call() -> None:
+    provider = FakeProvider(delay=0.01)
+    cached = CachedContextProvider(provider, ttl=60)
+
+    contexts = await asyncio.gather(*[cached.invoking(MESSAGES) for _ in range(5)])
+
+    assert provider.calls == 1
+    assert all(context is contexts[0] for context in contexts)
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached() -> None:
+    provider = FakeProvider(fail=True)
+    cached = CachedContextProvider(provider, ttl=60)
+
+    with pytest.raises(RuntimeError):
+        await cached.invoking(MESSAGES)
+    provider.fail = False
+    assert (await cached.invoking(MESSAGES)).instructions == "Age: 60."
+    assert provider.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_wrappers_pass_other_hooks_on() -> None:
+    provider = FakeProvider()
+    cached = CachedContextProvider(provider, ttl=60)
+
+    async with cached as entered:
+        assert entered is cached
+        await cached.thread_created("t1")
+        await cached.invoked(MESSAGES, MESSAGES)
+    await cached.__aexit__(None, None, None)
+
+    assert provider.events == ["enter", "thread_created t1", "invoked", "exit"]
+
+
+@pytest.mark.asyncio
+async def test_timeout_falls_back(caplog: pytest.LogCaptureFixture) -> None:
+    fallback = Context(instructions="Age: unknown.")
+    slow = TimeoutContextProvider(FakeProvider(delay=1), 0.01, fallback)
+
+    with caplog.at_level(logging.WARNING):
+        assert await slow.invoking(MESSAGES) is fallback
+
+    assert slow.timeouts == 1
+    assert "timed out" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_failure_falls_back() -> None:
+    failing = TimeoutContextProvider(FakeProvider(fail=True), 1)
+
+    assert is_empty(await failing.invoking(MESSAGES))
+    assert failing.failures == 1
+    assert (
+        await TimeoutContextProvider(FakeProvider(), 1).invoking(MESSAGES)
+    ).instructions == "Age: 60."
+
+
+@pytest.mark.asyncio
+async def test_concurrent_providers() -> None:
+    age = FakeProvider("Age: 60.", delay=0.05)
+    gender = FakeProvider("Gender: Male.", delay=0.05)
+    slow = FakeProvider("Mood: happy.", delay=1)
+    custom = TimeoutContextProvider(FakeProvider(fail=True), 1, Context(tools=[]))
+    aggregate = ConcurrentContextProvider([age, gender, slow, custom], timeout=0.2)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    context = await aggregate.invoking(MESSAGES)
+
+    # bounded by the timeout, not the sum of the delays
+    assert loop.time() - start < 0.5
+    assert context.instructions == "Age: 60.\nGender: Male."
+    assert aggregate.providers[3] is custom
+    assert all(isinstance(p, TimeoutContextProvider) for p in aggregate.providers)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_providers_without_context() -> None:
+    aggregate = ConcurrentContextProvider(FakeProvider(instructions=None))
+
+    context = await aggregate.invoking(MESSAGES)
+
+    assert len(aggregate.providers) == 1
+    assert context.instructions is None
+    assert is_empty(await ConcurrentContextProvider().invoking(MESSAGES))
@@ -0,0 +1,72 @@
+from agent_framework import (
+    AgentExecutorResponse,
+    AgentRunResponse,
+    ChatMessage,
+    Role,
+)
+from pytest_mock import MockerFixture
+
+from maf_workflow.executors import get_intent
+from maf_workflow.models.intent_answer_result import IntentAnswerResult
+from maf_workflow.models.intent_detection_result import IntentDetectionResult
+
+
+def _response(text: str) -> AgentExecutorResponse:
+    return AgentExecutorResponse(
+        "intent_detection_agent",
+        AgentRunResponse(messages=[ChatMessage(Role.ASSISTANT, text=text)]),
+    )
+
+
+def test_get_intent_parses_once(mocker: MockerFixture) -> None:
+    intent = IntentDetectionResult(
+        message_content="What is MAF?",
+        is_greeting=False,
+        is_inappropriate=False,
+        is_question=True,
+        is_statement=False,
+        response="",
+    )
+    response = _response(intent.model_dump_json())
+    spy = mocker.spy(IntentDetectionResult, "model_validate_json")
+
+    first = get_intent(response)
+    second = get_intent(response)
+
+    assert first == intent
+    assert first is second
+    assert response.agent_run_response.value is first
+    spy.assert_called_once()
+
+
+def test_get_intent_uses_parsed_value(mocker: MockerFixture) -> None:
+    intent = IntentDetectionResult(
+        message_content="Hi",
+        is_greeting=True,
+        is_inappropriate=False,
+        is_question=False,
+        is_statement=False,
+        response="Hello!",
+    )
+    response = _response(intent.model_dump_json())
+    response.agent_run_response.value = intent
+    spy = mocker.spy(IntentDetectionResult, "model_validate_json")
+
+    assert get_intent(response) is intent
+    spy.assert_not_called()
+
+
+def test_get_intent_keeps_single_shot_results() -> None:
+    intent = IntentAnswerResult(
+        message_content="What is MAF?",
+        is_greeting=False,
+        is_inappropriate=False,
+        is_question=True,
+        is_statement=False,
+        response="",
+        answer="A framework.",
+    )
+    response = _response(intent.model_dump_json())
+    response.agent_run_response.value = intent
+
+    assert get_intent(response) is intent
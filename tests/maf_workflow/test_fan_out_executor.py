@@ -0,0 +1,159 @@
+import time
+from collections.abc import Sequence
+from typing import Any
+
+import pytest
+from agent_framework import (
+    AgentExecutorRequest,
+    AgentExecutorResponse,
+    ChatAgent,
+    ChatMessage,
+    Role,
+    WorkflowBuilder,
+    WorkflowContext,
+    WorkflowOutputEvent,
+    executor,
+)
+from typing_extensions import Never
+
+from maf_workflow.events import FanOutResponseEvent
+from maf_workflow.fan_out_executor import FanOutExecutor, IncrementalAggregator
+from maf_workflow.services.mock_chat_client_service import (
+    MockChatClientService,
+    MockChatClientServiceEnv,
+)
+
+
+def _agent(name: str, latency_ms: float, error_rate: float = 0) -> ChatAgent:
+    client = MockChatClientService(
+        env=MockChatClientServiceEnv(
+            mock_chat_client_latency_ms=latency_ms,
+            mock_chat_client_latency_distribution="constant",
+            mock_chat_client_error_rate=error_rate,
+        )
+    ).get_client()
+    return ChatAgent(client, name=name)
+
+
+@executor(id="forward")
+async def forward(prompt: str, ctx: WorkflowContext[str]) -> None:
+    await ctx.send_message(prompt)
+
+
+@executor(id="aggregator")
+async def aggregator(
+    responses: list[AgentExecutorResponse], ctx: WorkflowContext[Never, list[str]]
+) -> None:
+    await ctx.yield_output([response.executor_id for response in responses])
+
+
+async def _run(fan_out: FanOutExecutor, prompt: str = "Japan") -> list[str]:
+    workflow = (
+        WorkflowBuilder()
+        .set_start_executor(fan_out)
+        .add_edge(fan_out, aggregator)
+        .build()
+    )
+    return (await workflow.run(prompt)).get_outputs()[0]
+
+
+@pytest.mark.asyncio
+async def test_first_success_does_not_wait_for_slow_agents() -> None:
+    fan_out = FanOutExecutor(
+        [_agent("slow", 5_000), _agent("failing", 0, 1), _agent("fast", 10)],
+        quorum=1,
+    )
+
+    start = time.perf_counter()
+    assert await _run(fan_out) == ["fast"]
+    assert time.perf_counter() - start < 1
+
+
+@pytest.mark.asyncio
+async def test_quorum_and_deadline() -> None:
+    agents = [_agent("a", 10), _agent("b", 30), _agent("c", 5_000)]
+
+    assert await _run(FanOutExecutor(agents, quorum=2)) == ["a", "b"]
+    assert await _run(FanOutExecutor(agents, timeout=0.5)) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_responses_keep_the_conversation() -> None:
+    fan_out = FanOutExecutor([_agent("a", 0)])
+    sent: list[list[AgentExecutorResponse]] = []
+
+    @executor(id="keep")
+    async def keep(
+        responses: list[AgentExecutorResponse], ctx: WorkflowContext
+    ) -> None:
+        sent.append(responses)
+
+    workflow = (
+        WorkflowBuilder().set_start_executor(fan_out).add_edge(fan_out, keep).build()
+    )
+    await workflow.run(
+        AgentExecutorRequest(messages=[ChatMessage(Role.USER, text="Japan")])
+    )
+
+    conversation = sent[0][0].full_conversation
+    assert conversation is not None
+    assert [m.role.value for m in conversation] == ["user", "assistant"]
+    assert conversation[0].text == "Japan"
+
+
+class Joiner(IncrementalAggregator):
+    async def add(
+        self,
+        response: AgentExecutorResponse,
+        received: Sequence[AgentExecutorResponse],
+        ctx: WorkflowContext[Any, Any],
+    ) -> None:
+        names = [r.executor_id for r in [*received, response]]
+        await ctx.yield_output("partial: " + ",".join(names))
+
+    async def complete(
+        self,
+        responses: Sequence[AgentExecutorResponse],
+        ctx: WorkflowContext[Any, Any],
+    ) -> None:
+        await ctx.yield_output(f"done: {len(responses)}")
+
+
+@pytest.mark.asyncio
+async def test_responses_are_aggregated_as_they_arrive() -> None:
+    fan_out = FanOutExecutor(
+        [_agent("poem", 300), _agent("fact", 10)], aggregator=Joiner()
+    )
+    workflow = (
+        WorkflowBuilder().set_start_executor(forward).add_edge(forward, fan_out).build()
+    )
+
+    events: list[tuple[str, Any, float]] = []
+    start = time.perf_counter()
+    async for event in workflow.run_stream("Japan"):
+        if isinstance(event, FanOutResponseEvent):
+            events.append(("response", event.data.executor_id, 0))
+        elif isinstance(event, WorkflowOutputEvent):
+            events.append(("output", event.data, time.perf_counter() - start))
+
+    assert [e[:2] for e in events] == [
+        ("response", "fact"),
+        ("output", "partial: fact"),
+        ("response", "poem"),
+        ("output", "partial: fact,poem"),
+        ("output", "done: 2"),
+    ]
+    # the first answer is out well before the slow one is done
+    assert events[1][2] < 0.2 < events[3][2]
+
+
+@pytest.mark.asyncio
+async def test_aggregator_complete_is_optional() -> None:
+    class Outputs(IncrementalAggregator):
+        async def add(self, response, received, ctx) -> None:
+            await ctx.yield_output(response.executor_id)
+
+    fan_out = FanOutExecutor([_agent("a", 0)], aggregator=Outputs())
+    workflow = WorkflowBuilder().set_start_executor(fan_out).build()
+
+    assert (await workflow.run("Japan")).get_outputs() == ["a"]
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+from pathlib import Path
+
+# only needed once a chat client is created, see `warmup`
+DEFERRED_MODULES = ("openai", "azure.identity", "agent_framework.azure")
+# time spent in the maf_workflow modules themselves, the framework excluded
+IMPORT_TIME_BUDGET_SECONDS = 0.25
+
+
+def _import_times(module: str) -> dict[str, int]:
+    # self time of every module imported, in microseconds
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parents[2],
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[0].strip().isdigit():
+            times[fields[2].strip()] = int(fields[0])
+    return times
+
+
+def test_import_workflow() -> None:
+    times = _import_times("maf_workflow.workflow")
+
+    assert "maf_workflow.workflow" in times
+    assert not [m for m in DEFERRED_MODULES if m in times]
+    own = sum(t for m, t in times.items() if m.startswith("maf_workflow"))
+    assert own / 1e6 < IMPORT_TIME_BUDGET_SECONDS
@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+from agent_framework import (
+    AgentExecutorRequest,
+    AgentExecutorResponse,
+    AgentRunEvent,
+    AgentRunResponse,
+    ChatMessage,
+    Role,
+    UsageDetails,
+    WorkflowBuilder,
+    WorkflowContext,
+    executor,
+)
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from pydantic import BaseModel
+from pytest_mock import MockerFixture
+from typing_extensions import Never
+
+from maf_workflow.instrumentation import instrument_executor, payload_size
+from maf_workflow.services.workflow_metrics_service import (
+    WorkflowMetricsService,
+    WorkflowMetricsServiceEnv,
+)
+from maf_workflow.utils.prompt_cache import CACHED_TOKENS_KEY
+from maf_workflow.workflow_template import WorkflowTemplate
+
+
+class Answer(BaseModel):
+    text: str
+
+
+@executor(id="agent")
+async def agent(text: str, ctx: WorkflowContext[str]) -> None:
+    response = AgentRunResponse(
+        messages=[ChatMessage(Role.ASSISTANT, text=text)],
+        usage_details=UsageDetails(
+            input_token_count=12, output_token_count=3, **{CACHED_TOKENS_KEY: 8}
+        ),
+    )
+    await ctx.add_event(AgentRunEvent("agent", response))
+    await ctx.send_message(text.upper())
+
+
+@executor(id="emit")
+async def emit(text: str, ctx: WorkflowContext[Never, str]) -> None:
+    await asyncio.sleep(0.01)
+    if text == "FAIL":
+        raise RuntimeError("failed")
+    await ctx.yield_output(text)
+
+
+def _metrics(enabled: bool = True) -> WorkflowMetricsService:
+    return WorkflowMetricsService(
+        env=WorkflowMetricsServiceEnv(workflow_metrics_enabled=enabled)
+    )
+
+
+def _template(metrics: WorkflowMetricsService) -> WorkflowTemplate:
+    workflow = WorkflowBuilder().set_start_executor(agent).add_edge(agent, emit).build()
+    return WorkflowTemplate(workflow, metrics=metrics)
+
+
+@pytest.mark.asyncio
+async def test_records_executions() -> None:
+    metrics = _metrics()
+    template = _template(metrics)
+
+    results = await asyncio.gather(*[template.run("hello") for _ in range(3)])
+
+    assert [r.get_outputs() for r in results] == [["HELLO"]] * 3
+    stats = metrics.get_stats()
+    assert stats["agent"].count == stats["emit"].count == 3
+    assert (stats["agent"].input_tokens, stats["agent"].output_tokens) == (36, 9)
+    assert stats["agent"].cached_input_tokens == 24
+    assert stats["emit"].input_tokens == 0
+    assert stats["agent"].payload_size == stats["emit"].payload_size == 15
+    assert stats["emit"].wall_time.p50 >= 0.01
+    assert stats["emit"].queue_wait.max > 0
+
+
+@pytest.mark.asyncio
+async def test_records_failures() -> None:
+    metrics = _metrics()
+
+    with pytest.raises(RuntimeError):
+        await _template(metrics).run("fail")
+
+    assert metrics.get_stats()["emit"].failures == 1
+
+
+@pytest.mark.asyncio
+async def test_disabled() -> None:
+    metrics = _metrics(enabled=False)
+    template = _template(metrics)
+
+    await template.run("hello")
+
+    assert template.executors["agent"] is agent
+    assert metrics.get_stats() == {}
+
+
+@pytest.mark.asyncio
+async def test_shared_executor_is_not_modified() -> None:
+    instrumented = instrument_executor(agent, _metrics())
+
+    assert instrumented is not agent
+    assert instrumented.id == agent.id
+    assert "execute" not in vars(agent)
+
+
+@pytest.mark.asyncio
+async def test_spans(mocker: MockerFixture) -> None:
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    mocker.patch("maf_workflow.instrumentation.tracer", provider.get_tracer("test"))
+
+    await _template(_metrics()).run("hello")
+
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    assert set(spans) == {"executor agent", "executor emit"}
+    attributes = spans["executor agent"].attributes or {}
+    assert attributes["gen_ai.usage.input_tokens"] == 12
+    assert attributes["gen_ai.usage.cached_input_tokens"] == 8
+    assert attributes["message.payload_size"] == 5
+
+
+def test_payload_size() -> None:
+    request = AgentExecutorRequest(
+        messages=[ChatMessage(Role.USER, text="hello")], should_respond=True
+    )
+    response = AgentExecutorResponse(
+        "agent",
+        AgentRunResponse(messages=[ChatMessage(Role.ASSISTANT, text="hi there")]),
+    )
+
+    assert payload_size("abc") == 3
+    assert payload_size(request) == 5
+    assert payload_size(response) == 8
+    assert payload_size(Answer(text="x")) == len('{"text":"x"}')
+    assert payload_size(42) == 0
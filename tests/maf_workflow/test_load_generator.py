@@ -0,0 +1,49 @@
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+from agent_framework import ExecutorCompletedEvent, ExecutorInvokedEvent, WorkflowEvent
+
+from maf_workflow.load_generator import generate_load
+from maf_workflow.models.latency_summary import LatencySummary
+
+
+async def _run_stream(message: str) -> AsyncIterator[WorkflowEvent]:
+    if message == "fail":
+        raise RuntimeError("boom")
+    await asyncio.sleep(0.01)
+    yield ExecutorInvokedEvent("start")
+    yield ExecutorCompletedEvent("start")
+    yield ExecutorInvokedEvent("next")
+    await asyncio.sleep(0.01)
+    yield ExecutorCompletedEvent("next")
+    yield ExecutorCompletedEvent("unknown")
+
+
+@pytest.mark.asyncio
+async def test_generate_load() -> None:
+    report = await generate_load(_run_stream, ["ok", "ok", "fail"], 300, 0.1)
+
+    assert report.requests == 30
+    assert report.errors == 10
+    assert report.latency.count == 20
+    assert report.latency.p50 >= 0.02
+    assert list(report.executors) == ["next", "start"]
+    # the start executor is timed from the start of the run
+    assert report.executors["start"].p50 >= 0.01
+    assert report.executors["next"].p50 >= 0.01
+    assert report.throughput > 0
+
+
+def test_latency_summary() -> None:
+    summary = LatencySummary.from_samples([i / 100 for i in range(100, 0, -1)])
+
+    assert summary.count == 100
+    assert (summary.p50, summary.p95, summary.p99, summary.max) == (
+        0.5,
+        0.95,
+        0.99,
+        1.0,
+    )
+    assert summary.mean == pytest.approx(0.505)
+    assert LatencySummary.from_samples([]) == LatencySummary()
@@ -0,0 +1,174 @@
+import asyncio
+from typing import Any
+
+import pytest
+from agent_framework import (
+    AIFunction,
+    FunctionInvocationContext,
+    FunctionMiddleware,
+    ai_function,
+)
+
+from maf_workflow.middleware import (
+    ToolConcurrencyMiddleware,
+    ToolResultCacheMiddleware,
+    tool_call_key,
+)
+from maf_workflow.utils.ttl_lru_cache import TTLLRUCache
+
+calls: list[str] = []
+
+
+async def check_availability(destination: str, passengers: int = 1) -> str:
+    calls.append(destination)
+    await asyncio.sleep(0.01)
+    if destination == "Atlantis":
+        raise ValueError("unknown destination")
+    return f"{destination}: available for {passengers}"
+
+
+def book_flight(destination: str) -> str:
+    calls.append(f"book {destination}")
+    return "booked"
+
+
+booking_tool = ai_function(check_availability, name="booking_tool")
+book = ai_function(book_flight, name="book")
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def clear_calls() -> None:
+    calls.clear()
+
+
+async def _call(
+    middleware: FunctionMiddleware, function: AIFunction, **arguments: Any
+) -> Any:
+    context = FunctionInvocationContext(
+        function=function, arguments=function.input_model(**arguments)
+    )
+
+    async def invoke(context: FunctionInvocationContext) -> None:
+        context.result = await context.function.invoke(arguments=context.arguments)
+
+    await middleware.process(context, invoke)
+    return context.result
+
+
+def test_key_ignores_argument_order() -> None:
+    first = FunctionInvocationContext(
+        function=booking_tool,
+        arguments=booking_tool.input_model(destination="Paris", passengers=2),
+    )
+    second = FunctionInvocationContext(
+        function=booking_tool,
+        arguments=booking_tool.input_model(passengers=2, destination="Paris"),
+    )
+
+    assert tool_call_key(first) == tool_call_key(second)
+    assert tool_call_key(first) == (
+        "booking_tool",
+        '{"destination":"Paris","passengers":2}',
+    )
+
+
+@pytest.mark.asyncio
+async def test_reuses_results_until_they_expire() -> None:
+    clock = FakeClock()
+    middleware = ToolResultCacheMiddleware(
+        ttls={"booking_tool": 60}, cache=TTLLRUCache(max_entries=10, clock=clock)
+    )
+
+    assert await _call(middleware, booking_tool, destination="Paris") == (
+        "Paris: available for 1"
+    )
+    await _call(middleware, booking_tool, destination="Paris")
+    await _call(middleware, booking_tool, destination="Paris", passengers=2)
+    assert calls == ["Paris", "Paris"]
+
+    clock.now = 61
+    await _call(middleware, booking_tool, destination="Paris")
+    assert calls == ["Paris", "Paris", "Paris"]
+    stats = middleware.get_stats()
+    assert (stats.hits, stats.entries) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_tools_without_ttl_are_not_cached() -> None:
+    middleware = ToolResultCacheMiddleware(ttls={"booking_tool": 60})
+
+    await _call(middleware, book, destination="Paris")
+    await _call(middleware, book, destination="Paris")
+
+    assert calls == ["book Paris", "book Paris"]
+    assert len(middleware.cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_default_ttl_and_size_bound() -> None:
+    middleware = ToolResultCacheMiddleware(default_ttl=60, max_bytes=40)
+
+    await _call(middleware, booking_tool, destination="Paris")
+    await _call(middleware, booking_tool, destination="Rome")
+    await _call(middleware, book, destination="Paris")
+
+    assert middleware.cache.get_stats().evictions == 1
+    assert middleware.get_stats().size_bytes <= 40
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_invocation() -> None:
+    middleware = ToolResultCacheMiddleware(default_ttl=60)
+
+    results = await asyncio.gather(
+        *[_call(middleware, booking_tool, destination="Paris") for _ in range(5)]
+    )
+
+    assert results == ["Paris: available for 1"] * 5
+    assert calls == ["Paris"]
+    assert middleware.coalesced == 4
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached() -> None:
+    middleware = ToolResultCacheMiddleware(default_ttl=60)
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await _call(middleware, booking_tool, destination="Atlantis")
+
+    assert calls == ["Atlantis", "Atlantis"]
+    assert len(middleware.cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped() -> None:
+    middleware = ToolConcurrencyMiddleware(max_concurrency=2)
+
+    results = await asyncio.gather(
+        *[_call(middleware, booking_tool, destination=f"City {i}") for i in range(5)]
+    )
+
+    assert len(results) == len(calls) == 5
+    assert middleware.max_running == 2
+    assert middleware.running == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_slot_is_released_on_failure() -> None:
+    middleware = ToolConcurrencyMiddleware(max_concurrency=1)
+
+    with pytest.raises(ValueError):
+        await _call(middleware, booking_tool, destination="Atlantis")
+
+    assert await _call(middleware, booking_tool, destination="Paris") == (
+        "Paris: available for 1"
+    )
@@ -0,0 +1,419 @@
+import asyncio
+import json
+import signal
+from collections.abc import AsyncIterator
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import ClientDisconnect
+from starlette.types import Message
+
+from maf_workflow.models.chat_client_pool_stats import ChatClientPoolStats
+from maf_workflow.models.executor_stats import ExecutorStats
+from maf_workflow.models.latency_summary import LatencySummary
+from maf_workflow.models.server_stats import ServerStats
+from maf_workflow.server import create_app, render_metrics
+
+
+class FakeWorkflow:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, str | None]] = []
+        self.release = asyncio.Event()
+        self.release.set()
+        self.started = asyncio.Event()
+
+    async def run(self, text: str, run_id: str | None = None) -> str | None:
+        self.calls.append((text, run_id))
+        self.started.set()
+        await self.release.wait()
+        if text == "fail":
+            raise RuntimeError("boom")
+        return None if text == "none" else text.upper()
+
+    async def stream(self, text: str, run_id: str | None = None) -> AsyncIterator[str]:
+        self.calls.append((text, run_id))
+        for word in text.split():
+            if word == "fail":
+                raise RuntimeError("boom")
+            yield word + "\n"
+
+
+def _app(workflow: FakeWorkflow, **kwargs) -> Starlette:
+    return create_app(workflow.run, workflow.stream, **kwargs)
+
+
+def _client(app: Starlette) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    )
+
+
+def _scope(path: str) -> dict[str, object]:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [],
+        "server": ("test", 80),
+    }
+
+
+def _events(body: str) -> list[tuple[str, object]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields.get("event", "message"), json.loads(fields["data"])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_run() -> None:
+    workflow = FakeWorkflow()
+    app = _app(workflow)
+
+    async with _client(app) as client:
+        ok = await client.post("/run", json={"text": "hello", "run_id": "r1"})
+        none = await client.post("/run", json={"text": "none"})
+        failed = await client.post("/run", json={"text": "fail"})
+        invalid = await client.post("/run", json={"message": "hello"})
+        bad_run_ids = [
+            await client.post("/run", json={"text": "hello", "run_id": run_id})
+            for run_id in ("..", "../r1", "r" * 129)
+        ]
+
+    assert ok.status_code == 200
+    assert ok.json() == {"output": "HELLO"}
+    assert none.json() == {"output": None}
+    assert failed.status_code == 500
+    assert failed.json() == {"error": "RuntimeError: boom"}
+    assert invalid.status_code == 422
+    assert [r.status_code for r in bad_run_ids] == [400, 400, 400]
+    assert bad_run_ids[0].json()["error"][0]["loc"] == ["run_id"]
+    assert workflow.calls == [("hello", "r1"), ("none", None), ("fail", None)]
+    stats = app.state.admission.stats
+    assert (stats.requests, stats.failures, stats.in_flight) == (3, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_stream() -> None:
+    workflow = FakeWorkflow()
+    app = _app(workflow)
+
+    async with _client(app) as client:
+        ok = await client.post("/stream", json={"text": "hello world"})
+        failed = await client.post("/stream", json={"text": "hello fail"})
+        invalid = await client.post("/stream", content="{")
+
+    assert ok.headers["content-type"].startswith("text/event-stream")
+    assert _events(ok.text) == [
+        ("message", "hello\n"),
+        ("message", "world\n"),
+        ("done", {}),
+    ]
+    assert _events(failed.text) == [
+        ("message", "hello\n"),
+        ("error", {"error": "RuntimeError: boom"}),
+    ]
+    assert invalid.status_code == 422
+    stats = app.state.admission.stats
+    assert (stats.requests, stats.failures, stats.in_flight) == (2, 1, 0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("error", "raised", "failures"),
+    # a client going away is not a failure of the server
+    [(OSError, ClientDisconnect, 0), (RuntimeError, RuntimeError, 1)],
+)
+async def test_stream_releases_admission_when_sending_fails(
+    error: type[Exception], raised: type[Exception], failures: int
+) -> None:
+    workflow = FakeWorkflow()
+    app = _app(workflow)
+    body = json.dumps({"text": "hello world"}).encode()
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.body":
+            raise error("connection reset")
+
+    with pytest.raises(raised):
+        await app(_scope("/stream"), receive, send)
+
+    stats = app.state.admission.stats
+    assert (stats.requests, stats.failures, stats.in_flight) == (1, failures, 0)
+
+
+@pytest.mark.asyncio
+async def test_batch() -> None:
+    workflow = FakeWorkflow()
+    app = _app(workflow, batch_concurrency=2)
+    lines = [
+        json.dumps({"key": "a", "msg": "one"}),
+        json.dumps({"key": "b", "msg": "fail"}),
+        "{not json",
+        json.dumps({"key": "c", "msg": "three"}),
+    ]
+
+    async with _client(app) as client:
+        response = await client.post(
+            "/batch",
+            content="\n".join(lines),
+            params={"text_field": "msg", "id_field": "key"},
+        )
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [(r["offset"], r["id"], r["output"]) for r in results] == [
+        (0, "a", "ONE"),
+        (1, "b", None),
+        (2, None, None),
+        (3, "c", "THREE"),
+    ]
+    assert results[1]["error"] == "RuntimeError: boom"
+    assert results[2]["error"]
+    # a batch is one request, its failed records are in its results
+    stats = app.state.admission.stats
+    assert (stats.requests, stats.failures, stats.in_flight) == (1, 0, 0)
+
+
+@pytest.mark.asyncio
+async def test_batch_limits() -> None:
+    workflow = FakeWorkflow()
+    workflow.release.clear()
+    app = _app(workflow, max_in_flight=3, batch_concurrency=2, batch_max_records=2)
+    received: list[Message] = []
+    sent: list[Message] = []
+
+    async def receive() -> Message:
+        received.append({"type": "http.disconnect"})
+        return received[-1]
+
+    async def send(message: Message) -> None:
+        sent.append(message)
+
+    async with _client(app) as client:
+        too_many = await client.post("/batch", content='"a"\n\n"b"\n"c"')
+        # a batch takes a slot per record it runs at once
+        batch = asyncio.create_task(client.post("/batch", content='"a"\n"b"'))
+        await workflow.started.wait()
+        in_flight = app.state.admission.stats.in_flight
+        run = asyncio.create_task(client.post("/run", json={"text": "c"}))
+        while app.state.admission.stats.in_flight < 3:
+            await asyncio.sleep(0)
+        # a busy worker turns a batch away before reading its body
+        await app(_scope("/batch"), receive, send)
+        workflow.release.set()
+        await asyncio.gather(batch, run)
+        with pytest.raises(ClientDisconnect):
+            await app(_scope("/batch"), receive, send)
+
+    assert too_many.status_code == 413
+    assert too_many.json() == {"error": "more than 2 records"}
+    assert in_flight == 2
+    assert sent[0]["status"] == 503
+    assert len(received) == 1
+    stats = app.state.admission.stats
+    assert (stats.requests, stats.rejected, stats.failures) == (4, 1, 0)
+    assert stats.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_requests_over_the_limit() -> None:
+    workflow = FakeWorkflow()
+    workflow.release.clear()
+    app = _app(workflow, max_in_flight=1)
+
+    async with _client(app) as client:
+        slow = asyncio.create_task(client.post("/run", json={"text": "slow"}))
+        await workflow.started.wait()
+        rejected = [
+            await client.post("/run", json={"text": "hello"}),
+            await client.post("/stream", json={"text": "hello"}),
+            await client.post("/batch", content=json.dumps("hello")),
+        ]
+        metrics = await client.get("/metrics")
+        workflow.release.set()
+        assert (await slow).json() == {"output": "SLOW"}
+        accepted = await client.post("/run", json={"text": "hello"})
+
+    assert [r.status_code for r in rejected] == [503, 503, 503]
+    assert rejected[0].json() == {"error": "busy"}
+    assert rejected[0].headers["retry-after"] == "1"
+    assert "workflow_server_in_flight 1\n" in metrics.text
+    assert "workflow_server_rejected_total 3\n" in metrics.text
+    assert accepted.status_code == 200
+    assert workflow.calls == [("slow", None), ("hello", None)]
+
+
+@pytest.mark.asyncio
+async def test_drains_on_shutdown() -> None:
+    workflow = FakeWorkflow()
+    workflow.release.clear()
+    started: list[bool] = []
+
+    async def startup() -> None:
+        started.append(True)
+
+    app = _app(workflow, startup=startup)
+    lifespan = app.router.lifespan_context(app)
+
+    async with _client(app) as client:
+        await lifespan.__aenter__()
+        assert started == [True]
+        assert (await client.get("/health")).json() == {"status": "ok"}
+        slow = asyncio.create_task(client.post("/run", json={"text": "slow"}))
+        await workflow.started.wait()
+
+        shutdown = asyncio.create_task(lifespan.__aexit__(None, None, None))
+        await asyncio.sleep(0.01)
+        # the request in flight completes, new ones are turned away
+        assert not shutdown.done()
+        health = await client.get("/health")
+        rejected = await client.post("/run", json={"text": "hello"})
+        workflow.release.set()
+        await shutdown
+
+    assert (await slow).json() == {"output": "SLOW"}
+    assert health.status_code == 503
+    assert rejected.json() == {"error": "draining"}
+    assert rejected.headers["connection"] == "close"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("signals", [1, 2])
+async def test_drains_on_signal(signals: int) -> None:
+    workflow = FakeWorkflow()
+    workflow.release.clear()
+    handled: list[int] = []
+
+    def server_handler(sig: int, frame: object) -> None:
+        handled.append(sig)
+
+    original = signal.signal(signal.SIGTERM, server_handler)
+    try:
+        app = _app(workflow, drain_signals=(signal.SIGTERM,))
+        async with _client(app) as client:
+            async with app.router.lifespan_context(app):
+                slow = asyncio.create_task(client.post("/run", json={"text": "s"}))
+                await workflow.started.wait()
+                for _ in range(signals):
+                    signal.raise_signal(signal.SIGTERM)
+                    await asyncio.sleep(0.01)
+                # the server sees the signal once drained, or at once if repeated
+                health = await client.get("/health")
+                before = handled.copy()
+                workflow.release.set()
+                await slow
+                await asyncio.sleep(0.01)
+            restored = signal.getsignal(signal.SIGTERM)
+    finally:
+        signal.signal(signal.SIGTERM, original)
+
+    assert health.status_code == 503
+    assert before == ([] if signals == 1 else [signal.SIGTERM])
+    assert handled == [signal.SIGTERM]
+    assert restored is server_handler
+
+
+@pytest.mark.asyncio
+async def test_drain_timeout(caplog: pytest.LogCaptureFixture) -> None:
+    workflow = FakeWorkflow()
+    workflow.release.clear()
+    app = _app(workflow, drain_timeout=0.01)
+
+    async with _client(app) as client:
+        async with app.router.lifespan_context(app):
+            slow = asyncio.create_task(client.post("/run", json={"text": "slow"}))
+            await workflow.started.wait()
+        workflow.release.set()
+        await slow
+
+    assert "1 requests still in flight" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint() -> None:
+    workflow = FakeWorkflow()
+    app = create_app(
+        workflow.run,
+        workflow.stream,
+        executor_stats=lambda: {"start": ExecutorStats(count=2)},
+        pool_stats=lambda: ChatClientPoolStats(
+            max_connections=10,
+            max_keepalive_connections=5,
+            keepalive_expiry=30.0,
+            http2=True,
+        ),
+    )
+
+    async with _client(app) as client:
+        response = await client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'workflow_executor_executions_total{executor="start"} 2\n' in response.text
+    assert "chat_client_pool_max_connections 10\n" in response.text
+
+
+def test_render_metrics() -> None:
+    executors = {
+        "customer_agent": ExecutorStats(
+            count=4,
+            failures=1,
+            wall_time=LatencySummary(count=4, mean=0.5, p50=0.4, p95=0.9, p99=1.0),
+            input_tokens=100,
+        ),
+        'odd "id"': ExecutorStats(),
+    }
+    pool = ChatClientPoolStats(
+        max_connections=10,
+        max_keepalive_connections=5,
+        keepalive_expiry=30.0,
+        http2=True,
+        requests=7,
+        in_flight=2,
+    )
+
+    text = render_metrics(
+        ServerStats(max_in_flight=8, in_flight=3, rejected=2), executors, pool
+    )
+    lines = text.splitlines()
+
+    assert text.endswith("\n")
+    assert "workflow_server_in_flight 3" in lines
+    assert "workflow_server_draining 0" in lines
+    assert "# TYPE workflow_server_rejected_total counter" in lines
+    assert "workflow_server_rejected_total 2" in lines
+    assert 'workflow_executor_executions_total{executor="customer_agent"} 4' in lines
+    assert 'workflow_executor_failures_total{executor="customer_agent"} 1' in lines
+    assert "# TYPE workflow_executor_wall_time_seconds summary" in lines
+    assert (
+        'workflow_executor_wall_time_seconds{executor="customer_agent",quantile="0.95"}'
+        " 0.9"
+    ) in lines
+    assert 'workflow_executor_wall_time_seconds_sum{executor="customer_agent"} 2.0' in (
+        lines
+    )
+    assert 'workflow_executor_wall_time_seconds_count{executor="customer_agent"} 4' in (
+        lines
+    )
+    assert 'workflow_executor_input_tokens_total{executor="customer_agent"} 100' in (
+        lines
+    )
+    assert 'workflow_executor_executions_total{executor="odd \\"id\\""} 0' in lines
+    assert "chat_client_pool_requests_total 7" in lines
+    assert "chat_client_pool_in_flight 2" in lines
+    assert "chat_client_pool_http2 1" in lines
+    assert "chat_client_pool_keepalive_expiry 30.0" in lines
+    assert not any(
+        line.startswith("chat_client_pool")
+        for line in render_metrics(ServerStats(max_in_flight=1), {}).splitlines()
+    )
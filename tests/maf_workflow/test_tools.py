@@ -0,0 +1,103 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from agent_framework import (
+    AIFunction,
+    FunctionCallContent,
+    FunctionResultContent,
+    ai_function,
+)
+from agent_framework._tools import execute_function_calls
+
+from maf_workflow.tools import run_in_thread, run_sync_tools_in_threads
+
+user_id: contextvars.ContextVar[str] = contextvars.ContextVar("user_id")
+
+
+def get_place(city: str) -> str:
+    time.sleep(0.1)
+    return f"{city} from {threading.current_thread().name} for {user_id.get('-')}"
+
+
+async def find_guide(city: str) -> str:
+    return f"guide of {city}"
+
+
+favorite_place = ai_function(get_place, name="favorite_place")
+tourist_guide = ai_function(find_guide, name="tourist_guide")
+
+
+@pytest.mark.asyncio
+async def test_sync_tool_runs_on_a_thread() -> None:
+    threaded = run_in_thread(favorite_place)
+    user_id.set("123")
+
+    result = await threaded.invoke(arguments=favorite_place.input_model(city="Paris"))
+
+    assert result.startswith("Paris from ")
+    assert threading.current_thread().name not in result
+    assert result.endswith("for 123")
+    assert (threaded.name, threaded.input_model) == (
+        "favorite_place",
+        favorite_place.input_model,
+    )
+
+
+@pytest.mark.asyncio
+async def test_sync_tool_runs_on_the_given_executor() -> None:
+    with ThreadPoolExecutor(thread_name_prefix="tools") as executor:
+        threaded = run_in_thread(favorite_place, executor)
+        result = await threaded.invoke(
+            arguments=favorite_place.input_model(city="Paris")
+        )
+
+    assert "from tools" in result
+
+
+@pytest.mark.asyncio
+async def test_sync_tools_do_not_block_the_loop() -> None:
+    tools = run_sync_tools_in_threads([favorite_place, tourist_guide])
+    calls = [
+        FunctionCallContent(
+            call_id=str(i), name="favorite_place", arguments={"city": "Paris"}
+        )
+        for i in range(3)
+    ]
+    ticks = 0
+
+    async def tick() -> None:
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker = asyncio.create_task(tick())
+    start = time.perf_counter()
+    results = await execute_function_calls({}, 0, calls, tools)
+    elapsed = time.perf_counter() - start
+    ticker.cancel()
+
+    assert all(
+        isinstance(result, FunctionResultContent) and result.exception is None
+        for result in results
+    )
+    # the three calls overlap and the loop keeps running meanwhile
+    assert elapsed < 0.25
+    assert ticks > 3
+
+
+def test_run_sync_tools_in_threads() -> None:
+    schema = {"type": "function", "function": {"name": "hosted"}}
+
+    tools = run_sync_tools_in_threads(
+        [favorite_place, tourist_guide, get_place, schema]
+    )
+
+    assert isinstance(tools[0], AIFunction) and tools[0] is not favorite_place
+    assert tools[1] is tourist_guide
+    assert isinstance(tools[2], AIFunction) and tools[2].name == "get_place"
+    assert tools[3] is schema
@@ -0,0 +1,223 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from agent_framework import (
+    WorkflowBuilder,
+    WorkflowContext,
+    WorkflowOutputEvent,
+    executor,
+)
+from pytest_mock import MockerFixture
+from typing_extensions import Never
+
+from maf_workflow.protocols.i_workflow_checkpoint_service import (
+    IWorkflowCheckpointService,
+)
+from maf_workflow.services.file_workflow_checkpoint_service import (
+    FileWorkflowCheckpointService,
+    FileWorkflowCheckpointServiceEnv,
+)
+from maf_workflow.services.sqlite_workflow_checkpoint_service import (
+    SQLiteWorkflowCheckpointService,
+    SQLiteWorkflowCheckpointServiceEnv,
+)
+from maf_workflow.workflow_template import WorkflowTemplate
+
+
+@executor(id="collector")
+async def collector(text: str, ctx: WorkflowContext[str]) -> None:
+    # keeps its per-run state in the shared state of the run
+    await ctx.set_shared_state("seen", text)
+    await asyncio.sleep(0.01)
+    await ctx.send_message(await ctx.get_shared_state("seen"))
+
+
+@executor(id="emit")
+async def emit(text: str, ctx: WorkflowContext[Never, str]) -> None:
+    await ctx.yield_output(text)
+
+
+def _template() -> WorkflowTemplate:
+    workflow = (
+        WorkflowBuilder()
+        .set_start_executor(collector)
+        .add_edge(collector, emit)
+        .build()
+    )
+    return WorkflowTemplate(workflow)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_runs_are_isolated() -> None:
+    template = _template()
+
+    results = await asyncio.gather(*[template.run(f"m{i}") for i in range(10)])
+
+    assert [r.get_outputs() for r in results] == [[f"m{i}"] for i in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_run_stream() -> None:
+    template = _template()
+
+    outputs = [
+        event.data
+        async for event in template.run_stream("hello")
+        if isinstance(event, WorkflowOutputEvent)
+    ]
+
+    assert outputs == ["hello"]
+
+
+def test_new_workflow_shares_the_graph() -> None:
+    template = _template()
+
+    first = template.new_workflow()
+    second = template.new_workflow()
+
+    assert first is not second
+    assert first.executors["emit"] is second.executors["emit"] is emit
+    assert first.executors["collector"] is second.executors["collector"]
+
+
+def test_template_is_immutable() -> None:
+    template = _template()
+
+    with pytest.raises(TypeError):
+        template.executors["emit"] = emit  # type: ignore[index]
+
+
+class Steps:
+    # the executors of a run that fails once, after the expensive step
+    def __init__(self) -> None:
+        self.expensive_calls = 0
+        self.fail = True
+
+        @executor(id="expensive")
+        async def expensive(text: str, ctx: WorkflowContext[str]) -> None:
+            self.expensive_calls += 1
+            await ctx.send_message(text.upper())
+
+        @executor(id="flaky")
+        async def flaky(text: str, ctx: WorkflowContext[str]) -> None:
+            if self.fail:
+                raise RuntimeError("process died")
+            await ctx.send_message(text)
+
+        self.expensive = expensive
+        self.flaky = flaky
+
+    def template(self, checkpoints: IWorkflowCheckpointService) -> WorkflowTemplate:
+        workflow = (
+            WorkflowBuilder()
+            .set_start_executor(self.expensive)
+            .add_edge(self.expensive, self.flaky)
+            .add_edge(self.flaky, emit)
+            .build()
+        )
+        return WorkflowTemplate(workflow, checkpoints=checkpoints)
+
+
+def _checkpoints(
+    backend: str, tmp_path: Path, enabled: bool = True
+) -> IWorkflowCheckpointService:
+    if backend == "file":
+        return FileWorkflowCheckpointService(
+            env=FileWorkflowCheckpointServiceEnv(
+                workflow_checkpoint_enabled=enabled,
+                workflow_checkpoint_path=str(tmp_path),
+            )
+        )
+    return SQLiteWorkflowCheckpointService(
+        env=SQLiteWorkflowCheckpointServiceEnv(
+            workflow_checkpoint_enabled=enabled,
+            workflow_checkpoint_sqlite_path=str(tmp_path / "checkpoints.db"),
+        )
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["file", "sqlite"])
+async def test_resume_skips_completed_executors(backend: str, tmp_path: Path) -> None:
+    checkpoints = _checkpoints(backend, tmp_path)
+    steps = Steps()
+    template = steps.template(checkpoints)
+
+    with pytest.raises(RuntimeError):
+        await template.run("hello", run_id="r1")
+    assert await checkpoints.get_latest_checkpoint_id("r1") is not None
+
+    # the next attempt, as after a restart, with the graph built again
+    steps.fail = False
+    result = await steps.template(checkpoints).run("hello", run_id="r1")
+
+    assert result.get_outputs() == ["HELLO"]
+    assert steps.expensive_calls == 1
+    # a completed run leaves no checkpoints and starts over
+    assert await checkpoints.list_checkpoints("r1") == []
+    await template.run("hello", run_id="r1")
+    assert steps.expensive_calls == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["file", "sqlite"])
+async def test_completed_run_not_deleted_starts_over(
+    backend: str, tmp_path: Path, mocker: MockerFixture
+) -> None:
+    checkpoints = _checkpoints(backend, tmp_path)
+    steps = Steps()
+    steps.fail = False
+    mocker.patch.object(
+        checkpoints, "delete_run", side_effect=RuntimeError("process died")
+    )
+
+    # the process dies after the last checkpoint, before the run is deleted
+    with pytest.raises(RuntimeError):
+        await steps.template(checkpoints).run("hello", run_id="r1")
+    assert await checkpoints.get_latest_checkpoint_id("r1") is not None
+    mocker.stopall()
+
+    outputs = [
+        event.data
+        async for event in steps.template(checkpoints).run_stream("hello", run_id="r1")
+        if isinstance(event, WorkflowOutputEvent)
+    ]
+
+    assert outputs == ["HELLO"]
+    assert steps.expensive_calls == 2
+    assert await checkpoints.list_checkpoints("r1") == []
+
+
+@pytest.mark.asyncio
+async def test_resume_run_stream(tmp_path: Path) -> None:
+    checkpoints = _checkpoints("file", tmp_path)
+    steps = Steps()
+    template = steps.template(checkpoints)
+
+    with pytest.raises(RuntimeError):
+        async for _ in template.run_stream("hello", run_id="r1"):
+            pass
+    steps.fail = False
+    outputs = [
+        event.data
+        async for event in template.run_stream("hello", run_id="r1")
+        if isinstance(event, WorkflowOutputEvent)
+    ]
+
+    assert outputs == ["HELLO"]
+    assert steps.expensive_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_runs_without_run_id_are_not_checkpointed(tmp_path: Path) -> None:
+    checkpoints = _checkpoints("sqlite", tmp_path)
+    steps = Steps()
+    steps.fail = False
+
+    await steps.template(checkpoints).run("hello")
+    disabled = _checkpoints("file", tmp_path, enabled=False)
+    await steps.template(disabled).run("hello", run_id="r1")
+
+    assert await checkpoints.list_checkpoints() == []
+    assert list(tmp_path.glob("*/*.json")) == []
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from maf_workflow.utils.fan_out import gather_first
+
+
+class Calls:
+    def __init__(self) -> None:
+        self.cancelled: list[str] = []
+
+    def call(self, name: str, delay: float, fail: bool = False):
+        async def run() -> str:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self.cancelled.append(name)
+                raise
+            if fail:
+                raise RuntimeError(name)
+            return name
+
+        return run
+
+
+@pytest.mark.asyncio
+async def test_waits_for_all_by_default() -> None:
+    calls = Calls()
+
+    results = await gather_first(
+        [calls.call("slow", 0.03), calls.call("fast", 0.01), calls.call("same", 0.01)]
+    )
+
+    assert results == [(1, "fast"), (2, "same"), (0, "slow")]
+
+
+@pytest.mark.asyncio
+async def test_quorum_cancels_the_rest() -> None:
+    calls = Calls()
+
+    results = await gather_first(
+        [calls.call("a", 0.01), calls.call("b", 0.02), calls.call("c", 5)], count=2
+    )
+
+    assert results == [(0, "a"), (1, "b")]
+    assert calls.cancelled == ["c"]
+
+
+@pytest.mark.asyncio
+async def test_first_success_skips_failures() -> None:
+    calls = Calls()
+
+    results = await gather_first(
+        [calls.call("fails", 0, fail=True), calls.call("ok", 0.01), calls.call("x", 5)],
+        count=1,
+    )
+
+    assert results == [(1, "ok")]
+    assert calls.cancelled == ["x"]
+
+
+@pytest.mark.asyncio
+async def test_results_within_the_deadline() -> None:
+    calls = Calls()
+
+    results = await gather_first(
+        [calls.call("fast", 0.01), calls.call("slow", 5)], timeout=0.1
+    )
+
+    assert results == [(0, "fast")]
+    assert calls.cancelled == ["slow"]
+    assert await gather_first([calls.call("late", 5)], timeout=0) == []
+
+
+@pytest.mark.asyncio
+async def test_raises_when_every_call_failed() -> None:
+    calls = Calls()
+
+    with pytest.raises(RuntimeError, match="first"):
+        await gather_first(
+            [calls.call("first", 0, fail=True), calls.call("second", 0.01, fail=True)]
+        )
+    assert await gather_first([]) == []
+
+
+@pytest.mark.asyncio
+async def test_results_are_passed_on_as_they_arrive() -> None:
+    calls = Calls()
+    seen: list[tuple[int, str]] = []
+
+    async def on_result(i: int, result: str) -> None:
+        # the slower call is still running when the first result is handed over
+        assert not calls.cancelled
+        seen.append((i, result))
+
+    results = await gather_first(
+        [calls.call("slow", 0.03), calls.call("fast", 0.01)], on_result=on_result
+    )
+
+    assert seen == results == [(1, "fast"), (0, "slow")]
@@ -0,0 +1,78 @@
+import pytest
+
+from maf_workflow.utils.histogram import Histogram, WindowedHistogram
+
+
+def test_empty() -> None:
+    histogram = Histogram()
+
+    summary = histogram.summary()
+
+    assert summary.count == 0
+    assert summary.mean == summary.p99 == summary.max == 0.0
+
+
+def test_percentiles_within_a_bucket() -> None:
+    histogram = Histogram()
+    for i in range(1, 1001):
+        histogram.record(i / 1000)
+
+    summary = histogram.summary()
+
+    assert summary.count == 1000
+    assert summary.mean == pytest.approx(0.5005)
+    assert summary.p50 == pytest.approx(0.5, rel=0.05)
+    assert summary.p95 == pytest.approx(0.95, rel=0.05)
+    assert summary.p99 == pytest.approx(0.99, rel=0.05)
+    assert summary.max == 1.0
+
+
+def test_percentiles_capped_at_max() -> None:
+    histogram = Histogram()
+    histogram.record(0.123)
+
+    assert histogram.percentile(0.5) == 0.123
+
+
+def test_values_out_of_range() -> None:
+    histogram = Histogram(min_value=1.0, growth=2.0, buckets=4)
+    histogram.record(0.0)
+    histogram.record(1000.0)
+
+    assert histogram.percentile(0.5) == 1.0
+    assert histogram.percentile(1.0) == 1000.0
+
+
+def test_merge() -> None:
+    first, second = Histogram(), Histogram()
+    first.record(0.1)
+    second.record(0.3)
+    second.record(0.5)
+
+    merged = first.merge(second)
+
+    assert (merged.count, merged.max) == (3, 0.5)
+    assert merged.sum == pytest.approx(0.9)
+    assert merged.percentile(0.5) == pytest.approx(0.3, rel=0.05)
+    assert first.count == 1
+
+
+def test_windowed_histogram_follows_recent_values() -> None:
+    now = 0.0
+    histogram = WindowedHistogram(window=10.0, clock=lambda: now)
+    for _ in range(10):
+        histogram.record(1.0)
+
+    now = 15.0  # the first window is now the previous one
+    for _ in range(10):
+        histogram.record(0.1)
+    assert histogram.count == 20
+    assert histogram.percentile(0.95) == 1.0
+
+    now = 25.0  # the values of the first window are dropped
+    assert histogram.count == 10
+    assert histogram.percentile(0.95) == pytest.approx(0.1, rel=0.05)
+
+    now = 50.0  # nothing recorded for two windows
+    assert histogram.count == 0
+    assert histogram.percentile(0.95) == 0.0
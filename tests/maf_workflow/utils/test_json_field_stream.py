@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from maf_workflow.utils.json_field_stream import JsonStringFieldStream
+
+DOCUMENT = json.dumps(
+    {
+        "user_question": 'What is "response"?',
+        "meta": {"response": "nested"},
+        "items": ["response", {"response": "in a list"}],
+        "response": 'Say "hi"\n\\\t/ 😀 é',
+        "other": "after",
+    }
+)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 8, len(DOCUMENT)])
+def test_extracts_field_across_chunks(size: int) -> None:
+    stream = JsonStringFieldStream("response")
+
+    deltas = [
+        stream.feed(DOCUMENT[i : i + size]) for i in range(0, len(DOCUMENT), size)
+    ]
+
+    assert "".join(deltas) == 'Say "hi"\n\\\t/ 😀 é'
+    assert stream.value == "".join(deltas)
+    assert stream.done
+
+
+def test_streams_before_the_document_is_complete() -> None:
+    stream = JsonStringFieldStream("response")
+
+    assert stream.feed('{"user_question": "q", "response": "Hel') == "Hel"
+    assert stream.feed("lo\\") == "lo"
+    assert stream.feed("u00e9") == "é"
+    assert not stream.done
+    assert stream.feed('"}') == ""
+    assert stream.done
+
+
+def test_missing_field() -> None:
+    stream = JsonStringFieldStream("response")
+
+    assert stream.feed('{"user_question": "q"}') == ""
+    assert not stream.done
@@ -0,0 +1,66 @@
+from agent_framework import UsageDetails, ai_function
+from agent_framework.azure import AzureOpenAIChatClient
+
+from maf_workflow.models.intent_detection_result import IntentDetectionResult
+from maf_workflow.models.question_response import QuestionResponse
+from maf_workflow.utils.prompt_cache import (
+    CACHED_TOKENS_KEY,
+    cached_tokens,
+    create_cached_prompt_agent,
+    prompt_cache_key,
+)
+
+
+@ai_function
+def lookup(query: str) -> str:
+    """Looks up the query."""
+    return query
+
+
+@ai_function
+def add(a: int, b: int) -> int:
+    """Adds two numbers."""
+    return a + b
+
+
+def _client() -> AzureOpenAIChatClient:
+    return AzureOpenAIChatClient(
+        endpoint="https://test-endpoint.openai.azure.com/",
+        deployment_name="test-deployment",
+        api_key="test-api-key",
+    )
+
+
+def test_prompt_cache_key() -> None:
+    key = prompt_cache_key("Be brief.", QuestionResponse)
+
+    assert key == prompt_cache_key("Be brief.", QuestionResponse)
+    assert len(key) == 32
+    assert key != prompt_cache_key("Be brief!", QuestionResponse)
+    assert key != prompt_cache_key("Be brief.", IntentDetectionResult)
+    assert key != prompt_cache_key("Be brief.", QuestionResponse, [lookup])
+
+
+def test_create_cached_prompt_agent() -> None:
+    agent = create_cached_prompt_agent(
+        _client(), "Be brief.", QuestionResponse, [lookup, add]
+    )
+    reordered = create_cached_prompt_agent(
+        _client(), "Be brief.", QuestionResponse, [add, lookup]
+    )
+
+    options = agent.chat_options
+    assert options.instructions == "Be brief."
+    assert options.response_format is QuestionResponse
+    assert options.tools == [add, lookup]
+    assert options.additional_properties == {
+        "prompt_cache_key": prompt_cache_key(
+            "Be brief.", QuestionResponse, [add, lookup]
+        )
+    }
+    assert reordered.chat_options.additional_properties == options.additional_properties
+
+
+def test_cached_tokens() -> None:
+    assert cached_tokens(UsageDetails(input_token_count=10)) == 0
+    assert cached_tokens(UsageDetails(**{CACHED_TOKENS_KEY: 7})) == 7
@@ -0,0 +1,195 @@
+import asyncio
+
+import pytest
+
+from maf_workflow.utils.rate_limit_scheduler import (
+    DEFAULT_RETRY_AFTER,
+    Priority,
+    RateLimitScheduler,
+    priority,
+    request_priority,
+    retry_after,
+)
+
+
+async def _started(order: list[str], scheduler: RateLimitScheduler, name: str, **kw):
+    await scheduler.acquire("d", kw.get("tokens", 1), kw.get("priority"))
+    order.append(name)
+
+
+def test_priority_context() -> None:
+    assert request_priority.get() is Priority.NORMAL
+    with priority(Priority.HIGH):
+        assert request_priority.get() is Priority.HIGH
+    assert request_priority.get() is Priority.NORMAL
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({"retry-after-ms": "250"}, 0.25),
+        ({"retry-after": "2"}, 2.0),
+        ({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}, DEFAULT_RETRY_AFTER),
+        ({}, DEFAULT_RETRY_AFTER),
+    ],
+)
+def test_retry_after(headers: dict[str, str], expected: float) -> None:
+    assert retry_after(headers) == expected
+
+
+@pytest.mark.asyncio
+async def test_concurrency_and_priority() -> None:
+    scheduler = RateLimitScheduler(max_concurrency=1)
+    order: list[str] = []
+    await scheduler.acquire("d", 1)
+
+    tasks = [
+        asyncio.create_task(_started(order, scheduler, "low", priority=Priority.LOW)),
+        asyncio.create_task(_started(order, scheduler, "normal")),
+        asyncio.create_task(_started(order, scheduler, "high", priority=Priority.HIGH)),
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.queued == 3
+
+    for _ in tasks:
+        scheduler.release("d")
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+
+    assert order == ["high", "normal", "low"]
+
+
+@pytest.mark.asyncio
+async def test_priority_from_context() -> None:
+    scheduler = RateLimitScheduler(max_concurrency=1)
+    order: list[str] = []
+    await scheduler.acquire("d", 1)
+
+    low = asyncio.create_task(_started(order, scheduler, "low", priority=Priority.LOW))
+    with priority(Priority.HIGH):
+        high = asyncio.create_task(_started(order, scheduler, "high"))
+    await asyncio.sleep(0)
+    scheduler.release("d")
+    await high
+    scheduler.release("d")
+    await low
+
+    assert order == ["high", "low"]
+
+
+@pytest.mark.asyncio
+async def test_requests_per_minute() -> None:
+    now = [0.0]
+    scheduler = RateLimitScheduler(requests_per_minute=600, clock=lambda: now[0])
+    for _ in range(600):
+        await scheduler.acquire("d", 1)
+        scheduler.release("d")
+
+    waiting = asyncio.create_task(scheduler.acquire("d", 1))
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+
+    now[0] += 0.1  # one request per 0.1s
+    await asyncio.wait_for(waiting, timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_tokens_per_minute() -> None:
+    scheduler = RateLimitScheduler(tokens_per_minute=6000)  # 100 per 0.1s
+    loop = asyncio.get_running_loop()
+    await scheduler.acquire("d", 6000)
+    scheduler.release("d")
+
+    started = loop.time()
+    await scheduler.acquire("d", 100)
+
+    assert loop.time() - started >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_deployments_are_independent() -> None:
+    scheduler = RateLimitScheduler(max_concurrency=1)
+    await scheduler.acquire("a", 1)
+
+    await asyncio.wait_for(scheduler.acquire("b", 1), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_adapts_to_throttling() -> None:
+    scheduler = RateLimitScheduler(max_concurrency=8)
+    loop = asyncio.get_running_loop()
+    await scheduler.acquire("d", 1)
+
+    scheduler.release("d", 429, {"retry-after-ms": "100"})
+
+    assert scheduler.throttled == 1
+    assert scheduler.concurrency_limit("d") == 4
+    started = loop.time()
+    await scheduler.acquire("d", 1)
+    assert loop.time() - started >= 0.09
+
+    # grows back by one per round of successes
+    for _ in range(40):
+        scheduler.release("d", 200)
+        await scheduler.acquire("d", 1)
+    assert scheduler.concurrency_limit("d") == 8
+
+
+@pytest.mark.asyncio
+async def test_remaining_headers() -> None:
+    scheduler = RateLimitScheduler(requests_per_minute=600)
+    loop = asyncio.get_running_loop()
+    await scheduler.acquire("d", 1)
+
+    scheduler.release("d", 200, {"x-ratelimit-remaining-requests": "0"})
+
+    started = loop.time()
+    await scheduler.acquire("d", 1)
+    assert loop.time() - started >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_remaining_headers_without_budget() -> None:
+    scheduler = RateLimitScheduler(clock=lambda: 0.0)
+    await scheduler.acquire("d", 1)
+
+    scheduler.release(
+        "d",
+        200,
+        {"x-ratelimit-remaining-tokens": "0", "x-ratelimit-remaining-requests": "x"},
+    )
+
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(scheduler.acquire("d", 1), timeout=0.05)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter() -> None:
+    scheduler = RateLimitScheduler(max_concurrency=1)
+    await scheduler.acquire("d", 1)
+
+    waiting = asyncio.create_task(scheduler.acquire("d", 1))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    scheduler.release("d")
+
+    assert scheduler.queued == 0
+    await asyncio.wait_for(scheduler.acquire("d", 1), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_after_grant() -> None:
+    scheduler = RateLimitScheduler(max_concurrency=1)
+    await scheduler.acquire("d", 1)
+
+    waiting = asyncio.create_task(scheduler.acquire("d", 1))
+    await asyncio.sleep(0)
+    scheduler.release("d")  # grants the slot to the waiting task
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    await asyncio.wait_for(scheduler.acquire("d", 1), timeout=1)
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from maf_workflow.utils.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_coalesces_concurrent_calls() -> None:
+    single_flight = SingleFlight[str, int]()
+    release = asyncio.Event()
+    calls = 0
+
+    async def fetch() -> int:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return 42
+
+    waiters = [asyncio.create_task(single_flight.do("k", fetch)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert "k" in single_flight
+
+    release.set()
+    assert await asyncio.gather(*waiters) == [42, 42, 42]
+    assert calls == 1
+    assert (single_flight.calls, single_flight.coalesced) == (1, 2)
+    assert "k" not in single_flight
+
+    # a later call is not coalesced with a finished one
+    assert await single_flight.do("k", fetch) == 42
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_shares_exceptions() -> None:
+    single_flight = SingleFlight[str, int]()
+
+    async def fetch() -> int:
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        single_flight.do("k", fetch),
+        single_flight.do("k", fetch),
+        return_exceptions=True,
+    )
+
+    assert [type(r) for r in results] == [ValueError, ValueError]
+    assert single_flight.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_call() -> None:
+    single_flight = SingleFlight[str, int]()
+    release = asyncio.Event()
+
+    async def fetch() -> int:
+        await release.wait()
+        return 1
+
+    first = asyncio.create_task(single_flight.do("k", fetch))
+    second = asyncio.create_task(single_flight.do("k", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == 1
+    with pytest.raises(asyncio.CancelledError):
+        await first
@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from maf_workflow.utils.speculation import Emit, Speculation, SpeculationScope
+
+
+async def _answer(emit: Emit) -> str:
+    await emit("a")
+    await asyncio.sleep(0.02)
+    await emit("b")
+    await asyncio.sleep(0.02)
+    await emit("c")
+    return "abc"
+
+
+@pytest.mark.asyncio
+async def test_join_replays_and_follows_pieces() -> None:
+    speculation = Speculation(_answer)
+    await asyncio.sleep(0.01)  # "a" is buffered before the join
+    pieces: list[str] = []
+
+    async def emit(piece: str) -> None:
+        pieces.append(piece)
+
+    assert await speculation.join(emit) == "abc"
+    assert pieces == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_join_after_completion() -> None:
+    speculation = Speculation(_answer)
+    await asyncio.sleep(0.1)
+    pieces: list[str] = []
+
+    async def emit(piece: str) -> None:
+        pieces.append(piece)
+
+    assert await speculation.join(emit) == "abc"
+    assert pieces == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_cancel() -> None:
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def work(emit: Emit) -> str:
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "never"
+
+    speculation = Speculation(work)
+    await started.wait()
+    speculation.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_join_raises_errors() -> None:
+    async def work(emit: Emit) -> str:
+        raise RuntimeError("boom")
+
+    async def emit(piece: str) -> None:
+        pass
+
+    with pytest.raises(RuntimeError):
+        await Speculation(work).join(emit)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_join_cancels_work() -> None:
+    cancelled = asyncio.Event()
+
+    async def work(emit: Emit) -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "never"
+
+    async def emit(piece: str) -> None:
+        pass
+
+    join = asyncio.create_task(Speculation(work).join(emit))
+    await asyncio.sleep(0.01)
+    join.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_scope_cancels_what_was_not_joined() -> None:
+    cancelled: list[str] = []
+
+    def work(name: str):
+        async def run(emit: Emit) -> str:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(name)
+                raise
+            return name
+
+        return run
+
+    async def emit(piece: str) -> None:
+        pass
+
+    async def start_in_task() -> Speculation[str]:
+        return Speculation(work("in task"))
+
+    scope = SpeculationScope()
+    with scope.active():
+        Speculation(work("left"))
+        joined = Speculation(_answer)
+        await asyncio.create_task(start_in_task())
+    outside = Speculation(work("outside"))
+    assert await joined.join(emit) == "abc"
+
+    scope.cancel()
+    await asyncio.sleep(0)
+
+    assert sorted(cancelled) == ["in task", "left"]
+    outside.cancel()
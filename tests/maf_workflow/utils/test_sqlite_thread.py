@@ -0,0 +1,54 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from maf_workflow.utils.sqlite_thread import SQLiteThread
+
+
+@pytest.mark.asyncio
+async def test_runs_on_one_thread_off_the_loop() -> None:
+    opened: list[int] = []
+
+    def connect() -> sqlite3.Connection:
+        opened.append(threading.get_ident())
+        return sqlite3.connect(":memory:")
+
+    thread = SQLiteThread(connect)
+    await thread.run(lambda db: db.execute("CREATE TABLE t (n INTEGER)"))
+
+    def insert(db: sqlite3.Connection, n: int) -> int:
+        db.execute("INSERT INTO t VALUES (?)", (n,))
+        return threading.get_ident()
+
+    idents = await asyncio.gather(
+        *(thread.run(lambda db, n=n: insert(db, n)) for n in range(10))
+    )
+    count = await thread.run(lambda db: db.execute("SELECT COUNT(*) FROM t").fetchone())
+
+    assert count == (10,)
+    assert set(idents) == set(opened)
+    assert threading.get_ident() not in idents
+
+
+@pytest.mark.asyncio
+async def test_close_reopens_on_next_use() -> None:
+    connections: list[sqlite3.Connection] = []
+
+    def connect() -> sqlite3.Connection:
+        connections.append(sqlite3.connect(":memory:", check_same_thread=False))
+        return connections[-1]
+
+    thread = SQLiteThread(connect)
+    await thread.close()
+    assert connections == []
+
+    await thread.run(lambda db: db.execute("SELECT 1"))
+    await thread.close()
+    await thread.run(lambda db: db.execute("SELECT 1"))
+
+    assert len(connections) == 2
+    with pytest.raises(sqlite3.ProgrammingError, match="closed"):
+        connections[0].execute("SELECT 1")
+    await thread.close()
@@ -0,0 +1,5 @@
+from maf_workflow.utils.text import normalize_message
+
+
+def test_normalize_message() -> None:
+    assert normalize_message("  What IS\t1 +  1? ") == "what is 1 + 1?"
@@ -0,0 +1,10 @@
+from agent_framework import ChatMessage, Role
+
+from maf_workflow.utils.tokens import MESSAGE_OVERHEAD_TOKENS, count_tokens
+
+
+def test_count_tokens() -> None:
+    assert count_tokens(ChatMessage(Role.USER, text="")) == MESSAGE_OVERHEAD_TOKENS
+    assert count_tokens(ChatMessage(Role.USER, text="a" * 40)) == (
+        10 + MESSAGE_OVERHEAD_TOKENS
+    )
@@ -0,0 +1,80 @@
+from maf_workflow.utils.ttl_lru_cache import TTLLRUCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_get_and_set() -> None:
+    cache = TTLLRUCache[str, int](max_entries=2)
+    cache.set("a", 1, size=3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("b", 0) == 0
+    assert "a" in cache
+    assert len(cache) == 1
+
+    stats = cache.get_stats()
+    assert (stats.hits, stats.misses, stats.entries, stats.size_bytes) == (1, 2, 1, 3)
+    assert stats.hit_rate == 1 / 3
+
+
+def test_evicts_least_recently_used() -> None:
+    cache = TTLLRUCache[str, int](max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.get_stats().evictions == 1
+
+
+def test_evicts_to_stay_within_max_bytes() -> None:
+    cache = TTLLRUCache[str, int](max_entries=10, max_bytes=10)
+    cache.set("a", 1, size=6)
+    cache.set("b", 2, size=6)
+
+    assert "a" not in cache
+    assert cache.get_stats().size_bytes == 6
+
+    # an entry larger than the bound is still kept on its own
+    cache.set("c", 3, size=20)
+    assert list(cache._entries) == ["c"]
+
+
+def test_expires_entries() -> None:
+    clock = Clock()
+    cache = TTLLRUCache[str, int](max_entries=10, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=30)
+
+    clock.now = 10
+    assert "a" not in cache
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.get_stats().expirations == 1
+
+
+def test_replace_delete_and_clear() -> None:
+    cache = TTLLRUCache[str, int](max_entries=10)
+    cache.set("a", 1, size=2)
+    cache.set("a", 2, size=5)
+    assert cache.get("a") == 2
+    assert cache.get_stats().size_bytes == 5
+
+    cache.delete("a")
+    cache.delete("missing")
+    assert len(cache) == 0
+
+    cache.set("b", 1, size=1)
+    cache.clear()
+    assert cache.get_stats().entries == 0
+    assert cache.get_stats().size_bytes == 0